@@ -0,0 +1,171 @@
+# app/booking_export.py
+#
+# Streaming export of bookings as CSV or NDJSON for reporting, shared by the
+# /export/bookings endpoint and the command line:
+#
+#     python -m app.booking_export 2024-01-01 2024-01-31 > january.csv
+#     python -m app.booking_export 2024-01-01 2024-12-31 --room-id 3 --format ndjson
+#
+# Each booking is exported with its schedule, room name and movie title. The whole date
+# range is one query on the (show_date, start_time) index, which already returns the rows
+# in export order, and its rows are fetched and encoded in batches of EXPORT_BATCH_SIZE
+# (yield_per). Memory use depends on the batch size, not on the size of the export, so
+# the first rows are sent as soon as the first batch is fetched.
+
+import argparse
+import csv
+import io
+import sys
+from datetime import date
+from typing import Iterable, Iterator, Optional
+import orjson
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from . import models
+from .database import get_engine
+from .schemas import format_start_time
+
+# Rows fetched from the database and encoded together.
+EXPORT_BATCH_SIZE = 2000
+
+FORMATS = ("csv", "ndjson")
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# Exported fields, in CSV column order.
+EXPORT_FIELDS = (
+    "booking_id",
+    "booked_at",
+    "schedule_id",
+    "show_date",
+    "start_time",
+    "room_id",
+    "room_name",
+    "movie_id",
+    "movie_title",
+    "row",
+    "seat",
+)
+
+
+# Bookings of the show dates from date_from to date_to (inclusive), with their schedule,
+# room and movie, ordered by show date, start time, schedule, row and seat.
+def export_query(date_from: date, date_to: date, room_id: Optional[int] = None, movie_id: Optional[int] = None):
+    query = (
+        select(
+            models.Booking.id,
+            models.Booking.timestamp,
+            models.Schedule.id,
+            models.Schedule.show_date,
+            models.Schedule.start_time,
+            models.Room.id,
+            models.Room.name,
+            models.Movie.id,
+            models.Movie.title,
+            models.Booking.row,
+            models.Booking.seat
+        )
+        .select_from(models.Schedule)
+        .join(models.Booking, models.Booking.schedule_id == models.Schedule.id)
+        .join(models.Schedule.room)
+        .join(models.Schedule.movie)
+        .where(models.Schedule.show_date.between(date_from, date_to))
+        .order_by(models.Schedule.show_date, models.Schedule.start_time, models.Schedule.id, models.Booking.row, models.Booking.seat)
+    )
+    if room_id is not None:
+        query = query.where(models.Schedule.room_id == room_id)
+    if movie_id is not None:
+        query = query.where(models.Schedule.movie_id == movie_id)
+    return query
+
+
+# Batches of export rows for the show dates from date_from to date_to (inclusive).
+def export_batches(
+    date_from: date,
+    date_to: date,
+    room_id: Optional[int] = None,
+    movie_id: Optional[int] = None,
+    engine: Optional[Engine] = None
+) -> Iterator[list]:
+    engine = engine or get_engine()
+    with engine.connect() as connection:
+        result = connection.execution_options(yield_per=EXPORT_BATCH_SIZE).execute(export_query(date_from, date_to, room_id, movie_id))
+        for batch in result.partitions():
+            yield batch
+
+
+# Formats export rows. Consecutive rows of one schedule share its date, time, room and
+# movie, so those are formatted once per schedule.
+class RowFormatter:
+    def __init__(self):
+        self.schedule_id = None
+        self.schedule_values = ()
+
+    def __call__(self, row) -> tuple:
+        booking_id, booked_at, schedule_id, show_date, start_time, room_id, room_name, movie_id, movie_title, seat_row, seat = row
+        if schedule_id != self.schedule_id:
+            self.schedule_id = schedule_id
+            self.schedule_values = (schedule_id, show_date.isoformat(), format_start_time(start_time), room_id, room_name, movie_id, movie_title)
+        return (booking_id, booked_at.isoformat() if booked_at else None, *self.schedule_values, seat_row, seat)
+
+
+# CSV with a header line, one chunk per batch.
+def encode_csv(batches: Iterable[list]) -> Iterator[bytes]:
+    format_row = RowFormatter()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue().encode()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(map(format_row, batch))
+        yield buffer.getvalue().encode()
+
+
+# One JSON object per line, one chunk per batch.
+def encode_ndjson(batches: Iterable[list]) -> Iterator[bytes]:
+    format_row = RowFormatter()
+    for batch in batches:
+        yield b"".join(
+            orjson.dumps(dict(zip(EXPORT_FIELDS, format_row(row))), option=orjson.OPT_APPEND_NEWLINE) for row in batch
+        )
+
+
+ENCODERS = {
+    "csv": encode_csv,
+    "ndjson": encode_ndjson,
+}
+
+
+# The encoded export, as chunks of bytes.
+def export_bookings(
+    fmt: str,
+    date_from: date,
+    date_to: date,
+    room_id: Optional[int] = None,
+    movie_id: Optional[int] = None,
+    engine: Optional[Engine] = None
+) -> Iterator[bytes]:
+    return ENCODERS[fmt](export_batches(date_from, date_to, room_id, movie_id, engine))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export bookings with their schedule, room and movie as CSV or NDJSON.")
+    parser.add_argument("date_from", type=date.fromisoformat, help="First show date, YYYY-MM-DD.")
+    parser.add_argument("date_to", type=date.fromisoformat, help="Last show date (inclusive), YYYY-MM-DD.")
+    parser.add_argument("--room-id", type=int, help="Only bookings in this room.")
+    parser.add_argument("--movie-id", type=int, help="Only bookings for this movie.")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="Output format (default: csv).")
+    args = parser.parse_args(argv)
+
+    for chunk in export_bookings(args.format, args.date_from, args.date_to, args.room_id, args.movie_id):
+        sys.stdout.buffer.write(chunk)
+    sys.stdout.buffer.flush()
+
+
+if __name__ == "__main__":
+    main()
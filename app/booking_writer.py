@@ -0,0 +1,240 @@
+# app/booking_writer.py
+#
+# Group commit for single-seat bookings (BOOKING_WRITE_BATCHING). SQLite has one writer,
+# and every commit takes the write lock and pays for its own statements and journal
+# write, so under a burst of bookings each request's transaction queues for the lock and
+# some give up with "database is locked". With batching, requests hand their seat to one
+# writer thread instead. The writer collects the requests that are waiting, for at most
+# BOOKING_BATCH_MAX_WAIT_MS and BOOKING_BATCH_MAX_SIZE requests, and writes them in one
+# transaction: one query finds the seats that are already booked, one statement inserts
+# the rest and one updates the counters of their schedules. Within a batch the first
+# request for a seat wins. Every caller then gets its own booking, or SeatTaken for a 409.
+#
+# If a booking written by another process still collides with the batch, or another
+# process wrote between the batch's read and its insert (SQLite then refuses to upgrade
+# the read transaction), the transaction is rolled back and the batch is written one
+# request at a time, which is what happens without batching. The writer serves the sync
+# and async routers alike: it uses the sync engine, and callers wait on a
+# concurrent.futures.Future.
+
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from datetime import datetime
+from typing import Optional
+from sqlalchemy import and_, insert, or_, select, tuple_
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session
+from . import models
+from .config import settings
+from .database import SessionLocal, get_engine
+from .occupancy import count_booked, count_booked_many
+from .response_cache import catalog_cache
+from .seat_events import seat_events
+from .seat_state import seat_state
+
+
+# Set on a request's future when its seat is already booked.
+class SeatTaken(Exception):
+    def __init__(self):
+        super().__init__("Seat is already booked")
+
+
+class BookingRequest:
+    __slots__ = ("schedule_id", "row", "seat", "timestamp", "future")
+
+    def __init__(self, schedule_id: int, row: int, seat: int):
+        self.schedule_id = schedule_id
+        self.row = row
+        self.seat = seat
+        self.timestamp = datetime.now()
+        self.future: Future = Future()
+
+    @property
+    def key(self) -> tuple:
+        return (self.schedule_id, self.row, self.seat)
+
+    def to_response(self, booking_id: int) -> dict:
+        return {
+            "row": self.row,
+            "seat": self.seat,
+            "id": booking_id,
+            "schedule_id": self.schedule_id,
+            "timestamp": self.timestamp
+        }
+
+
+class BookingWriter:
+    def __init__(self, enabled: bool, max_batch_size: int, max_wait: float):
+        self.enabled = enabled
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait)
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.batches = 0
+        self.requests = 0
+        self.conflicts = 0
+        self.largest_batch = 0
+        self.fallbacks = 0
+
+    # Queue a booking and return the future of its response dict. The writer thread
+    # starts with the first booking.
+    def submit(self, schedule_id: int, row: int, seat: int) -> Future:
+        request = BookingRequest(schedule_id, row, seat)
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="booking-writer", daemon=True)
+                self._thread.start()
+            self._queue.put(request)
+        return request.future
+
+    # Write the bookings still queued and stop the writer thread.
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._queue.put(None)
+        thread.join()
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                return
+            batch = [request]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    request = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._write(batch)
+                    return
+                batch.append(request)
+            self._write(batch)
+
+    # Write one batch and settle every request's future.
+    def _write(self, batch: list):
+        try:
+            with SessionLocal(bind=get_engine()) as db:
+                try:
+                    written = self._write_together(db, batch)
+                except (IntegrityError, OperationalError):
+                    db.rollback()
+                    self.fallbacks += 1
+                    written = self._write_one_by_one(db, batch)
+        except Exception as error:
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(error)
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        taken: dict = {}
+        for request, _ in written.values():
+            taken.setdefault(request.schedule_id, []).append((request.row, request.seat))
+        for schedule_id, seats in taken.items():
+            seat_state.mark_booked(schedule_id, seats)
+            seat_events.publish(schedule_id, taken=seats)
+        if taken:
+            catalog_cache.invalidate_bookings()
+        for request in batch:
+            if request.future.done():
+                continue
+            entry = written.get(request.key)
+            if entry is not None and entry[0] is request:
+                request.future.set_result(request.to_response(entry[1]))
+            else:
+                self.conflicts += 1
+                request.future.set_exception(SeatTaken())
+
+    # All new seats of the batch in one transaction. Returns {key: (request, booking_id)}
+    # for the requests that got their seat.
+    def _write_together(self, db: Session, batch: list) -> dict:
+        first: dict = {}
+        for request in batch:
+            first.setdefault(request.key, request)
+        seats_by_schedule: dict = {}
+        for schedule_id, row, seat in first:
+            seats_by_schedule.setdefault(schedule_id, []).append((row, seat))
+        # One (row, seat) IN list per schedule: SQLite reads each from the unique seat
+        # index, where a single three-column IN list can fall back to scanning it.
+        booked = set(db.execute(
+            select(models.Booking.schedule_id, models.Booking.row, models.Booking.seat).where(or_(*(
+                and_(models.Booking.schedule_id == schedule_id, tuple_(models.Booking.row, models.Booking.seat).in_(seats))
+                for schedule_id, seats in seats_by_schedule.items()
+            )))
+        ).all())
+        pending = [request for key, request in first.items() if key not in booked]
+        if not pending:
+            return {}
+
+        rows = db.execute(
+            insert(models.Booking).returning(
+                models.Booking.id, models.Booking.schedule_id, models.Booking.row, models.Booking.seat
+            ),
+            [
+                {"schedule_id": request.schedule_id, "row": request.row, "seat": request.seat, "timestamp": request.timestamp}
+                for request in pending
+            ]
+        ).all()
+        db.execute(count_booked_many(), [
+            {"schedule_id": schedule_id, "seats": seats}
+            for schedule_id, seats in Counter(request.schedule_id for request in pending).items()
+        ])
+        db.commit()
+        booking_ids = {(schedule_id, row, seat): booking_id for booking_id, schedule_id, row, seat in rows}
+        return {request.key: (request, booking_ids[request.key]) for request in pending}
+
+    # Each request in its own transaction, as without batching. A request that fails for
+    # another reason gets the error on its own future.
+    def _write_one_by_one(self, db: Session, batch: list) -> dict:
+        written: dict = {}
+        for request in batch:
+            if request.key in written:
+                continue
+            try:
+                result = db.execute(
+                    insert(models.Booking).values(
+                        schedule_id=request.schedule_id, row=request.row, seat=request.seat, timestamp=request.timestamp
+                    )
+                )
+                db.execute(count_booked(request.schedule_id, 1))
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                continue
+            except Exception as error:
+                db.rollback()
+                request.future.set_exception(error)
+                continue
+            written[request.key] = (request, result.inserted_primary_key[0])
+        return written
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+            "queued": self._queue.qsize(),
+            "batches": self.batches,
+            "requests": self.requests,
+            "conflicts": self.conflicts,
+            "avg_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "fallbacks": self.fallbacks
+        }
+
+
+booking_writer = BookingWriter(
+    enabled=settings.booking_write_batching,
+    max_batch_size=settings.booking_batch_max_size,
+    max_wait=settings.booking_batch_max_wait_ms / 1000
+)
@@ -0,0 +1,334 @@
+# app/bulk_import.py
+#
+# Bulk import of movies, rooms and schedules from NDJSON or CSV, shared by the
+# /import endpoints and the command line:
+#
+#     python -m app.bulk_import schedules week.csv
+#     python -m app.bulk_import movies movies.ndjson --format ndjson
+#
+# Input is consumed line by line and handled in batches: each batch is validated,
+# checked against the database with one set-based query per rule (unique titles and
+# names, existing rooms and movies, schedule overlaps), inserted with a single
+# executemany and committed. A bad line is reported with its line number and skipped;
+# the rest of the file is still imported. Memory use depends on the batch size and the
+# error limit, not on the size of the file.
+#
+# NDJSON has one JSON object per line. CSV starts with a header line naming the fields;
+# each following line is one record (quoted values may not span lines). Empty CSV values
+# are left out, so optional fields such as a movie's runtime can be blank.
+
+import argparse
+import codecs
+import csv
+import json
+import sys
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from . import models, schemas
+from .database import SessionLocal, get_engine
+from .response_cache import catalog_cache
+from .schedule_conflicts import ScheduleIntervals, occupied_minutes, overlap_query
+from .seat_state import seat_state
+
+# Records validated, checked and inserted together.
+IMPORT_BATCH_SIZE = 1000
+
+# Errors listed in a report; further errors are only counted.
+DEFAULT_MAX_ERRORS = 1000
+
+# Longest line, in characters, accepted from a streamed body. Records are far shorter;
+# the limit keeps a body without line breaks from being buffered whole.
+MAX_LINE_LENGTH = 64 * 1024
+
+FORMATS = ("ndjson", "csv")
+
+# Request content types and the import format they select.
+CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+
+class ImportReport:
+    def __init__(self, max_errors: int = DEFAULT_MAX_ERRORS):
+        self.max_errors = max_errors
+        self.processed = 0
+        self.created = 0
+        self.failed = 0
+        self.errors: list = []
+
+    def add_error(self, line: int, error: str):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"line": line, "error": error})
+
+    def to_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "created": self.created,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+            "errors_truncated": self.failed > len(self.errors)
+        }
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc']) or 'record'}: {detail['msg']}" for detail in error.errors()
+    )
+
+
+# Turns text lines into (line number, record dict) pairs; a line that cannot be parsed
+# is reported and skipped.
+class RecordParser:
+    def __init__(self, fmt: str, report: ImportReport):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported import format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+        self.fmt = fmt
+        self.report = report
+        self.line_number = 0
+        self.header: Optional[list] = None
+
+    def parse(self, line: str):
+        self.line_number += 1
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            return None
+
+        if self.fmt == "ndjson":
+            self.report.processed += 1
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                self.report.add_error(self.line_number, f"invalid JSON: {error}")
+                return None
+            if not isinstance(record, dict):
+                self.report.add_error(self.line_number, "expected a JSON object")
+                return None
+            return self.line_number, record
+
+        values = next(csv.reader([line]))
+        if self.header is None:
+            self.header = [name.strip() for name in values]
+            return None
+        self.report.processed += 1
+        if len(values) != len(self.header):
+            self.report.add_error(self.line_number, f"expected {len(self.header)} fields, got {len(values)}")
+            return None
+        return self.line_number, {name: value for name, value in zip(self.header, values) if value != ""}
+
+
+# How one kind of record is validated, checked against the database and inserted.
+class Importer(ABC):
+    model = None
+    schema: type = BaseModel
+
+    # Set-based checks for a batch of validated records. Returns the rows to insert as
+    # (line, values) pairs and reports the rejected ones.
+    @abstractmethod
+    def check(self, db: Session, records: list, report: ImportReport) -> list:
+        ...
+
+
+# Reject records whose value of a unique column is already taken, in the database or
+# earlier in the same batch.
+def _unique(db: Session, column, key: str, records: list, report: ImportReport, what: str) -> list:
+    values = {record[key] for _, record in records}
+    taken = set(db.execute(select(column).where(column.in_(values))).scalars())
+    rows = []
+    for line, record in records:
+        if record[key] in taken:
+            report.add_error(line, f"A {what} with this {key} already exists")
+            continue
+        taken.add(record[key])
+        rows.append((line, record))
+    return rows
+
+
+class MovieImporter(Importer):
+    model = models.Movie
+    schema = schemas.MovieCreate
+
+    def check(self, db, records, report):
+        return _unique(db, models.Movie.title, "title", records, report, "movie")
+
+
+class RoomImporter(Importer):
+    model = models.Room
+    schema = schemas.RoomCreate
+
+    def check(self, db, records, report):
+        return _unique(db, models.Room.name, "name", records, report, "room")
+
+
+class ScheduleImporter(Importer):
+    model = models.Schedule
+    schema = schemas.ScheduleCreate
+
+    def check(self, db, records, report):
+        room_ids = {record["room_id"] for _, record in records}
+        movie_ids = {record["movie_id"] for _, record in records}
+        rooms = set(db.execute(select(models.Room.id).where(models.Room.id.in_(room_ids))).scalars())
+        runtimes = dict(db.execute(
+            select(models.Movie.id, models.Movie.runtime_minutes).where(models.Movie.id.in_(movie_ids))
+        ).all())
+        # Existing schedules on the batch's rooms around its dates (a few days per batch,
+        # so the (room_id, show_date) index keeps this to short range scans).
+        intervals = ScheduleIntervals.from_rows(
+            db.execute(overlap_query(room_ids, {record["show_date"] for _, record in records}))
+        )
+
+        rows = []
+        for line, record in records:
+            if record["room_id"] not in rooms:
+                report.add_error(line, "Room not found")
+                continue
+            if record["movie_id"] not in runtimes:
+                report.add_error(line, "Movie not found")
+                continue
+            slot = (record["room_id"], record["show_date"], record["start_time"], occupied_minutes(runtimes[record["movie_id"]]))
+            conflict = intervals.conflict(*slot)
+            if conflict:
+                report.add_error(line, conflict)
+            else:
+                intervals.add(*slot, f"line {line} of this import")
+                rows.append((line, record))
+        return rows
+
+
+IMPORTERS = {
+    "movies": MovieImporter(),
+    "rooms": RoomImporter(),
+    "schedules": ScheduleImporter(),
+}
+
+
+# An import in progress: feed it lines, then call finish() for the report.
+class BulkImport:
+    def __init__(self, db: Session, kind: str, fmt: str, max_errors: int = DEFAULT_MAX_ERRORS, batch_size: int = IMPORT_BATCH_SIZE):
+        self.db = db
+        self.importer = IMPORTERS[kind]
+        self.report = ImportReport(max_errors)
+        self.parser = RecordParser(fmt, self.report)
+        self.batch_size = batch_size
+        self.batch: list = []
+
+    # Parse and validate one line. Returns True when a full batch is ready for flush().
+    def add_line(self, line: str) -> bool:
+        parsed = self.parser.parse(line)
+        if parsed is None:
+            return False
+        line_number, record = parsed
+        try:
+            values = dict(self.importer.schema.model_validate(record))
+        except ValidationError as error:
+            self.report.add_error(line_number, _validation_message(error))
+            return False
+        self.batch.append((line_number, values))
+        return len(self.batch) >= self.batch_size
+
+    # Check and insert the pending batch in one transaction.
+    def flush(self):
+        records, self.batch = self.batch, []
+        if not records:
+            return
+        rows = self.importer.check(self.db, records, self.report)
+        if rows:
+            self._insert(rows)
+            catalog_cache.invalidate()
+            if self.importer.model is models.Schedule:
+                seat_state.forget_schedules()
+
+    def _insert(self, rows: list):
+        try:
+            self.db.execute(insert(self.importer.model), [values for _, values in rows])
+            self.db.commit()
+            self.report.created += len(rows)
+            return
+        except IntegrityError:
+            self.db.rollback()
+
+        # A concurrent write took some of the values after the checks ran: insert the
+        # rows one at a time to find and report the conflicting lines.
+        for line, values in rows:
+            try:
+                self.db.execute(insert(self.importer.model), values)
+                self.db.commit()
+                self.report.created += 1
+            except IntegrityError:
+                self.db.rollback()
+                self.report.add_error(line, "conflicts with an existing record")
+
+    def finish(self) -> dict:
+        self.flush()
+        return self.report.to_dict()
+
+
+# Import from an iterable of text lines (an open file, for example).
+def import_lines(db: Session, kind: str, fmt: str, lines: Iterable[str], max_errors: int = DEFAULT_MAX_ERRORS) -> dict:
+    bulk_import = BulkImport(db, kind, fmt, max_errors)
+    for line in lines:
+        if bulk_import.add_line(line):
+            bulk_import.flush()
+    return bulk_import.finish()
+
+
+# Raised by LineSplitter for a line longer than its limit.
+class LineTooLong(ValueError):
+    def __init__(self, line: int, max_length: int):
+        super().__init__(f"Line {line} is longer than {max_length} characters")
+        self.line = line
+
+
+# Split a stream of byte chunks into text lines, decoding UTF-8 incrementally. A line
+# longer than max_length raises LineTooLong instead of growing the pending buffer.
+class LineSplitter:
+    def __init__(self, max_length: int = MAX_LINE_LENGTH):
+        self.decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.max_length = max_length
+        self.pending = ""
+        self.lines = 0
+
+    def feed(self, chunk: bytes) -> list:
+        text = self.pending + self.decoder.decode(chunk)
+        lines = text.split("\n")
+        self.pending = lines.pop()
+        lines.append(self.pending)
+        for index, line in enumerate(lines, self.lines + 1):
+            if len(line) > self.max_length:
+                raise LineTooLong(index, self.max_length)
+        lines.pop()
+        self.lines += len(lines)
+        return lines
+
+    def close(self) -> list:
+        text = self.pending + self.decoder.decode(b"", final=True)
+        self.pending = ""
+        return [text] if text else []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import movies, rooms or schedules from NDJSON or CSV.")
+    parser.add_argument("kind", choices=sorted(IMPORTERS), help="What the file contains.")
+    parser.add_argument("path", help="The file to import, or - for standard input.")
+    parser.add_argument("--format", choices=FORMATS, help="File format; by default taken from the file extension.")
+    parser.add_argument("--max-errors", type=int, default=DEFAULT_MAX_ERRORS, help="Errors listed in the report.")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    source = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8-sig", newline="")
+    with source, SessionLocal(bind=get_engine()) as db:
+        report = import_lines(db, args.kind, fmt, source, args.max_errors)
+    print(json.dumps(report, indent=2))
+    if report["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
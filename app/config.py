@@ -0,0 +1,74 @@
+# app/config.py
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+# Application settings, read from environment variables (or a local .env file).
+# For example, `ASYNC_MODE=true uvicorn main:app` serves the async routers.
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+    # Serve the API with async routers on an AsyncEngine instead of the sync threadpool path.
+    async_mode: bool = False
+
+    # Send hot responses with orjson, built directly from rows without response-model validation.
+    fast_json: bool = False
+
+    # Database connection. Any SQLAlchemy URL works; the default is a local SQLite file.
+    database_url: str = "sqlite:///./app.db"
+
+    # Create missing tables when the app starts. Otherwise set the database up once
+    # with `python -m app.migrations`.
+    create_schema: bool = False
+
+    # Load today's schedules and their booked seats into the seat map cache at startup,
+    # before the worker accepts traffic.
+    prewarm_seat_maps: bool = False
+
+    # Schedule conflicts: a schedule occupies its room for the movie's runtime plus the
+    # cleaning buffer. Movies without a runtime are assumed to run this long.
+    default_runtime_minutes: int = 120
+    cleaning_buffer_minutes: int = 15
+
+    # Connection pool sizing (QueuePool). Recycle is in seconds; -1 keeps connections forever.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = False
+
+    # SQLite pragmas applied to every new connection.
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_mmap_size: int = 256 * 1024 * 1024
+    # Negative values are KiB, as in PRAGMA cache_size (-65536 = 64 MiB per connection).
+    sqlite_cache_size: int = -65536
+
+    # Group commit of single-seat bookings: one writer thread commits the bookings that
+    # arrive within BOOKING_BATCH_MAX_WAIT_MS (up to BOOKING_BATCH_MAX_SIZE) together.
+    booking_write_batching: bool = False
+    booking_batch_max_size: int = 64
+    booking_batch_max_wait_ms: float = 2.0
+
+    # Seconds a seat hold reserves its seats before they are released again.
+    seat_hold_ttl: float = 300.0
+
+    # Catalog response cache (movies and rooms). TTL bounds staleness from writes made by
+    # other worker processes; max-age is sent to clients in Cache-Control.
+    catalog_cache_max_entries: int = 1024
+    catalog_cache_ttl: float = 30.0
+    catalog_cache_max_age: int = 0
+
+    # Room analytics of past date ranges kept in memory (they no longer change).
+    analytics_cache_max_entries: int = 256
+
+    # Add a Server-Timing header (database time, other handling time, total) to every
+    # response, so browser devtools show where a single request spent its time.
+    server_timing: bool = False
+
+    # Development aid: log requests that exceed their endpoint's query budget or repeat
+    # the same statement (a likely N+1), with the code that issued the queries.
+    query_debug: bool = False
+
+
+settings = Settings()
@@ -1,25 +1,306 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool, StaticPool
+from .config import settings
 
-# Database URL for SQLite. The database file will be named "app.db".
-SQLALCHEMY_DATABASE_URL = "sqlite:///./app.db"
+# Database URL from the DATABASE_URL setting; by default a SQLite file named "app.db".
+SQLALCHEMY_DATABASE_URL = settings.database_url
 
-# Create the SQLAlchemy engine.
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Async drivers used for each sync database URL in async mode.
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
 
-# Create a session local class to manage database sessions.
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Turn a sync database URL into its async equivalent, e.g. sqlite:// -> sqlite+aiosqlite://.
+def to_async_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+# Checkout counters and wait times of one connection pool.
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_checkout(self, waited: float):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_avg_ms": round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3)
+            }
+
+
+# Times every checkout: waiting for a free connection plus opening a new one if needed.
+# The stats object lives on the class so it survives pool.recreate().
+class _InstrumentedPool:
+    stats: PoolStats
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_checkout(time.perf_counter() - start)
+        return connection
+
+
+def _instrumented_pool_class(pool_class, stats: PoolStats):
+    return type(f"Instrumented{pool_class.__name__}", (_InstrumentedPool, pool_class), {"stats": stats})
+
+
+# Pool statistics per engine, reported by the /health/db endpoint.
+pool_stats = {"sync": PoolStats(), "async": PoolStats()}
+
+
+def _is_sqlite_file(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+
+# Engine keyword arguments from the settings. An in-memory SQLite database lives in a
+# single connection, so it is shared by every thread through a StaticPool instead.
+def _engine_options(url, pool_class, stats: PoolStats) -> dict:
+    options = {}
+    if url.get_backend_name() == "sqlite":
+        if not url.get_driver_name().startswith("aiosqlite"):
+            options["connect_args"] = {"check_same_thread": False}
+        if not _is_sqlite_file(url):
+            options["poolclass"] = StaticPool
+            return options
+
+    options.update(
+        poolclass=_instrumented_pool_class(pool_class, stats),
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping
+    )
+    return options
+
+
+# Apply the configured pragmas to every new SQLite connection: WAL journaling lets
+# readers run alongside the single writer, and the busy timeout makes writers wait
+# for the lock instead of failing with "database is locked".
+def _apply_sqlite_pragmas(sync_engine: Engine):
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        if _is_sqlite_file(sync_engine.url):
+            cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+        cursor.close()
+
+
+# Query count, total database time and rows fetched during one request. `statements` is
+# only a list when the statements themselves are recorded (QUERY_DEBUG, see app/query_budget.py).
+class QueryStats:
+    __slots__ = ("queries", "duration", "rows", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.duration = 0.0
+        self.rows = 0
+        self.statements = None
+
+
+# The stats of the request being handled, set by the metrics middleware. Sync endpoints
+# run in the threadpool with a copy of the request context, so they update the same object.
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+# Counts the rows fetched through a DBAPI cursor into the stats it was created for.
+class _RowCountingCursor:
+    __slots__ = ("_cursor", "_stats")
+
+    def __init__(self, cursor, stats: QueryStats):
+        self._cursor = cursor
+        self._stats = stats
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._stats.rows += 1
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        rows = self._cursor.fetchmany(*args, **kwargs)
+        self._stats.rows += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._cursor.fetchall()
+        self._stats.rows += len(rows)
+        return rows
+
+    def __iter__(self):
+        for row in self._cursor:
+            self._stats.rows += 1
+            yield row
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        if name in _RowCountingCursor.__slots__:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._cursor, name, value)
+
+
+# Time every statement executed while a request is being measured. Rows are counted as the
+# result is fetched, so the engine's execution context hands out counting cursors.
+def _instrument_queries(sync_engine: Engine):
+    execution_context = sync_engine.dialect.execution_ctx_cls
+
+    class RowCountingExecutionContext(execution_context):
+        def create_cursor(self):
+            cursor = super().create_cursor()
+            stats = current_query_stats.get()
+            return cursor if stats is None else _RowCountingCursor(cursor, stats)
+
+    sync_engine.dialect.execution_ctx_cls = RowCountingExecutionContext
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        if current_query_stats.get() is not None:
+            context.query_start_time = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def record_query(conn, cursor, statement, parameters, context, executemany):
+        stats = current_query_stats.get()
+        start = getattr(context, "query_start_time", None)
+        if stats is None or start is None:
+            return
+        stats.queries += 1
+        stats.duration += time.perf_counter() - start
+        context.query_start_time = None
+
+
+# Engines are created on first use rather than at import, so importing the app (in a
+# worker, a test or a CLI) neither builds a connection pool nor touches the database.
+_engine_lock = threading.Lock()
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+
+# Session factories; sessions are bound to the engine when they are opened.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
+# Async sessions keep their loaded attributes after commit, since lazy loads cannot run in async code.
+AsyncSessionLocal = async_sessionmaker(autoflush=False, expire_on_commit=False)
+
+
+# The SQLAlchemy engine, created on the first call.
+def get_engine() -> Engine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                url = make_url(SQLALCHEMY_DATABASE_URL)
+                sync_engine = create_engine(url, **_engine_options(url, QueuePool, pool_stats["sync"]))
+                if url.get_backend_name() == "sqlite":
+                    _apply_sqlite_pragmas(sync_engine)
+                _instrument_queries(sync_engine)
+                _engine = sync_engine
+    return _engine
+
+
+# In async mode, an AsyncEngine on the same database serves the async routers.
+# Returns None when ASYNC_MODE is off.
+def get_async_engine() -> Optional[AsyncEngine]:
+    global _async_engine
+    if _async_engine is None and settings.async_mode:
+        with _engine_lock:
+            if _async_engine is None:
+                url = make_url(to_async_url(SQLALCHEMY_DATABASE_URL))
+                async_engine = create_async_engine(url, **_engine_options(url, AsyncAdaptedQueuePool, pool_stats["async"]))
+                if url.get_backend_name() == "sqlite":
+                    _apply_sqlite_pragmas(async_engine.sync_engine)
+                _instrument_queries(async_engine.sync_engine)
+                _async_engine = async_engine
+    return _async_engine
+
+
+# The sync engines of everything created so far, e.g. to attach event listeners.
+def sync_engines() -> list:
+    engines = [get_engine()]
+    async_engine = get_async_engine()
+    if async_engine is not None:
+        engines.append(async_engine.sync_engine)
+    return engines
+
+
+# Pool statistics of the engines created so far; the async engine only exists in async mode.
+def created_pool_stats() -> dict:
+    engines = {"sync": _engine, "async": _async_engine}
+    return {name: stats for name, stats in pool_stats.items() if engines[name] is not None}
+
+
+# Close the pooled connections of both engines, at shutdown.
+async def dispose_engines():
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    if _engine is not None:
+        _engine.dispose()
 
 # Base class for our database models.
 Base = declarative_base()
 
+# Pool configuration, current usage and checkout statistics of an engine.
+def describe_pool(sync_engine: Engine, stats: PoolStats) -> dict:
+    pool = sync_engine.pool
+    description = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        description.update(
+            size=pool.size(),
+            max_overflow=pool._max_overflow,
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            idle=pool.checkedin()
+        )
+    description.update(stats.snapshot())
+    return description
+
 # Dependency to get a database session.
 def get_db():
-    db = SessionLocal()
+    db = SessionLocal(bind=get_engine())
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency to get an async database session.
+async def get_async_db():
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        yield db
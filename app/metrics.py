@@ -0,0 +1,183 @@
+# app/metrics.py
+#
+# Per-route request metrics: a latency histogram per route template plus the number of
+# queries, database time and rows fetched, collected by the engine events in
+# app/database.py. Rendered in the Prometheus text format by the /metrics endpoint.
+
+import threading
+import time
+from .database import QueryStats, current_query_stats
+
+# Upper bounds of the latency histogram buckets, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the queries-per-request histogram buckets.
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Label used for requests that did not match any route (404s, for example).
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    # Cumulative (bound, count) pairs, ending with +Inf, as Prometheus expects.
+    def cumulative(self) -> list:
+        pairs = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            pairs.append((_format_value(bound), running))
+        pairs.append(("+Inf", self.count))
+        return pairs
+
+
+# Everything recorded for one method and route template.
+class RouteMetrics:
+    __slots__ = ("latency", "queries", "db_seconds", "rows", "responses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_seconds = 0.0
+        self.rows = 0
+        # status code -> number of responses
+        self.responses: dict = {}
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: dict = {}
+
+    def observe(self, method: str, route: str, status_code: int, duration: float, stats: QueryStats):
+        with self._lock:
+            metrics = self._routes.get((method, route))
+            if metrics is None:
+                metrics = self._routes[(method, route)] = RouteMetrics()
+            metrics.latency.observe(duration)
+            metrics.queries.observe(stats.queries)
+            metrics.db_seconds += stats.duration
+            metrics.rows += stats.rows
+            metrics.responses[status_code] = metrics.responses.get(status_code, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+    # All metrics in the Prometheus text exposition format.
+    def render(self) -> str:
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = []
+
+            _header(lines, "http_requests_total", "counter", "Responses sent, by route template and status code.")
+            for (method, route), metrics in routes:
+                for status_code, count in sorted(metrics.responses.items()):
+                    lines.append(f'http_requests_total{_labels(method=method, route=route, status=status_code)} {count}')
+
+            _header(lines, "http_request_duration_seconds", "histogram", "Request latency, by route template.")
+            for (method, route), metrics in routes:
+                _histogram(lines, "http_request_duration_seconds", metrics.latency, method=method, route=route)
+
+            _header(lines, "db_queries_per_request", "histogram", "Database queries executed per request, by route template.")
+            for (method, route), metrics in routes:
+                _histogram(lines, "db_queries_per_request", metrics.queries, method=method, route=route)
+
+            _header(lines, "db_query_duration_seconds_total", "counter", "Time spent executing database queries, by route template.")
+            for (method, route), metrics in routes:
+                lines.append(f"db_query_duration_seconds_total{_labels(method=method, route=route)} {_format_value(metrics.db_seconds)}")
+
+            _header(lines, "db_rows_fetched_total", "counter", "Rows fetched from the database, by route template.")
+            for (method, route), metrics in routes:
+                lines.append(f"db_rows_fetched_total{_labels(method=method, route=route)} {metrics.rows}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _header(lines: list, name: str, kind: str, help_text: str):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _histogram(lines: list, name: str, histogram: Histogram, **labels):
+    for bound, count in histogram.cumulative():
+        lines.append(f"{name}_bucket{_labels(**labels, le=bound)} {count}")
+    lines.append(f"{name}_sum{_labels(**labels)} {_format_value(histogram.sum)}")
+    lines.append(f"{name}_count{_labels(**labels)} {histogram.count}")
+
+
+def _labels(**labels) -> str:
+    escaped = (
+        f'{name}="' + str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+# Value of the Server-Timing header: database time, the rest of the handling time and the total.
+def server_timing(stats: QueryStats, duration: float) -> str:
+    db_ms = stats.duration * 1000
+    total_ms = duration * 1000
+    return (
+        f'db;dur={db_ms:.2f};desc="{stats.queries} queries, {stats.rows} rows", '
+        f"app;dur={max(total_ms - db_ms, 0.0):.2f}, "
+        f"total;dur={total_ms:.2f}"
+    )
+
+
+# ASGI middleware that measures every HTTP request. The route template is read from the
+# scope after the request was handled, so /rooms/1 and /rooms/2 share one series.
+class MetricsMiddleware:
+    def __init__(self, app, registry: MetricsRegistry, server_timing_header: bool = False):
+        self.app = app
+        self.registry = registry
+        self.server_timing_header = server_timing_header
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        status_code = 500
+
+        async def send_with_metrics(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.server_timing_header:
+                    header = server_timing(stats, time.perf_counter() - start)
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            current_query_stats.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or UNMATCHED_ROUTE
+            self.registry.observe(scope["method"], template, status_code, time.perf_counter() - start, stats)
+
+
+metrics = MetricsRegistry()
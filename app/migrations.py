@@ -0,0 +1,157 @@
+# app/migrations.py
+#
+# Schema setup and idempotent upgrades for databases created before a model change.
+# Missing tables are created with the current schema and existing databases are
+# brought up to date with:
+#
+#     python -m app.migrations            # create missing tables, apply all migrations
+#     python -m app.migrations --dry-run  # only report what would change
+
+import argparse
+from typing import Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine, Connection
+from .database import Base, get_engine
+from .occupancy import repair_counters
+# Importing the models registers their tables on Base.metadata.
+from . import models  # noqa: F401
+
+BOOKING_SEAT_CONSTRAINT = "uq_booking_schedule_seat"
+BOOKING_SEAT_COLUMNS = ["schedule_id", "row", "seat"]
+
+
+def _has_unique_seat_key(connection: Connection) -> bool:
+    inspector = inspect(connection)
+    for constraint in inspector.get_unique_constraints("bookings"):
+        if constraint["column_names"] == BOOKING_SEAT_COLUMNS:
+            return True
+    for index in inspector.get_indexes("bookings"):
+        if index.get("unique") and index["column_names"] == BOOKING_SEAT_COLUMNS:
+            return True
+    return False
+
+
+# Create the tables that do not exist yet. They get the current schema, so the
+# migrations below find nothing to change in them.
+def create_missing_tables(connection: Connection, dry_run: bool = False) -> list:
+    existing = set(inspect(connection).get_table_names())
+    missing = [table for table in Base.metadata.sorted_tables if table.name not in existing]
+    if missing and not dry_run:
+        Base.metadata.create_all(connection, tables=missing)
+    return [f"create table {table.name}" for table in missing]
+
+
+# Make (schedule_id, row, seat) unique in bookings. Duplicate bookings of the same
+# seat are resolved first by keeping the earliest booking (lowest ID) of each seat.
+def add_booking_seat_constraint(connection: Connection, dry_run: bool = False) -> list:
+    if _has_unique_seat_key(connection):
+        return []
+
+    duplicates = connection.execute(text(
+        "SELECT b.id, b.schedule_id, b.row, b.seat FROM bookings b "
+        "WHERE b.id NOT IN ("
+        "  SELECT MIN(id) FROM bookings GROUP BY schedule_id, row, seat"
+        ") ORDER BY b.id"
+    )).all()
+
+    notes = [
+        f"remove duplicate booking {booking_id} (schedule {schedule_id}, row {row}, seat {seat})"
+        for booking_id, schedule_id, row, seat in duplicates
+    ]
+    notes.append(f"add unique constraint {BOOKING_SEAT_CONSTRAINT} on bookings ({', '.join(BOOKING_SEAT_COLUMNS)})")
+    if dry_run:
+        return notes
+
+    if duplicates:
+        connection.execute(
+            text("DELETE FROM bookings WHERE id = :id"),
+            [{"id": booking_id} for booking_id, *_ in duplicates]
+        )
+
+    # SQLite cannot add a constraint to an existing table; a unique index enforces the same rule.
+    if connection.dialect.name == "sqlite":
+        connection.execute(text(
+            f"CREATE UNIQUE INDEX {BOOKING_SEAT_CONSTRAINT} ON bookings (schedule_id, row, seat)"
+        ))
+    else:
+        connection.execute(text(
+            f"ALTER TABLE bookings ADD CONSTRAINT {BOOKING_SEAT_CONSTRAINT} UNIQUE (schedule_id, row, seat)"
+        ))
+    return notes
+
+
+# Give movies a nullable runtime; existing movies use the default runtime until one is set.
+def add_movie_runtime_column(connection: Connection, dry_run: bool = False) -> list:
+    columns = {column["name"] for column in inspect(connection).get_columns("movies")}
+    if "runtime_minutes" in columns:
+        return []
+    if not dry_run:
+        connection.execute(text("ALTER TABLE movies ADD COLUMN runtime_minutes INTEGER"))
+    return ["add column movies.runtime_minutes"]
+
+
+# Give schedules their booked-seat counter, filled in from the existing bookings.
+def add_schedule_booked_seats_column(connection: Connection, dry_run: bool = False) -> list:
+    columns = {column["name"] for column in inspect(connection).get_columns("schedules")}
+    if "booked_seats" in columns:
+        return []
+    if dry_run:
+        return ["add column schedules.booked_seats and count the existing bookings"]
+    connection.execute(text("ALTER TABLE schedules ADD COLUMN booked_seats INTEGER NOT NULL DEFAULT 0"))
+    return [f"add column schedules.booked_seats ({repair_counters(connection)} schedules with bookings counted)"]
+
+
+# Create the indexes declared on the models that an existing table does not have yet,
+# such as the composite schedule indexes used by the conflict checks and the search.
+def add_missing_indexes(connection: Connection, dry_run: bool = False) -> list:
+    notes = []
+    inspector = inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            if index.name in existing:
+                continue
+            if not dry_run:
+                index.create(connection)
+            notes.append(f"add index {index.name} on {table.name} ({', '.join(column.name for column in index.columns)})")
+    return notes
+
+
+# Migrations in the order they must be applied. Each one checks the live schema
+# and returns a list of human-readable notes describing what it changed.
+MIGRATIONS = [
+    add_booking_seat_constraint,
+    add_movie_runtime_column,
+    add_schedule_booked_seats_column,
+    add_missing_indexes,
+]
+
+
+def run_migrations(engine: Optional[Engine] = None, dry_run: bool = False) -> list:
+    engine = engine or get_engine()
+    with engine.begin() as connection:
+        notes = create_missing_tables(connection, dry_run=dry_run)
+        # In a dry run on a new database there is nothing to migrate yet.
+        if not inspect(connection).has_table("bookings"):
+            return notes
+        for migration in MIGRATIONS:
+            notes.extend(migration(connection, dry_run=dry_run))
+    return notes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create or upgrade the cinema booking database.")
+    parser.add_argument("--dry-run", action="store_true", help="Report the changes without applying them.")
+    args = parser.parse_args(argv)
+
+    notes = run_migrations(dry_run=args.dry_run)
+    if not notes:
+        print("Database is up to date.")
+        return
+    print("Pending changes:" if args.dry_run else "Applied changes:")
+    for note in notes:
+        print(f"- {note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 # app/models.py
 
-from sqlalchemy import Column, Integer, String, Time, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Time, Date, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from .database import Base
 
@@ -17,21 +17,36 @@ class Movie(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, unique=True, index=True)
     poster = Column(String)
+    # Running time in minutes; schedules assume settings.default_runtime_minutes when unset.
+    runtime_minutes = Column(Integer, nullable=True)
     schedules = relationship("Schedule", back_populates="movie")
 
 class Schedule(Base):
     __tablename__ = "schedules"
+    # Conflict checks load one room's schedules around a date, and the showtime search
+    # scans a date range, optionally for one movie. Existing databases get these from app.migrations.
+    __table_args__ = (
+        Index("ix_schedules_room_date", "room_id", "show_date"),
+        Index("ix_schedules_date_time", "show_date", "start_time"),
+        Index("ix_schedules_movie_date", "movie_id", "show_date"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     show_date = Column(Date, index=True)
     start_time = Column(Time, index=True)
     room_id = Column(Integer, ForeignKey("rooms.id"))
     movie_id = Column(Integer, ForeignKey("movies.id"))
+    # Seats booked so far, kept up to date by the booking transactions (see app.occupancy).
+    booked_seats = Column(Integer, nullable=False, default=0, server_default="0")
     room = relationship("Room", back_populates="schedules")
     movie = relationship("Movie", back_populates="schedules")
     bookings = relationship("Booking", back_populates="schedule")
 
 class Booking(Base):
     __tablename__ = "bookings"
+    # A seat can be booked only once per schedule; existing databases get this from app.migrations.
+    __table_args__ = (
+        UniqueConstraint("schedule_id", "row", "seat", name="uq_booking_schedule_seat"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     schedule_id = Column(Integer, ForeignKey("schedules.id"))
     row = Column(Integer)
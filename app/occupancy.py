@@ -0,0 +1,90 @@
+# app/occupancy.py
+#
+# Per-schedule booked-seat counters. schedules.booked_seats is updated in the same
+# transaction as every booking insert, so occupancy and sold-out checks read one column
+# instead of counting bookings. Counters drift only when bookings are written or deleted
+# outside the API; verify and repair them with:
+#
+#     python -m app.occupancy           # report schedules whose counter is wrong
+#     python -m app.occupancy --repair  # recompute those counters from bookings
+
+import argparse
+import sys
+from typing import Optional
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.engine import Engine
+from . import models
+from .database import get_engine
+
+# Schedules listed in the report; further drifted counters are only counted.
+REPORT_LIMIT = 50
+
+
+# Statement adding `seats` newly booked seats to a schedule's counter. Run it in the
+# transaction that inserts the bookings.
+def count_booked(schedule_id: int, seats: int):
+    return (
+        update(models.Schedule)
+        .where(models.Schedule.id == schedule_id)
+        .values(booked_seats=models.Schedule.booked_seats + seats)
+    )
+
+
+# Statement adding newly booked seats to the counters of several schedules at once.
+# Execute it with one {"schedule_id": ..., "seats": ...} parameter set per schedule.
+def count_booked_many():
+    schedules = models.Schedule.__table__
+    return (
+        update(schedules)
+        .where(schedules.c.id == bindparam("schedule_id"))
+        .values(booked_seats=schedules.c.booked_seats + bindparam("seats"))
+    )
+
+
+# (schedule_id, stored counter, actual bookings) for every schedule whose counter is wrong.
+# Works with a Connection or a Session.
+def drifted_counters(connection) -> list:
+    actual = func.count(models.Booking.id)
+    return connection.execute(
+        select(models.Schedule.id, models.Schedule.booked_seats, actual)
+        .outerjoin(models.Booking, models.Booking.schedule_id == models.Schedule.id)
+        .group_by(models.Schedule.id)
+        .having(models.Schedule.booked_seats != actual)
+        .order_by(models.Schedule.id)
+    ).all()
+
+
+# Recompute the wrong counters from bookings in one statement. Returns how many changed.
+def repair_counters(connection) -> int:
+    actual = select(func.count(models.Booking.id)).where(models.Booking.schedule_id == models.Schedule.id).scalar_subquery()
+    result = connection.execute(
+        update(models.Schedule)
+        .where(models.Schedule.booked_seats != actual)
+        .values(booked_seats=actual)
+    )
+    return result.rowcount
+
+
+def main(argv=None, engine: Optional[Engine] = None):
+    parser = argparse.ArgumentParser(description="Verify or repair the booked-seat counters of schedules.")
+    parser.add_argument("--repair", action="store_true", help="Recompute drifted counters from bookings.")
+    args = parser.parse_args(argv)
+
+    engine = engine or get_engine()
+    with engine.begin() as connection:
+        drifted = drifted_counters(connection)
+        if not drifted:
+            print("All booked-seat counters match the bookings.")
+            return
+        for schedule_id, stored, actual in drifted[:REPORT_LIMIT]:
+            print(f"- schedule {schedule_id}: counter {stored}, bookings {actual}")
+        if len(drifted) > REPORT_LIMIT:
+            print(f"- ... and {len(drifted) - REPORT_LIMIT} more")
+        if not args.repair:
+            print(f"{len(drifted)} counters drifted; run with --repair to fix them.")
+            sys.exit(1)
+        print(f"Repaired {repair_counters(connection)} counters.")
+
+
+if __name__ == "__main__":
+    main()
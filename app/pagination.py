@@ -0,0 +1,77 @@
+# app/pagination.py
+#
+# Keyset pagination and sparse fieldsets shared by the list endpoints.
+# Pages are ordered by ID: the next page starts after the last ID of the previous one,
+# so every page costs an index range scan no matter how deep the client has paged.
+
+from typing import Callable, Optional
+from fastapi import HTTPException, Query, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+# Query parameters common to all paginated endpoints.
+class PageParams:
+    def __init__(
+        self,
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT, description="Maximum number of items to return."),
+        cursor: Optional[int] = Query(None, ge=0, description="The `next_cursor` of the previous page; omit it for the first page."),
+        fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. `id,title`. The ID is always included.")
+    ):
+        self.limit = limit
+        self.cursor = cursor
+        self.fields = fields
+
+
+# Resolve the `fields` parameter against the columns an endpoint allows.
+# Returns None when all fields were requested.
+def select_fields(fields: Optional[str], columns: dict) -> Optional[dict]:
+    if not fields:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in columns]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}. Allowed fields: {', '.join(columns)}"
+        )
+    selected = {"id": columns["id"]}
+    for name in names:
+        selected[name] = columns[name]
+    return selected
+
+
+# Restrict a query (a sync Query or a select() statement) to one page: rows after the
+# cursor, in ID order, plus one extra row that tells whether another page follows.
+def paginate(statement, id_column, params: PageParams):
+    if params.cursor is not None:
+        statement = statement.where(id_column > params.cursor)
+    return statement.order_by(id_column).limit(params.limit + 1)
+
+
+# Split the fetched rows into the page items and the cursor of the next page.
+def page(rows: list, params: PageParams, key: Callable = lambda item: item.id) -> dict:
+    items = rows[:params.limit]
+    next_cursor = key(items[-1]) if len(rows) > params.limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+# Build the response for a projected page directly from column rows. It bypasses the
+# endpoint's response model, which describes full items; `formatters` keep field
+# formatting identical to the full representation.
+def projected_page(rows: list, selected: dict, params: PageParams, formatters: Optional[dict] = None) -> JSONResponse:
+    formatters = formatters or {}
+    names = list(selected)
+    items = []
+    for row in rows[:params.limit]:
+        item = {}
+        for name, value in zip(names, row):
+            if name in formatters and value is not None:
+                value = formatters[name](value)
+            item[name] = value
+        items.append(item)
+    next_cursor = items[-1]["id"] if len(rows) > params.limit else None
+    return JSONResponse(content=jsonable_encoder({"items": items, "next_cursor": next_cursor}))
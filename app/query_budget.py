@@ -0,0 +1,172 @@
+# app/query_budget.py
+#
+# Query budgets and N+1 detection, built on the engine events.
+#
+# Every endpoint declares how many queries it may run with @budget(n). In development
+# (QUERY_DEBUG=true) each request's statements are recorded: a request over its endpoint's
+# budget, or one that runs the same statement repeatedly (the signature of a lazy load in a
+# loop), is logged with the route and the application code that issued the statements.
+#
+# QueryBudget counts every statement the engines run inside a block, from any thread, so a
+# test can wrap a TestClient call in it:
+#
+#     with QueryBudget(2):
+#         client.get("/rooms/1")
+
+import logging
+import traceback
+from collections import Counter
+from contextlib import ContextDecorator
+from pathlib import Path
+from sqlalchemy import event
+from .database import QueryStats, current_query_stats, sync_engines
+
+logger = logging.getLogger("app.queries")
+
+# A statement run this many times in one request is reported as a likely N+1.
+REPEATED_STATEMENT_THRESHOLD = 2
+
+# Application frames shown for each reported statement.
+STACK_DEPTH = 6
+
+_PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+# Instrumentation modules, left out of the reported stacks.
+_OWN_FILES = tuple(str(Path(__file__).with_name(name)) for name in ("query_budget.py", "database.py", "metrics.py"))
+
+try:
+    import greenlet
+except ImportError:
+    greenlet = None
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+# Budget of endpoints whose query count grows with the request, such as bulk imports.
+UNBOUNDED = float("inf")
+
+
+# Mark an endpoint with the number of queries it may run per request. Place it below
+# the route decorator so the route registers the marked function.
+def budget(max_queries: int):
+    def mark(endpoint):
+        endpoint.query_budget = max_queries
+        return endpoint
+    return mark
+
+
+# Routes ("GET /path") of an app whose endpoints do not declare a budget.
+def unbudgeted_routes(app) -> list:
+    return [
+        f"{','.join(sorted(route.methods))} {route.path}" for route in app.routes
+        if hasattr(route, "endpoint") and getattr(route, "include_in_schema", False)
+        and getattr(route.endpoint, "query_budget", None) is None
+    ]
+
+
+def _is_app_frame(filename: str) -> bool:
+    return filename.startswith(_PROJECT_ROOT) and "site-packages" not in filename and filename not in _OWN_FILES
+
+
+# The application frames that led to the current statement. Async sessions run the
+# statement in a child greenlet, so the awaiting code is found on a parent greenlet.
+def caller_stack() -> list:
+    frames = [frame for frame in traceback.extract_stack() if _is_app_frame(frame.filename)]
+    if not frames and greenlet is not None:
+        parent = greenlet.getcurrent().parent
+        while parent is not None and not frames:
+            if parent.gr_frame is not None:
+                frames = [frame for frame in traceback.extract_stack(parent.gr_frame) if _is_app_frame(frame.filename)]
+            parent = parent.parent
+    return frames[-STACK_DEPTH:]
+
+
+def _format_stack(frames: list) -> str:
+    return "".join(traceback.format_list(frames)) or "  (no application frames)\n"
+
+
+# Counts the statements run inside a `with` block (or a decorated function) and raises
+# QueryBudgetExceeded, listing them, if there were more than max_queries.
+class QueryBudget(ContextDecorator):
+    def __init__(self, max_queries: int):
+        self.max_queries = max_queries
+        self.statements: list = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        for sync_engine in sync_engines():
+            event.listen(sync_engine, "after_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        for sync_engine in sync_engines():
+            event.remove(sync_engine, "after_cursor_execute", self._record)
+        if exc_type is None and len(self.statements) > self.max_queries:
+            listing = "\n".join(f"  {index}. {statement}" for index, statement in enumerate(self.statements, 1))
+            raise QueryBudgetExceeded(
+                f"{len(self.statements)} queries run, budget is {self.max_queries}:\n{listing}"
+            )
+        return False
+
+
+# Record the statements (with their application stack) of the request being measured.
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    stats = current_query_stats.get()
+    if stats is not None and stats.statements is not None:
+        stats.statements.append((statement, caller_stack()))
+
+
+def install_statement_recorder():
+    for sync_engine in sync_engines():
+        if not event.contains(sync_engine, "after_cursor_execute", _record_statement):
+            event.listen(sync_engine, "after_cursor_execute", _record_statement)
+
+
+# Log budget overruns and repeated statements of one request.
+def report_request(method: str, route, stats: QueryStats):
+    template = getattr(route, "path", None) or "unmatched"
+    statements = stats.statements or []
+
+    max_queries = getattr(getattr(route, "endpoint", None), "query_budget", None)
+    if max_queries is not None and len(statements) > max_queries:
+        listing = "".join(f"  {index}. {statement}\n{_format_stack(stack)}" for index, (statement, stack) in enumerate(statements, 1))
+        logger.error("%s %s ran %d queries, budget is %d:\n%s", method, template, len(statements), max_queries, listing)
+
+    counts = Counter(statement for statement, _ in statements)
+    for statement, count in counts.items():
+        if count >= REPEATED_STATEMENT_THRESHOLD:
+            stack = next(stack for recorded, stack in statements if recorded == statement)
+            logger.warning(
+                "%s %s ran the same statement %d times (possible N+1):\n  %s\nfirst issued from:\n%s",
+                method, template, count, statement, _format_stack(stack)
+            )
+
+
+# ASGI middleware that records each request's statements and reports them afterwards.
+# It reuses the stats of the metrics middleware when that one runs around it.
+class QueryDebugMiddleware:
+    def __init__(self, app):
+        self.app = app
+        install_statement_recorder()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = current_query_stats.get()
+        token = None
+        if stats is None:
+            stats = QueryStats()
+            token = current_query_stats.set(stats)
+        stats.statements = []
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if token is not None:
+                current_query_stats.reset(token)
+            report_request(scope["method"], scope.get("route"), stats)
@@ -0,0 +1,162 @@
+# app/response_cache.py
+#
+# In-process cache of rendered catalog responses (movies and rooms).
+# Every write to movies, rooms or schedules bumps a version number, which makes all
+# cached responses stale at once. Responses that embed schedules' booked-seat counts
+# (rooms with their schedules) also depend on a bookings version, which every booking
+# commit bumps without touching the rest of the catalog. Responses carry a strong ETag
+# (a hash of the body), so a client revalidating with If-None-Match gets a 304 without
+# touching the database. Entries also expire after a TTL, which bounds staleness from
+# writes handled by other worker processes.
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import urlencode
+from fastapi import Request, Response
+from .config import settings
+from .serialization import render_json
+
+
+class CachedResponse:
+    __slots__ = ("version", "bookings_version", "etag", "body", "stored_at")
+
+    def __init__(self, version: int, bookings_version: Optional[int], etag: str, body: bytes, stored_at: float):
+        self.version = version
+        # None for responses that do not include booked-seat counts
+        self.bookings_version = bookings_version
+        self.etag = etag
+        self.body = body
+        self.stored_at = stored_at
+
+
+# True if an If-None-Match header value matches the ETag (weak comparison, as RFC 9110 requires).
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int, ttl: float, max_age: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.version = 0
+        self.bookings_version = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        self.booking_invalidations = 0
+
+    def _headers(self, etag: str) -> dict:
+        return {"ETag": etag, "Cache-Control": f"public, max-age={self.max_age}, must-revalidate"}
+
+    def _respond(self, entry: CachedResponse, if_none_match: Optional[str]) -> Response:
+        if etag_matches(if_none_match, entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=self._headers(entry.etag))
+        return Response(content=entry.body, media_type="application/json", headers=self._headers(entry.etag))
+
+    def _is_current(self, version: int, bookings_version: Optional[int]) -> bool:
+        return version == self.version and (bookings_version is None or bookings_version == self.bookings_version)
+
+    # Look up the response for a request. The returned lookup carries a ready response
+    # on a hit; otherwise the endpoint computes its payload and passes it to lookup.store().
+    # Pass bookings=True when the response includes booked-seat counts.
+    def lookup(self, request: Request, bookings: bool = False) -> "CacheLookup":
+        # Parameters are sorted so their order does not matter, and re-encoded so a value
+        # containing "&" or "=" cannot collide with a different set of parameters.
+        key = request.url.path + "?" + urlencode(sorted(request.query_params.multi_items()))
+        if_none_match = request.headers.get("if-none-match")
+        with self._lock:
+            bookings_version = self.bookings_version if bookings else None
+            entry = self._entries.get(key)
+            if (
+                entry is not None and self._is_current(entry.version, entry.bookings_version)
+                and time.monotonic() - entry.stored_at < self.ttl
+            ):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return CacheLookup(self, key, self.version, bookings_version, if_none_match, self._respond(entry, if_none_match))
+            self.misses += 1
+            return CacheLookup(self, key, self.version, bookings_version, if_none_match, None)
+
+    def _store(self, lookup: "CacheLookup", payload) -> Response:
+        body = render_json(payload)
+        etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        entry = CachedResponse(lookup.version, lookup.bookings_version, etag, body, time.monotonic())
+        with self._lock:
+            # A write that happened while the payload was computed makes it stale already.
+            if self._is_current(lookup.version, lookup.bookings_version):
+                self._entries[lookup.key] = entry
+                self._entries.move_to_end(lookup.key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            return self._respond(entry, lookup.if_none_match)
+
+    # Called after every committed write that can change a cached response.
+    def invalidate(self):
+        with self._lock:
+            self.version += 1
+            self.invalidations += 1
+            self._entries.clear()
+
+    # Called after every committed booking. Responses with booked-seat counts become
+    # stale; they are replaced or evicted as requests come in.
+    def invalidate_bookings(self):
+        with self._lock:
+            self.bookings_version += 1
+            self.booking_invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "not_modified": self.not_modified,
+                "invalidations": self.invalidations,
+                "booking_invalidations": self.booking_invalidations
+            }
+
+
+class CacheLookup:
+    __slots__ = ("cache", "key", "version", "bookings_version", "if_none_match", "response")
+
+    def __init__(
+        self,
+        cache: ResponseCache,
+        key: str,
+        version: int,
+        bookings_version: Optional[int],
+        if_none_match: Optional[str],
+        response: Optional[Response]
+    ):
+        self.cache = cache
+        self.key = key
+        self.version = version
+        self.bookings_version = bookings_version
+        self.if_none_match = if_none_match
+        self.response = response
+
+    # Render and cache the payload (a pydantic model, JSON-compatible data or a
+    # JSONResponse) and return the response for this request.
+    def store(self, payload) -> Response:
+        return self.cache._store(self, payload)
+
+
+catalog_cache = ResponseCache(
+    max_entries=settings.catalog_cache_max_entries,
+    ttl=settings.catalog_cache_ttl,
+    max_age=settings.catalog_cache_max_age
+)
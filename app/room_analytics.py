@@ -0,0 +1,170 @@
+# app/room_analytics.py
+#
+# Seat popularity and occupancy analytics of a room over a date range. All the counting
+# is done by two SQL aggregates: bookings per (row, seat), read from the bookings'
+# (schedule_id, row, seat) index, and schedules with their booked seats per movie,
+# weekday and start time, read from the schedules' booked-seat counters. Python only
+# folds the aggregated rows into the response, so its work depends on the room size and
+# the number of distinct movies and slots, not on how many bookings the range holds.
+#
+# Results for ranges that lie entirely in the past are kept in an in-process cache.
+# Entries are keyed by the catalog cache version, so any write to rooms or schedules
+# drops them, and by the booked seats of the range's schedules (summed from their
+# counters), so bookings made for past shows do too.
+
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Optional
+from sqlalchemy import extract, func, select
+from . import models, schemas
+from .config import settings
+from .response_cache import catalog_cache
+from .schemas import format_start_time
+
+WEEKDAYS = list(schemas.Weekday)
+
+
+# How often each seat of the room was booked: (row, seat, bookings).
+def seat_count_query(room_id: int, date_from: date, date_to: date):
+    return (
+        select(models.Booking.row, models.Booking.seat, func.count())
+        .join(models.Booking.schedule)
+        .where(models.Schedule.room_id == room_id, models.Schedule.show_date.between(date_from, date_to))
+        .group_by(models.Booking.row, models.Booking.seat)
+    )
+
+
+# Schedules and booked seats per movie, weekday (0 is Sunday) and start time:
+# (movie_id, title, weekday, start_time, schedules, booked).
+def occupancy_query(room_id: int, date_from: date, date_to: date):
+    weekday = extract("dow", models.Schedule.show_date)
+    return (
+        select(
+            models.Schedule.movie_id,
+            models.Movie.title,
+            weekday,
+            models.Schedule.start_time,
+            func.count(models.Schedule.id),
+            func.sum(models.Schedule.booked_seats)
+        )
+        .join(models.Schedule.movie)
+        .where(models.Schedule.room_id == room_id, models.Schedule.show_date.between(date_from, date_to))
+        .group_by(models.Schedule.movie_id, models.Movie.title, weekday, models.Schedule.start_time)
+    )
+
+
+# Booked seats of the room's schedules in the range, from their counters.
+def booked_total_query(room_id: int, date_from: date, date_to: date):
+    return (
+        select(func.coalesce(func.sum(models.Schedule.booked_seats), 0))
+        .where(models.Schedule.room_id == room_id, models.Schedule.show_date.between(date_from, date_to))
+    )
+
+
+def _occupancy(schedules: int, booked: int, capacity: int) -> dict:
+    seats = schedules * capacity
+    return {
+        "schedules": schedules,
+        "booked": booked,
+        "seats": seats,
+        "occupancy": round(booked / seats, 4) if seats else 0.0
+    }
+
+
+# Assemble the response of GET /rooms/{room_id}/analytics from the two aggregates.
+def build_analytics(room, date_from: date, date_to: date, seat_counts, occupancy_rows) -> dict:
+    seat_bookings = [[0] * room.seats_per_row for _ in range(room.rows)]
+    for row, seat, bookings in seat_counts:
+        if 1 <= row <= room.rows and 1 <= seat <= room.seats_per_row:
+            seat_bookings[row - 1][seat - 1] = bookings
+
+    movies, weekdays, slots = {}, {}, {}
+    for movie_id, title, weekday, start_time, schedules, booked in occupancy_rows:
+        booked = booked or 0
+        for totals, key in (
+            (movies, (title, movie_id)),
+            (weekdays, (int(weekday) + 6) % 7),
+            (slots, start_time)
+        ):
+            counts = totals.setdefault(key, [0, 0])
+            counts[0] += schedules
+            counts[1] += booked
+
+    capacity = room.rows * room.seats_per_row
+    schedules = sum(counts[0] for counts in slots.values())
+    booked = sum(counts[1] for counts in slots.values())
+    # Keys follow the field order of schemas.RoomAnalytics, so both JSON modes match.
+    return {
+        **_occupancy(schedules, booked, capacity),
+        "room_id": room.id,
+        "date_from": date_from.isoformat(),
+        "date_to": date_to.isoformat(),
+        "rows": room.rows,
+        "seats_per_row": room.seats_per_row,
+        "seat_bookings": seat_bookings,
+        "by_movie": [
+            {**_occupancy(*movies[(title, movie_id)], capacity), "movie_id": movie_id, "title": title}
+            for title, movie_id in sorted(movies)
+        ],
+        "by_weekday": [
+            {**_occupancy(*weekdays[weekday], capacity), "weekday": WEEKDAYS[weekday].value}
+            for weekday in sorted(weekdays)
+        ],
+        "by_time_slot": [
+            {**_occupancy(*slots[start_time], capacity), "start_time": format_start_time(start_time)}
+            for start_time in sorted(slots)
+        ]
+    }
+
+
+# In-process LRU of analytics for past date ranges.
+class AnalyticsCache:
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, dict]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    # Only ranges that lie entirely in the past are cached.
+    def cacheable(self, date_to: date) -> bool:
+        return date_to < date.today()
+
+    # The cache key for a past range; `booked` is the result of booked_total_query().
+    def key(self, room_id: int, date_from: date, date_to: date, booked: int) -> tuple:
+        return (catalog_cache.version, room_id, date_from, date_to, booked)
+
+    def get(self, key: Optional[tuple]) -> Optional[dict]:
+        if key is None:
+            return None
+        with self._lock:
+            analytics = self._entries.get(key)
+            if analytics is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return analytics
+
+    def put(self, key: Optional[tuple], analytics: dict):
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key] = analytics
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+analytics_cache = AnalyticsCache(max_entries=settings.analytics_cache_max_entries)
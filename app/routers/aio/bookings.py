@@ -0,0 +1,335 @@
+# app/routers/aio/bookings.py
+#
+# Async version of app/routers/bookings.py, served when ASYNC_MODE is enabled.
+
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status, Path, Query, Header, Response
+from typing import Optional
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from ... import schemas, models, seat_codec
+from ...database import get_async_db
+from ...query_budget import budget
+from ...serialization import respond
+from ...occupancy import count_booked
+from ...seat_state import seat_state, rebuild_async
+from ...seat_holds import seat_holds
+from ...booking_writer import booking_writer, SeatTaken
+from ..common.bookings import (
+    SEAT_MAP_RESPONSES, SEAT_MAP_FORMAT_DESCRIPTION, ACCEPT_DESCRIPTION, BEST_AVAILABLE_ATTEMPTS,
+    movie_room_schedule_query, booked_seats_query, schedule_or_404, movie_room_schedule_or_404,
+    room_or_404, seat_map_response, check_seat, seat_taken, check_seats, raise_for_held, raise_for_booked,
+    find_block, best_available_response, best_available_taken, place_hold, hold_lost, booking_values,
+    booking_rows, bookings_written
+)
+
+router = APIRouter(
+    prefix="/bookings",
+    tags=["bookings"],
+)
+
+# Endpoint to get seating availability by movie and room
+@router.get(
+    "/movies/{movie_id}/rooms/{room_id}/seats",
+    summary="Get seating availability for a movie in a room",
+    description="Retrieve the seating layout for a specific movie within a room, showing which seats are available or booked. When the movie is shown in the room more than once, the earliest schedule is used. Returns a 404 error if the movie, room, or schedule is not found. Seats on hold are shown as booked.",
+    responses=SEAT_MAP_RESPONSES
+)
+@budget(3)
+async def get_available_seats_by_movie_and_room(
+    response: Response,
+    movie_id: int = Path(..., description="The unique ID of the movie."),
+    room_id: int = Path(..., description="The unique ID of the room."),
+    seat_map_format: Optional[schemas.SeatMapFormat] = Query(None, alias="format", description=SEAT_MAP_FORMAT_DESCRIPTION),
+    accept: Optional[str] = Header(None, description=ACCEPT_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    seat_map_format = seat_codec.resolve_format(seat_map_format, accept)
+    response.headers["Vary"] = "Accept"
+
+    # Answer from the in-memory seat state when this schedule is already cached
+    schedule_id = seat_state.schedule_for(movie_id, room_id)
+    bitmap = seat_state.get(schedule_id) if schedule_id is not None else None
+    if bitmap is not None:
+        return seat_map_response(bitmap, seat_map_format)
+
+    # Find the schedule for the given movie and room
+    schedule = movie_room_schedule_or_404(await db.scalar(movie_room_schedule_query(movie_id, room_id)))
+    seat_state.remember_schedule(movie_id, room_id, schedule.id)
+
+    # Load the room and booked seats into the seat state
+    bitmap = room_or_404(seat_state.get(schedule.id) or await rebuild_async(db, schedule))
+    return seat_map_response(bitmap, seat_map_format)
+
+# Endpoint to get the seating layout and availability for a specific schedule
+@router.get(
+    "/{schedule_id}/seats",
+    summary="Get seating availability for a specific schedule",
+    description="Retrieve the seating layout for a given schedule, showing which seats are available or booked. This endpoint provides a detailed map of the room, including row and seat numbers, and their current booking status. Seats on hold are shown as booked.",
+    responses=SEAT_MAP_RESPONSES
+)
+@budget(3)
+async def get_available_seats(
+    response: Response,
+    schedule_id: int = Path(..., description="The unique ID of the schedule to check."),
+    seat_map_format: Optional[schemas.SeatMapFormat] = Query(None, alias="format", description=SEAT_MAP_FORMAT_DESCRIPTION),
+    accept: Optional[str] = Header(None, description=ACCEPT_DESCRIPTION),
+    db: AsyncSession = Depends(get_async_db)
+):
+    seat_map_format = seat_codec.resolve_format(seat_map_format, accept)
+    response.headers["Vary"] = "Accept"
+
+    bitmap = seat_state.get(schedule_id)
+    if bitmap is not None:
+        return seat_map_response(bitmap, seat_map_format)
+
+    schedule = schedule_or_404(await db.get(models.Schedule, schedule_id))
+    return seat_map_response(room_or_404(await rebuild_async(db, schedule)), seat_map_format)
+
+# Endpoint to find the best block of adjacent free seats for a party
+@router.get(
+    "/{schedule_id}/best-available",
+    response_model=schemas.BestAvailableSeats,
+    summary="Find the best available seats for a party",
+    description="Finds `party_size` adjacent free seats in one row, choosing the block whose center is closest to the center of the room. The response can be posted as is to `/bookings/group`, or use `POST /bookings/best-available` to find and book the seats in one request. Returns a 404 error if no row has enough adjacent free seats.",
+    responses={status.HTTP_404_NOT_FOUND: {"description": "Schedule not found, or no block of free seats is large enough."}}
+)
+@budget(3)
+async def find_best_available(
+    schedule_id: int = Path(..., description="The unique ID of the schedule to search."),
+    party_size: int = Query(..., ge=1, le=schemas.MAX_PARTY_SIZE, description="Number of adjacent seats wanted."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    bitmap = seat_state.get(schedule_id)
+    if bitmap is None:
+        schedule = schedule_or_404(await db.get(models.Schedule, schedule_id))
+        bitmap = room_or_404(await rebuild_async(db, schedule))
+
+    return best_available_response(schedule_id, find_block(bitmap, party_size, status.HTTP_404_NOT_FOUND))
+
+# Endpoint to rebuild the cached seat state of a schedule from the database
+@router.post(
+    "/{schedule_id}/seats/rebuild",
+    summary="Rebuild the seat state of a schedule",
+    description="Reloads the in-memory seat map of a schedule from the database, discarding any cached state, and returns the fresh seating layout. Useful after bookings were written outside this process. Seats on hold are shown as booked."
+)
+@budget(3)
+async def rebuild_seat_state(
+    schedule_id: int = Path(..., description="The unique ID of the schedule to rebuild."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    schedule = await db.get(models.Schedule, schedule_id)
+    if not schedule:
+        seat_state.invalidate(schedule_id)
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    bitmap = room_or_404(await rebuild_async(db, schedule))
+    return seat_holds.overlay(bitmap).to_response()
+
+# Insert a single booking, already checked with check_seat, and count it on its schedule in
+# one transaction. A violation of the unique (schedule_id, row, seat) constraint (the seat
+# is taken) becomes a 409. With BOOKING_WRITE_BATCHING the insert is left to the
+# group-commit writer, which commits it together with other bookings.
+async def _insert_booking(db: AsyncSession, schedule_id: int, row: int, seat: int) -> dict:
+    if booking_writer.enabled:
+        # End the read transaction so the connection is free while the batch is written
+        await db.close()
+        try:
+            return await asyncio.wrap_future(booking_writer.submit(schedule_id, row, seat))
+        except SeatTaken:
+            raise seat_taken()
+
+    timestamp = datetime.now()
+    try:
+        result = await db.execute(
+            insert(models.Booking).values(schedule_id=schedule_id, row=row, seat=seat, timestamp=timestamp)
+        )
+        await db.execute(count_booked(schedule_id, 1))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise seat_taken()
+
+    bookings_written(schedule_id, [(row, seat)])
+    return booking_rows(result.inserted_primary_key, schedule_id, [(row, seat)], timestamp)[0]
+
+# Endpoint to create a new booking using a schedule ID
+@router.post(
+    "/",
+    response_model=schemas.Booking,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a new booking by schedule ID",
+    description="Books a specific seat for a movie schedule. Validates that the seat is available and exists within the room's dimensions."
+)
+@budget(5)
+async def create_booking(booking: schemas.BookingCreate, db: AsyncSession = Depends(get_async_db)):
+    schedule = schedule_or_404(await db.get(models.Schedule, booking.schedule_id))
+    room = room_or_404(await db.get(models.Room, schedule.room_id))
+
+    # Check if the seat is valid for the room and not on hold
+    check_seat(room, schedule.id, booking.row, booking.seat)
+
+    # Insert directly; the unique seat constraint rejects seats that are already booked
+    return respond(await _insert_booking(db, schedule.id, booking.row, booking.seat), status_code=status.HTTP_201_CREATED)
+
+# Endpoint to create a booking using movie ID and room ID
+@router.post(
+    "/movie/{movie_id}/room/{room_id}/",
+    response_model=schemas.Booking,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a new booking by movie and room",
+    description="Books a specific seat for a movie in a room. First finds the corresponding schedule (the earliest, when the movie is shown in the room more than once), then validates and persists the booking."
+)
+@budget(5)
+async def create_booking_by_movie_and_room(
+    booking: schemas.BookingBase,
+    movie_id: int = Path(..., description="The unique ID of the movie."),
+    room_id: int = Path(..., description="The unique ID of the room."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Find the schedule for the given movie and room
+    schedule = movie_room_schedule_or_404(await db.scalar(movie_room_schedule_query(movie_id, room_id)))
+
+    # Use the schedule ID to check for seat validity and booking
+    room = room_or_404(await db.get(models.Room, room_id))
+    check_seat(room, schedule.id, booking.row, booking.seat)
+
+    # Create the booking using the found schedule ID
+    return respond(await _insert_booking(db, schedule.id, booking.row, booking.seat), status_code=status.HTTP_201_CREATED)
+
+# Endpoint to book several seats of one schedule at once
+@router.post(
+    "/group",
+    response_model=list[schemas.Booking],
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a group booking",
+    description="Books several seats for one schedule in a single transaction. Either all seats are booked or none are: a 400 error lists seats outside the room, and a 409 error lists every seat that is already booked or on hold for another customer.",
+    responses={status.HTTP_409_CONFLICT: {"model": schemas.SeatConflict}}
+)
+@budget(6)
+async def create_group_booking(booking: schemas.GroupBookingCreate, db: AsyncSession = Depends(get_async_db)):
+    schedule = schedule_or_404(await db.get(models.Schedule, booking.schedule_id))
+    room = room_or_404(await db.get(models.Room, schedule.room_id))
+
+    seats = check_seats(booking.seats, room.rows, room.seats_per_row)
+    raise_for_held(schedule.id, seats)
+
+    # Check all requested seats against existing bookings with one query
+    raise_for_booked(await _booked_seats(db, schedule.id, seats))
+
+    # A booking that commits between the check and the insert trips the unique constraint instead
+    schedule_id = schedule.id
+    try:
+        bookings = await _insert_seats(db, schedule_id, seats)
+    except IntegrityError:
+        raise_for_booked(await _booked_seats(db, schedule_id, seats))
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Some seats are already booked")
+    return respond(bookings, status_code=status.HTTP_201_CREATED)
+
+# Endpoint to find and book the best block of adjacent free seats for a party
+@router.post(
+    "/best-available",
+    response_model=list[schemas.Booking],
+    status_code=status.HTTP_201_CREATED,
+    summary="Book the best available seats for a party",
+    description="Finds `party_size` adjacent free seats in one row, closest to the center of the room, and books them in one transaction. If another booking takes one of the seats first, the seat state is reloaded and the search repeated once. Returns a 409 error if no row has enough adjacent free seats."
+)
+@budget(10)
+async def book_best_available(booking: schemas.BestAvailableBooking, db: AsyncSession = Depends(get_async_db)):
+    schedule = schedule_or_404(await db.get(models.Schedule, booking.schedule_id))
+    schedule_id = schedule.id
+
+    bitmap = room_or_404(seat_state.get(schedule_id) or await rebuild_async(db, schedule))
+
+    for _ in range(BEST_AVAILABLE_ATTEMPTS):
+        seats = find_block(bitmap, booking.party_size, status.HTTP_409_CONFLICT)
+        try:
+            return respond(await _insert_seats(db, schedule_id, seats), status_code=status.HTTP_201_CREATED)
+        except IntegrityError:
+            # The cached seat state missed a booking; reload it from the database
+            await db.refresh(schedule)
+            bitmap = await rebuild_async(db, schedule)
+    raise best_available_taken()
+
+# Endpoint to hold seats while the customer pays
+@router.post(
+    "/holds",
+    response_model=schemas.SeatHold,
+    status_code=status.HTTP_201_CREATED,
+    summary="Hold seats",
+    description="Reserves seats of a schedule for a limited time (`SEAT_HOLD_TTL`, five minutes by default) while the customer pays. Held seats are shown as booked on seat maps and cannot be booked or held by anyone else; confirm the hold to book them, or release it. Returns a 409 error listing the seats that are already booked or held. Seats are checked against the in-memory seat state, so a hold usually needs no query at all.",
+    responses={status.HTTP_409_CONFLICT: {"model": schemas.SeatConflict}}
+)
+@budget(3)
+async def hold_seats(hold: schemas.SeatHoldCreate, db: AsyncSession = Depends(get_async_db)):
+    bitmap = seat_state.get(hold.schedule_id)
+    if bitmap is None:
+        schedule = schedule_or_404(await db.get(models.Schedule, hold.schedule_id))
+        bitmap = room_or_404(await rebuild_async(db, schedule))
+
+    return place_hold(hold, bitmap)
+
+# Endpoint to confirm a hold
+@router.post(
+    "/holds/{hold_id}/confirm",
+    response_model=list[schemas.Booking],
+    status_code=status.HTTP_201_CREATED,
+    summary="Confirm a seat hold",
+    description="Books the seats of a hold in one transaction and releases the hold. The seats were checked when the hold was placed, so they are inserted without another conflict check; a 409 error listing the taken seats is returned only if a booking made outside this hold took one of them. Returns a 404 error if the hold does not exist or has expired.",
+    responses={status.HTTP_409_CONFLICT: {"model": schemas.SeatConflict}}
+)
+@budget(3)
+async def confirm_hold(
+    hold_id: str = Path(..., description="The ID returned when the seats were held."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    seat_hold = seat_holds.get(hold_id)
+    if seat_hold is None:
+        raise HTTPException(status_code=404, detail="Hold not found or expired")
+
+    # The hold keeps the seats from everyone else until the bookings are committed
+    try:
+        bookings = await _insert_seats(db, seat_hold.schedule_id, list(seat_hold.seats))
+    except IntegrityError:
+        # A booking made outside this hold took some of the seats
+        raise hold_lost(hold_id, seat_hold.schedule_id, await _booked_seats(db, seat_hold.schedule_id, list(seat_hold.seats)))
+    seat_holds.release(hold_id, confirmed=True)
+    return respond(bookings, status_code=status.HTTP_201_CREATED)
+
+# Endpoint to release a hold
+@router.delete(
+    "/holds/{hold_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Release a seat hold",
+    description="Gives the seats of a hold back before it expires. Returns a 404 error if the hold does not exist or has already expired."
+)
+@budget(0)
+async def release_hold(hold_id: str = Path(..., description="The ID returned when the seats were held.")):
+    if not seat_holds.release(hold_id):
+        raise HTTPException(status_code=404, detail="Hold not found or expired")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+# Insert bookings for several seats of a schedule with a single bulk statement and count
+# them on the schedule, in one transaction. On a unique constraint violation the
+# transaction is rolled back and the IntegrityError re-raised.
+async def _insert_seats(db: AsyncSession, schedule_id: int, seats: list) -> list:
+    timestamp = datetime.now()
+    try:
+        booking_ids = (await db.scalars(
+            insert(models.Booking).returning(models.Booking.id),
+            booking_values(schedule_id, seats, timestamp)
+        )).all()
+        await db.execute(count_booked(schedule_id, len(seats)))
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise
+
+    bookings_written(schedule_id, seats)
+    return booking_rows(booking_ids, schedule_id, seats, timestamp)
+
+# The seats in `seats` that are already booked for the schedule.
+async def _booked_seats(db: AsyncSession, schedule_id: int, seats: list) -> list:
+    return sorted((await db.execute(booked_seats_query(schedule_id, seats))).all())
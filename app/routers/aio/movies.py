@@ -0,0 +1,118 @@
+# app/routers/aio/movies.py
+#
+# Async version of app/routers/movies.py, served when ASYNC_MODE is enabled.
+
+from fastapi import APIRouter, Depends, status, Path, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from ... import schemas, models
+from ...database import get_async_db
+from ...query_budget import budget
+from ...response_cache import catalog_cache
+from ...pagination import PageParams
+from ..common.movies import movie_page_query, movie_title_query, movie_schedule_query, movie_or_404, check_title_free, check_no_schedules
+
+router = APIRouter(
+    prefix="/movies",
+    tags=["movies"],
+)
+
+# Endpoint to get a list of all movies
+@router.get(
+    "/movies/",
+    response_model=schemas.Page[schemas.Movie],
+    summary="Get all movies",
+    description="Retrieve a page of movies in the database, including their details and poster URLs. Pass the returned `next_cursor` as `cursor` to fetch the next page, and `fields` to return only some columns."
+)
+@budget(1)
+async def get_all_movies(request: Request, params: PageParams = Depends(), db: AsyncSession = Depends(get_async_db)):
+    cached = catalog_cache.lookup(request)
+    if cached.response:
+        return cached.response
+
+    statement, build_page = movie_page_query(params)
+    return cached.store(build_page(await db.execute(statement)))
+
+# Endpoint to get a single movie by ID
+@router.get(
+    "/movies/{movie_id}",
+    response_model=schemas.Movie,
+    summary="Get a single movie",
+    description="Retrieve a single movie by its unique ID. Returns a 404 error if the movie is not found."
+)
+@budget(1)
+async def get_movie(
+    request: Request,
+    movie_id: int = Path(..., description="The unique ID of the movie to retrieve."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    cached = catalog_cache.lookup(request)
+    if cached.response:
+        return cached.response
+
+    movie = movie_or_404(await db.get(models.Movie, movie_id))
+    return cached.store(schemas.Movie.model_validate(movie))
+
+# Endpoint to create a new movie
+@router.post(
+    "/movies/",
+    response_model=schemas.Movie,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a new movie",
+    description="Creates a new movie with a unique title and a poster URL. A conflict error is returned if a movie with the same title already exists."
+)
+@budget(3)
+async def create_movie(movie: schemas.MovieCreate, db: AsyncSession = Depends(get_async_db)):
+    # Check if a movie with the same title already exists
+    check_title_free(await db.scalar(movie_title_query(movie.title)))
+
+    db_movie = models.Movie(**movie.model_dump())
+    db.add(db_movie)
+    await db.commit()
+    catalog_cache.invalidate()
+    return db_movie
+
+# Endpoint to update a movie
+@router.put(
+    "/movies/{movie_id}",
+    response_model=schemas.Movie,
+    summary="Update a movie",
+    description="Updates an existing movie's details. An update is only permitted if the movie has no existing schedules."
+)
+@budget(4)
+async def update_movie(
+    movie: schemas.MovieCreate,
+    movie_id: int = Path(..., description="The unique ID of the movie to update."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_movie = movie_or_404(await db.get(models.Movie, movie_id))
+
+    # Check if the movie has any schedules before updating
+    check_no_schedules(await db.scalar(movie_schedule_query(movie_id)), "update")
+
+    for key, value in movie.model_dump().items():
+        setattr(db_movie, key, value)
+    await db.commit()
+    catalog_cache.invalidate()
+    return db_movie
+
+# Endpoint to delete a movie
+@router.delete(
+    "/movies/{movie_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete a movie",
+    description="Deletes a movie by its ID. This operation is only permitted if the movie has no existing schedules to prevent data integrity issues."
+)
+@budget(4)
+async def delete_movie(
+    movie_id: int = Path(..., description="The unique ID of the movie to delete."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_movie = movie_or_404(await db.get(models.Movie, movie_id))
+
+    # Check if the movie has any schedules before deleting
+    check_no_schedules(await db.scalar(movie_schedule_query(movie_id)), "delete")
+
+    await db.delete(db_movie)
+    await db.commit()
+    catalog_cache.invalidate()
+    return {"message": "Movie deleted successfully"}
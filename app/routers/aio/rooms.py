@@ -0,0 +1,169 @@
+# app/routers/aio/rooms.py
+#
+# Async version of app/routers/rooms.py, served when ASYNC_MODE is enabled.
+
+from fastapi import APIRouter, Depends, status, Path, Query, Request
+from typing import Optional
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from ... import schemas, models
+from ...database import get_async_db
+from ...query_budget import budget
+from ...response_cache import catalog_cache
+from ...serialization import respond
+from ...pagination import PageParams
+from ...room_analytics import analytics_cache, booked_total_query, build_analytics, seat_count_query, occupancy_query
+from ..common.rooms import (
+    ROOM_LIST_RESPONSES, MAX_ANALYTICS_DAYS, ANALYTICS_DESCRIPTION, check_analytics_range, check_room_expansion, room_page_query,
+    room_with_schedules_query, room_name_query, room_schedule_query, room_or_404, check_name_free, check_no_schedules, saved_room
+)
+
+router = APIRouter(
+    prefix="/rooms",
+    tags=["rooms"],
+)
+
+# Endpoint to get a list of all rooms
+@router.get(
+    "/",
+    response_model=None,
+    summary="Get all rooms",
+    description="Retrieve a page of cinema rooms and their details. Rooms are summarized by default; `expand=schedules` includes each room's schedules with movie details, optionally limited to a date window. Pass the returned `next_cursor` as `cursor` to fetch the next page, and `fields` to return only some columns.",
+    responses=ROOM_LIST_RESPONSES
+)
+@budget(2)
+async def get_all_rooms(
+    request: Request,
+    params: PageParams = Depends(),
+    expand: Optional[schemas.RoomExpand] = Query(None, description="Include related data: `schedules` adds each room's schedules with movie details."),
+    schedules_from: Optional[date] = Query(None, description="With expand=schedules, only include schedules on or after this date."),
+    schedules_to: Optional[date] = Query(None, description="With expand=schedules, only include schedules on or before this date."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    check_room_expansion(params, expand, schedules_from, schedules_to)
+    cached = catalog_cache.lookup(request, bookings=expand == schemas.RoomExpand.schedules)
+    if cached.response:
+        return cached.response
+
+    statement, build_page = room_page_query(params, expand, schedules_from, schedules_to)
+    return cached.store(build_page(await db.execute(statement)))
+
+# Endpoint to get a single room by ID
+@router.get(
+    "/{room_id}",
+    response_model=schemas.Room,
+    summary="Get a single room",
+    description="Retrieve a single cinema room by its unique ID. The response includes a list of all schedules for that room, with movie details."
+)
+@budget(3)
+async def get_room(
+    request: Request,
+    room_id: int = Path(..., description="The unique ID of the room to retrieve."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    cached = catalog_cache.lookup(request, bookings=True)
+    if cached.response:
+        return cached.response
+
+    room = room_or_404((await db.execute(room_with_schedules_query(room_id))).unique().scalar_one_or_none())
+    return cached.store(schemas.Room.model_validate(room))
+
+# Endpoint to get seat popularity and occupancy analytics for a room
+@router.get(
+    "/{room_id}/analytics",
+    response_model=schemas.RoomAnalytics,
+    summary="Get seat popularity and occupancy analytics for a room",
+    description=ANALYTICS_DESCRIPTION
+)
+@budget(4)
+async def get_room_analytics(
+    room_id: int = Path(..., description="The unique ID of the room to analyse."),
+    date_from: date = Query(..., description="First show date to include."),
+    date_to: date = Query(..., description=f"Last show date to include; at most {MAX_ANALYTICS_DAYS} days after `date_from`."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    check_analytics_range(date_from, date_to)
+    key = None
+    if analytics_cache.cacheable(date_to):
+        booked = (await db.execute(booked_total_query(room_id, date_from, date_to))).scalar_one()
+        key = analytics_cache.key(room_id, date_from, date_to, booked)
+    analytics = analytics_cache.get(key)
+    if analytics is not None:
+        return respond(analytics)
+
+    room = room_or_404(await db.get(models.Room, room_id))
+
+    analytics = build_analytics(
+        room,
+        date_from,
+        date_to,
+        (await db.execute(seat_count_query(room_id, date_from, date_to))).all(),
+        (await db.execute(occupancy_query(room_id, date_from, date_to))).all()
+    )
+    analytics_cache.put(key, analytics)
+    return respond(analytics)
+
+# Endpoint to create a new room
+@router.post(
+    "/",
+    response_model=schemas.Room,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create a new room",
+    description="Creates a new cinema room with a unique name and seating dimensions. A conflict error is returned if a room with the same name already exists."
+)
+@budget(4)
+async def create_room(room: schemas.RoomCreate, db: AsyncSession = Depends(get_async_db)):
+    # Check if a room with the same name already exists
+    check_name_free(await db.scalar(room_name_query(room.name)))
+
+    db_room = models.Room(**room.model_dump())
+    db.add(db_room)
+    await db.commit()
+    catalog_cache.invalidate()
+    return saved_room(db_room)
+
+# Endpoint to update a room
+@router.put(
+    "/{room_id}",
+    response_model=schemas.Room,
+    summary="Update a room",
+    description="Updates an existing room's details, such as name and seating capacity. An update is only possible if the room does not have any existing schedules."
+)
+@budget(5)
+async def update_room(
+    room: schemas.RoomCreate,
+    room_id: int = Path(..., description="The unique ID of the room to update."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_room = room_or_404(await db.get(models.Room, room_id))
+
+    # Check if the room has any schedules before updating
+    check_no_schedules(await db.scalar(room_schedule_query(room_id)), "update")
+
+    for key, value in room.model_dump().items():
+        setattr(db_room, key, value)
+    await db.commit()
+    catalog_cache.invalidate()
+    return saved_room(db_room)
+
+# Endpoint to delete a room
+@router.delete(
+    "/{room_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="Delete a room",
+    description="Deletes a room by its ID. This operation is only permitted if the room has no existing schedules to prevent data integrity issues."
+)
+@budget(4)
+async def delete_room(
+    room_id: int = Path(..., description="The unique ID of the room to delete."),
+    db: AsyncSession = Depends(get_async_db)
+):
+    db_room = room_or_404(await db.get(models.Room, room_id))
+
+    # Check if the room has any schedules before deleting
+    check_no_schedules(await db.scalar(room_schedule_query(room_id)), "delete")
+
+    await db.delete(db_room)
+    await db.commit()
+    catalog_cache.invalidate()
+    return {"message": "Room deleted successfully"}
@@ -0,0 +1,184 @@
+# app/routers/common/bookings.py
+#
+# Statements, checks and response building of the booking endpoints, shared by the sync
+# router (app/routers/bookings.py) and the async one (app/routers/aio/bookings.py). The
+# routers only run the statements on their session.
+
+from datetime import datetime
+from typing import Optional, Union
+from fastapi import HTTPException, status
+from sqlalchemy import select, tuple_
+from ... import schemas, models, seat_codec
+from ...seat_state import seat_state
+from ...seat_finder import best_block
+from ...seat_holds import seat_holds, SeatsHeld
+from ...seat_events import seat_events
+from ...response_cache import catalog_cache
+from ...serialization import respond
+
+# OpenAPI documentation of the seat map formats; the default stays the verbose layout.
+SEAT_MAP_RESPONSES = {
+    200: {
+        "model": Union[schemas.SeatMap, schemas.BitsetSeatMap, schemas.RleSeatMap],
+        "description": "The verbose seating layout by default, or a compact bitset / run-length seat map when requested with `format` or the Accept header. Use `app.seat_codec.decode` to turn any of them into a grid of booked flags."
+    }
+}
+
+# Seat maps vary by Accept header; set explicitly on responses returned directly in fast mode.
+VARY_ACCEPT = {"Vary": "Accept"}
+
+SEAT_MAP_FORMAT_DESCRIPTION = "Seat map representation: `verbose` (default), `bitset` or `rle`. Overrides the Accept header."
+ACCEPT_DESCRIPTION = "Send `application/vnd.cinema.seatmap.bitset+json` or `application/vnd.cinema.seatmap.rle+json` to receive a compact seat map."
+
+# Searches for the best available seats; one retry after a booking raced the search
+BEST_AVAILABLE_ATTEMPTS = 2
+
+# The schedule the movie-and-room endpoints use. A movie can be shown in a room more than
+# once, so the earliest show is picked rather than whichever row the database finds first.
+def movie_room_schedule_query(movie_id: int, room_id: int):
+    return select(models.Schedule).where(
+        models.Schedule.movie_id == movie_id,
+        models.Schedule.room_id == room_id
+    ).order_by(models.Schedule.show_date, models.Schedule.start_time, models.Schedule.id).limit(1)
+
+# The seats in `seats` that are already booked for the schedule, as (row, seat) rows
+def booked_seats_query(schedule_id: int, seats: list):
+    return select(models.Booking.row, models.Booking.seat).where(
+        models.Booking.schedule_id == schedule_id,
+        tuple_(models.Booking.row, models.Booking.seat).in_(seats)
+    )
+
+# The schedule, or a 404 error when it does not exist.
+def schedule_or_404(schedule):
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return schedule
+
+def movie_room_schedule_or_404(schedule):
+    if not schedule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Schedule not found for this movie and room combination"
+        )
+    return schedule
+
+# The room (or seat map of the room), or a 404 error when the room does not exist.
+def room_or_404(room):
+    if not room:
+        raise HTTPException(status_code=404, detail="Room not found")
+    return room
+
+# The seat map of a schedule in the requested format, with the seats on hold shown as booked
+def seat_map_response(bitmap, seat_map_format: schemas.SeatMapFormat):
+    return respond(seat_codec.encode(seat_holds.overlay(bitmap), seat_map_format), headers=VARY_ACCEPT)
+
+# Validate a single seat against the room's dimensions and the holds of the schedule.
+def check_seat(room: models.Room, schedule_id: int, row: int, seat: int):
+    if not (1 <= row <= room.rows and 1 <= seat <= room.seats_per_row):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid seat for this room")
+    if seat_holds.held_conflicts(schedule_id, [(row, seat)]):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Seat is held by another customer")
+
+def seat_taken() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Seat is already booked")
+
+# The requested seats as (row, seat) pairs. Raises a 400 for repeated seats or seats
+# outside the room.
+def check_seats(requested: list, rows: int, seats_per_row: int) -> list:
+    seats = [(seat.row, seat.seat) for seat in requested]
+    if len(set(seats)) != len(seats):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The same seat is requested more than once")
+
+    invalid_seats = [
+        {"row": row, "seat": seat} for row, seat in seats
+        if not (1 <= row <= rows and 1 <= seat <= seats_per_row)
+    ]
+    if invalid_seats:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "Invalid seats for this room", "invalid_seats": invalid_seats}
+        )
+    return seats
+
+# Raise a 409 listing the seats that are on hold for another customer.
+def raise_for_held(schedule_id: int, seats: list, held: Optional[list] = None):
+    held = held if held is not None else seat_holds.held_conflicts(schedule_id, seats)
+    if held:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Some seats are held by another customer",
+                "conflicts": [{"row": row, "seat": seat} for row, seat in held]
+            }
+        )
+
+# Raise a 409 listing the seats that are already booked.
+def raise_for_booked(booked: list):
+    if booked:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={
+                "message": "Some seats are already booked",
+                "conflicts": [{"row": row, "seat": seat} for row, seat in booked]
+            }
+        )
+
+# The seats of the best block for a party, or an error with `not_found_status` when no
+# row has enough adjacent free seats.
+def find_block(bitmap, party_size: int, not_found_status: int) -> list:
+    if party_size > bitmap.seats_per_row:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Rows in this room have only {bitmap.seats_per_row} seats"
+        )
+    block = best_block(seat_holds.overlay(bitmap), party_size)
+    if block is None:
+        raise HTTPException(status_code=not_found_status, detail=f"No row has {party_size} adjacent free seats")
+    row, first_seat = block
+    return [(row, seat) for seat in range(first_seat, first_seat + party_size)]
+
+def best_available_response(schedule_id: int, seats: list):
+    return respond({"schedule_id": schedule_id, "seats": [{"row": row, "seat": seat} for row, seat in seats]})
+
+def best_available_taken() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail="The best available seats were taken by another booking; try again")
+
+# Hold seats checked against the seat map of the schedule: a 409 lists the seats that are
+# already booked or on hold for another customer.
+def place_hold(hold: schemas.SeatHoldCreate, bitmap):
+    seats = check_seats(hold.seats, bitmap.rows, bitmap.seats_per_row)
+    raise_for_booked(sorted(seat for seat in seats if bitmap.is_booked(*seat)))
+    try:
+        seat_hold = seat_holds.hold(hold.schedule_id, seats)
+    except SeatsHeld as error:
+        raise_for_held(hold.schedule_id, seats, error.seats)
+    return respond(seat_hold.to_response(), status_code=status.HTTP_201_CREATED)
+
+# A booking made outside the hold took some of its seats: give the hold up and return the
+# 409 reporting those seats, which the seat state and live subscribers learn as well.
+def hold_lost(hold_id: str, schedule_id: int, booked: list) -> HTTPException:
+    seat_holds.release(hold_id)
+    seat_state.mark_booked(schedule_id, booked)
+    seat_events.publish(schedule_id, taken=booked)
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail={"message": "Some held seats were booked elsewhere", "conflicts": [{"row": row, "seat": seat} for row, seat in booked]}
+    )
+
+# The parameters of a bulk insert of bookings for several seats of a schedule
+def booking_values(schedule_id: int, seats: list, timestamp: datetime) -> list:
+    return [{"schedule_id": schedule_id, "row": row, "seat": seat, "timestamp": timestamp} for row, seat in seats]
+
+# The response rows of inserted bookings, built from the inserted values so no refresh
+# query is needed.
+def booking_rows(booking_ids: list, schedule_id: int, seats: list, timestamp: datetime) -> list:
+    return [
+        {"row": row, "seat": seat, "id": booking_id, "schedule_id": schedule_id, "timestamp": timestamp}
+        for booking_id, (row, seat) in zip(booking_ids, seats)
+    ]
+
+# Tell the seat state, live subscribers and response caches about committed bookings.
+def bookings_written(schedule_id: int, seats: list):
+    seat_state.mark_booked(schedule_id, seats)
+    seat_events.publish(schedule_id, taken=seats)
+    catalog_cache.invalidate_bookings()
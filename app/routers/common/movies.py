@@ -0,0 +1,67 @@
+# app/routers/common/movies.py
+#
+# Statements, checks and response building of the movie endpoints, shared by the sync
+# router (app/routers/movies.py) and the async one (app/routers/aio/movies.py). The
+# routers only run the statements on their session.
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from ... import schemas, models
+from ...config import settings
+from ...serialization import MOVIE_COLUMNS, movie_row
+from ...pagination import PageParams, select_fields, paginate, page, projected_page
+
+# Columns that can be requested with the `fields` parameter
+MOVIE_FIELDS = {
+    "id": models.Movie.id,
+    "title": models.Movie.title,
+    "poster": models.Movie.poster,
+    "runtime_minutes": models.Movie.runtime_minutes,
+}
+
+# The statement for one page of the movie list, and the function building the page from
+# the statement's result.
+def movie_page_query(params: PageParams) -> tuple:
+    selected = select_fields(params.fields, MOVIE_FIELDS)
+    if selected:
+        statement = paginate(select(*selected.values()), models.Movie.id, params)
+        return statement, lambda result: projected_page(result.all(), selected, params)
+
+    if settings.fast_json:
+        statement = paginate(select(*MOVIE_COLUMNS), models.Movie.id, params)
+        return statement, lambda result: page([movie_row(row) for row in result], params, key=lambda item: item["id"])
+
+    statement = paginate(select(models.Movie), models.Movie.id, params)
+    return statement, lambda result: schemas.Page[schemas.Movie].model_validate(page(result.scalars().all(), params), from_attributes=True)
+
+# The ID of a movie with the given title, if there is one
+def movie_title_query(title: str):
+    return select(models.Movie.id).where(models.Movie.title == title)
+
+# The ID of one schedule of the movie, if it has any
+def movie_schedule_query(movie_id: int):
+    return select(models.Schedule.id).where(models.Schedule.movie_id == movie_id).limit(1)
+
+# The movie, or a 404 error when it does not exist.
+def movie_or_404(movie):
+    if not movie:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Movie not found"
+        )
+    return movie
+
+def check_title_free(existing_movie_id):
+    if existing_movie_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A movie with this title already exists"
+        )
+
+# Movies with schedules can be neither updated nor deleted; `action` names the refused one.
+def check_no_schedules(schedule_id, action: str):
+    if schedule_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Cannot {action} movie, it has existing schedules"
+        )
@@ -0,0 +1,141 @@
+# app/routers/common/rooms.py
+#
+# Statements, checks and response building of the room endpoints, shared by the sync
+# router (app/routers/rooms.py) and the async one (app/routers/aio/rooms.py). The
+# routers only run the statements on their session.
+
+from datetime import date
+from typing import Optional, Union
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload, selectinload
+from ... import schemas, models
+from ...config import settings
+from ...serialization import ROOM_SUMMARY_COLUMNS, room_summary_row
+from ...pagination import PageParams, select_fields, paginate, page, projected_page
+
+# Columns that can be requested with the `fields` parameter
+ROOM_FIELDS = {
+    "id": models.Room.id,
+    "name": models.Room.name,
+    "rows": models.Room.rows,
+    "seats_per_row": models.Room.seats_per_row,
+}
+
+# Room list responses: summaries by default, rooms with schedules when expanded
+ROOM_LIST_RESPONSES = {
+    200: {"model": Union[schemas.Page[schemas.RoomSummary], schemas.Page[schemas.Room]]}
+}
+
+# Longest date range room analytics cover, in days
+MAX_ANALYTICS_DAYS = 366
+
+ANALYTICS_DESCRIPTION = "Returns a `rows` x `seats_per_row` matrix (`seat_bookings`, indexed [row - 1][seat - 1]) counting how often each seat of the room was booked for schedules between `date_from` and `date_to` (inclusive), together with the room's occupancy overall and per movie, weekday and start time. Everything is computed with SQL aggregates; results for ranges that lie entirely in the past are cached."
+
+# Validate the date range of GET /rooms/{room_id}/analytics
+def check_analytics_range(date_from: date, date_to: date):
+    if date_to < date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_to must not be before date_from"
+        )
+    if (date_to - date_from).days + 1 > MAX_ANALYTICS_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Analytics can cover at most {MAX_ANALYTICS_DAYS} days"
+        )
+
+# Load a page of rooms with their schedules and movies in a fixed number of queries:
+# one for the rooms and one for all of their schedules, joined with the movies.
+def room_schedules_loader(schedules_from: Optional[date], schedules_to: Optional[date]):
+    schedules = models.Room.schedules
+    criteria = []
+    if schedules_from is not None:
+        criteria.append(models.Schedule.show_date >= schedules_from)
+    if schedules_to is not None:
+        criteria.append(models.Schedule.show_date <= schedules_to)
+    if criteria:
+        schedules = schedules.and_(*criteria)
+    return selectinload(schedules).joinedload(models.Schedule.movie)
+
+# Validate the expansion parameters of GET /rooms/
+def check_room_expansion(params: PageParams, expand: Optional[schemas.RoomExpand], schedules_from: Optional[date], schedules_to: Optional[date]):
+    if expand and params.fields:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="The fields and expand parameters cannot be combined"
+        )
+    if not expand and (schedules_from or schedules_to):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="schedules_from and schedules_to require expand=schedules"
+        )
+
+# The statement for one page of the room list, and the function building the page from
+# the statement's result. Relationships are loaded eagerly, since async sessions cannot
+# load them lazily.
+def room_page_query(params: PageParams, expand: Optional[schemas.RoomExpand], schedules_from: Optional[date], schedules_to: Optional[date]) -> tuple:
+    selected = select_fields(params.fields, ROOM_FIELDS)
+    if selected:
+        statement = paginate(select(*selected.values()), models.Room.id, params)
+        return statement, lambda result: projected_page(result.all(), selected, params)
+
+    if expand == schemas.RoomExpand.schedules:
+        statement = paginate(select(models.Room).options(room_schedules_loader(schedules_from, schedules_to)), models.Room.id, params)
+        return statement, lambda result: schemas.Page[schemas.Room].model_validate(page(result.scalars().all(), params), from_attributes=True)
+
+    if settings.fast_json:
+        statement = paginate(select(*ROOM_SUMMARY_COLUMNS), models.Room.id, params)
+        return statement, lambda result: page([room_summary_row(row) for row in result], params, key=lambda item: item["id"])
+
+    statement = paginate(select(models.Room), models.Room.id, params)
+    return statement, lambda result: schemas.Page[schemas.RoomSummary].model_validate(page(result.scalars().all(), params), from_attributes=True)
+
+# A room with its schedules and their movies, in one query. Read the room with
+# result.unique().scalar_one_or_none(): the joined schedules repeat the room's row.
+def room_with_schedules_query(room_id: int):
+    return (
+        select(models.Room)
+        .options(joinedload(models.Room.schedules).joinedload(models.Schedule.movie))
+        .where(models.Room.id == room_id)
+    )
+
+# The room's ID, if the room exists
+def room_id_query(room_id: int):
+    return select(models.Room.id).where(models.Room.id == room_id)
+
+# The ID of a room with the given name, if there is one
+def room_name_query(name: str):
+    return select(models.Room.id).where(models.Room.name == name)
+
+# The ID of one schedule in the room, if it has any
+def room_schedule_query(room_id: int):
+    return select(models.Schedule.id).where(models.Schedule.room_id == room_id).limit(1)
+
+# The room, or a 404 error when it does not exist.
+def room_or_404(room):
+    if not room:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Room not found"
+        )
+    return room
+
+def check_name_free(existing_room_id):
+    if existing_room_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A room with this name already exists"
+        )
+
+# Rooms with schedules can be neither updated nor deleted; `action` names the refused one.
+def check_no_schedules(schedule_id, action: str):
+    if schedule_id is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Cannot {action} room, it has existing schedules"
+        )
+
+# A room just created or updated has no schedules, so its response needs no query.
+def saved_room(room: models.Room) -> schemas.Room:
+    return schemas.Room(name=room.name, rows=room.rows, seats_per_row=room.seats_per_row, id=room.id, schedules=[])
@@ -0,0 +1,239 @@
+# app/routers/common/schedules.py
+#
+# Statements, checks and response building of the schedule endpoints, shared by the sync
+# router (app/routers/schedules.py) and the async one (app/routers/aio/schedules.py). The
+# routers only run the statements on their session.
+
+from datetime import date, time, timedelta
+from typing import Optional
+from fastapi import HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+from ... import schemas, models
+from ...config import settings
+from ...response_cache import catalog_cache
+from ...seat_state import seat_state
+from ...serialization import SCHEDULE_COLUMNS, schedule_row, respond
+from ...pagination import DEFAULT_LIMIT, MAX_LIMIT, PageParams, select_fields, paginate, page, projected_page
+from ...schedule_conflicts import MINUTES_PER_DAY, ScheduleIntervals, minute_of_day, occupied_minutes
+
+# Columns that can be requested with the `fields` parameter
+SCHEDULE_FIELDS = {
+    "id": models.Schedule.id,
+    "show_date": models.Schedule.show_date,
+    "start_time": models.Schedule.start_time,
+    "room_id": models.Schedule.room_id,
+    "movie_id": models.Schedule.movie_id,
+    "booked_seats": models.Schedule.booked_seats,
+}
+
+# Projected schedules format their start time exactly like schemas.Schedule
+SCHEDULE_FORMATTERS = {"start_time": schemas.format_start_time}
+
+# Longest date range the showtime search covers, in days
+MAX_SEARCH_DAYS = 62
+
+# Query parameters of the showtime search.
+class ShowtimeSearch:
+    def __init__(
+        self,
+        date_from: Optional[date] = Query(None, description="First day to search; today when omitted."),
+        date_to: Optional[date] = Query(None, description="Last day to search, inclusive; `date_from` when omitted."),
+        movie_id: Optional[int] = Query(None, description="Only showtimes of this movie."),
+        room_id: Optional[int] = Query(None, description="Only showtimes in this room."),
+        hide_sold_out: bool = Query(False, description="Leave out showtimes whose seats are all booked."),
+        min_available: Optional[int] = Query(None, ge=0, description="Only showtimes with at least this many available seats."),
+        sort: schemas.ShowtimeSort = Query(schemas.ShowtimeSort.time, description="`time` (earliest first), `available` (most available seats first) or `movie` (by title)."),
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT, description="Maximum number of showtimes to return."),
+        offset: int = Query(0, ge=0, description="Number of showtimes to skip.")
+    ):
+        self.date_from = date_from or date.today()
+        self.date_to = date_to or self.date_from
+        if self.date_to < self.date_from:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="date_to must not be before date_from"
+            )
+        if (self.date_to - self.date_from).days + 1 > MAX_SEARCH_DAYS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"A search can cover at most {MAX_SEARCH_DAYS} days"
+            )
+        self.movie_id = movie_id
+        self.room_id = room_id
+        self.min_available = min_available
+        if hide_sold_out:
+            self.min_available = max(min_available or 0, 1)
+        self.sort = sort
+        self.limit = limit
+        self.offset = offset
+
+# The showtime search: schedules joined with their room and movie. Seat counts come from
+# the schedules' booked-seat counters, so no bookings are read. Rows are built with showtime_row().
+def showtime_query(search: ShowtimeSearch):
+    capacity = models.Room.rows * models.Room.seats_per_row
+    booked = models.Schedule.booked_seats
+    available = capacity - booked
+    statement = (
+        select(
+            models.Schedule.show_date,
+            models.Schedule.start_time,
+            models.Schedule.id,
+            models.Schedule.room_id,
+            models.Room.name.label("room_name"),
+            models.Movie.title.label("movie_title"),
+            models.Movie.poster.label("movie_poster"),
+            models.Movie.runtime_minutes.label("movie_runtime_minutes"),
+            models.Movie.id.label("movie_id"),
+            capacity.label("capacity"),
+            booked.label("booked"),
+            available.label("available")
+        )
+        .join(models.Schedule.room)
+        .join(models.Schedule.movie)
+        .where(models.Schedule.show_date.between(search.date_from, search.date_to))
+    )
+    if search.movie_id is not None:
+        statement = statement.where(models.Schedule.movie_id == search.movie_id)
+    if search.room_id is not None:
+        statement = statement.where(models.Schedule.room_id == search.room_id)
+    if search.min_available is not None:
+        statement = statement.where(available >= search.min_available)
+
+    by_time = (models.Schedule.show_date, models.Schedule.start_time, models.Schedule.id)
+    if search.sort == schemas.ShowtimeSort.available:
+        statement = statement.order_by(available.desc(), *by_time)
+    elif search.sort == schemas.ShowtimeSort.movie:
+        statement = statement.order_by(models.Movie.title, *by_time)
+    else:
+        statement = statement.order_by(*by_time)
+    return statement.limit(search.limit).offset(search.offset)
+
+# Filters of a room's schedule list. Sold-out schedules are recognised by their
+# booked-seat counter alone.
+def room_schedule_filters(room: models.Room, hide_sold_out: bool) -> list:
+    filters = [models.Schedule.room_id == room.id]
+    if hide_sold_out:
+        filters.append(models.Schedule.booked_seats < room.rows * room.seats_per_row)
+    return filters
+
+# Longest run a recurrence rule may cover, in days
+MAX_RECURRENCE_DAYS = 366
+
+# Expand a recurrence rule into its (show_date, start_time) slots, in date and time order.
+def expand_recurrence(rule: schemas.ScheduleRecurrence) -> list:
+    if rule.end_date < rule.start_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="end_date must not be before start_date"
+        )
+    days = (rule.end_date - rule.start_date).days + 1
+    if days > MAX_RECURRENCE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A recurrence can cover at most {MAX_RECURRENCE_DAYS} days"
+        )
+    weekdays = list(schemas.Weekday)
+    selected_days = {weekdays.index(day) for day in rule.weekdays} if rule.weekdays else set(range(7))
+    start_times = sorted(set(rule.start_times))
+    slots = []
+    for offset in range(days):
+        show_date = rule.start_date + timedelta(days=offset)
+        if show_date.weekday() in selected_days:
+            slots.extend((show_date, start_time) for start_time in start_times)
+    return slots
+
+# Split slots into the free ones and the skipped ones. Free slots are added to the
+# intervals as they are accepted, so slots of one rule that overlap each other are caught too.
+def partition_slots(slots: list, room_id: int, minutes: int, intervals: ScheduleIntervals) -> tuple:
+    free = []
+    skipped = []
+    for show_date, start_time in slots:
+        conflict = intervals.conflict(room_id, show_date, start_time, minutes)
+        if conflict:
+            skipped.append({"show_date": show_date, "start_time": start_time, "reason": conflict})
+        else:
+            intervals.add(room_id, show_date, start_time, minutes, "another slot of this rule")
+            free.append((show_date, start_time))
+    return free, skipped
+
+# Check a day's program show by show, in start time order, against the room's schedules
+# and the program's earlier shows. runtimes maps the known movie IDs to their runtimes.
+def check_program(program: schemas.DayProgram, room_id: int, runtimes: dict, intervals: ScheduleIntervals) -> dict:
+    checks = [None] * len(program.shows)
+    for index in sorted(range(len(program.shows)), key=lambda index: program.shows[index].start_time):
+        show = program.shows[index]
+        if show.movie_id not in runtimes:
+            checks[index] = {"movie_id": show.movie_id, "start_time": show.start_time, "end_time": None, "error": "Movie not found"}
+            continue
+        minutes = occupied_minutes(runtimes[show.movie_id])
+        end = (minute_of_day(show.start_time) + minutes) % MINUTES_PER_DAY
+        checks[index] = {
+            "movie_id": show.movie_id,
+            "start_time": show.start_time,
+            "end_time": time(end // 60, end % 60),
+            "error": intervals.conflict(room_id, program.show_date, show.start_time, minutes)
+        }
+        intervals.add(room_id, program.show_date, show.start_time, minutes, f"the {schemas.format_start_time(show.start_time)} show of this program")
+    return {"valid": all(check["error"] is None for check in checks), "shows": checks}
+
+# The statement for one page of a room's schedules, and the function building the page
+# from the statement's result. A sparse fieldset selects only the requested columns,
+# without movie data.
+def room_schedule_page_query(room: models.Room, hide_sold_out: bool, params: PageParams) -> tuple:
+    filters = room_schedule_filters(room, hide_sold_out)
+    selected = select_fields(params.fields, SCHEDULE_FIELDS)
+    if selected:
+        statement = paginate(select(*selected.values()).where(*filters), models.Schedule.id, params)
+        return statement, lambda result: projected_page(result.all(), selected, params, SCHEDULE_FORMATTERS)
+
+    # In fast mode, build the schedules straight from joined schedule and movie columns
+    if settings.fast_json:
+        statement = paginate(select(*SCHEDULE_COLUMNS).join(models.Schedule.movie).where(*filters), models.Schedule.id, params)
+        return statement, lambda result: respond(page([schedule_row(row) for row in result], params, key=lambda item: item["id"]))
+
+    statement = paginate(select(models.Schedule).options(joinedload(models.Schedule.movie)).where(*filters), models.Schedule.id, params)
+    return statement, lambda result: page(result.scalars().all(), params)
+
+# The runtimes of the given movies, as (movie ID, runtime) rows
+def runtimes_query(movie_ids: set):
+    return select(models.Movie.id, models.Movie.runtime_minutes).where(models.Movie.id.in_(movie_ids))
+
+# A 409 error when a show of `movie` would overlap another schedule of the room.
+def check_room_free(intervals: ScheduleIntervals, room_id: int, show_date: date, start_time: time, movie: models.Movie):
+    conflict = intervals.conflict(room_id, show_date, start_time, occupied_minutes(movie.runtime_minutes))
+    if conflict:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=conflict
+        )
+
+# Forget everything cached about schedules after some were created.
+def schedules_changed():
+    catalog_cache.invalidate()
+    seat_state.forget_schedules()
+
+# Insert parameters for the free slots of a recurrence rule
+def recurring_values(room_id: int, movie_id: int, free: list) -> list:
+    return [{"room_id": room_id, "movie_id": movie_id, "show_date": show_date, "start_time": start_time} for show_date, start_time in free]
+
+# The (ID, show date, start time) of the movie's schedules in the room during a rule's run
+def recurring_ids_query(room_id: int, rule: schemas.ScheduleRecurrence):
+    return select(models.Schedule.id, models.Schedule.show_date, models.Schedule.start_time).where(
+        models.Schedule.room_id == room_id,
+        models.Schedule.movie_id == rule.movie_id,
+        models.Schedule.show_date.between(rule.start_date, rule.end_date)
+    )
+
+# The response of a recurrence rule. `movie_data` is the movie as a dict, taken before the
+# commit expires it; `id_rows` are the rows of recurring_ids_query(), or empty when no
+# slot was free.
+def recurring_response(room_id: int, movie_data: dict, free: list, skipped: list, id_rows) -> dict:
+    created = {(show_date, start_time): schedule_id for schedule_id, show_date, start_time in id_rows}
+    return {
+        "created": [
+            {"show_date": show_date, "start_time": start_time, "id": created[(show_date, start_time)], "room_id": room_id, "movie": movie_data, "booked_seats": 0}
+            for show_date, start_time in free
+        ],
+        "skipped": skipped
+    }
@@ -0,0 +1,65 @@
+# app/routers/exports.py
+
+from datetime import date
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from ..booking_export import MEDIA_TYPES, export_bookings
+from ..query_budget import budget
+
+router = APIRouter(
+    prefix="/export",
+    tags=["export"],
+)
+
+# Longest date range one export covers, in days
+MAX_EXPORT_DAYS = 366
+
+# Pick the export format from the query parameter or the Accept header; CSV by default.
+def resolve_export_format(requested: Optional[str], accept: Optional[str]) -> str:
+    if requested:
+        return requested
+    for media_range in (accept or "").split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl"):
+            return "ndjson"
+        if media_type == "text/csv":
+            return "csv"
+    return "csv"
+
+# Endpoint to export bookings for reporting
+@router.get(
+    "/bookings",
+    summary="Export bookings",
+    description="Streams the bookings of the schedules shown between `date_from` and `date_to` (inclusive) as CSV or NDJSON, optionally for one room or movie. Each booking includes its schedule's date and start time, the room name and the movie title. Rows are ordered by show date, start time, schedule, row and seat, and are read with a single query in batches while the response is sent, so exports of any size start immediately and use constant memory.",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/csv": {}, "application/x-ndjson": {}}}}
+)
+@budget(1)
+def export_booking_list(
+    request: Request,
+    date_from: date = Query(..., description="First show date to export."),
+    date_to: date = Query(..., description=f"Last show date to export, inclusive; at most {MAX_EXPORT_DAYS} days after `date_from`."),
+    room_id: Optional[int] = Query(None, description="Only bookings in this room."),
+    movie_id: Optional[int] = Query(None, description="Only bookings for this movie."),
+    export_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$", description="Output format, `csv` or `ndjson`. Defaults to the Accept header, or CSV.")
+):
+    if date_to < date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_to must not be before date_from"
+        )
+    if (date_to - date_from).days + 1 > MAX_EXPORT_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"An export can cover at most {MAX_EXPORT_DAYS} days"
+        )
+
+    fmt = resolve_export_format(export_format, request.headers.get("accept"))
+    filename = f"bookings-{date_from.isoformat()}-{date_to.isoformat()}.{fmt}"
+    # Starlette iterates the generator in the threadpool, one database batch at a time
+    return StreamingResponse(
+        export_bookings(fmt, date_from, date_to, room_id, movie_id),
+        media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -0,0 +1,64 @@
+# app/routers/health.py
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from ..booking_writer import booking_writer
+from ..database import get_db, get_engine, get_async_engine, describe_pool, pool_stats
+from ..query_budget import budget
+from ..response_cache import catalog_cache
+from ..room_analytics import analytics_cache
+from ..seat_state import seat_state
+from ..seat_holds import seat_holds
+from ..seat_events import seat_events
+
+router = APIRouter(
+    prefix="/health",
+    tags=["health"],
+)
+
+# Endpoint to check that the API can reach the database
+@router.get(
+    "/",
+    summary="Health check",
+    description="Runs a trivial query against the database and reports whether the service is healthy."
+)
+@budget(1)
+def health(db: Session = Depends(get_db)):
+    db.execute(text("SELECT 1"))
+    return {"status": "ok"}
+
+# Endpoint to report connection pool usage
+@router.get(
+    "/db",
+    summary="Database pool statistics",
+    description="Reports the database backend and, for each connection pool, its configured size, current checkouts and the number and duration of waits for a connection since startup, and the batches written by the group-commit booking writer. Use it to size the pool for a deployment."
+)
+@budget(0)
+def database_stats():
+    engine = get_engine()
+    async_engine = get_async_engine()
+    pools = {"sync": describe_pool(engine, pool_stats["sync"])}
+    if async_engine is not None:
+        pools["async"] = describe_pool(async_engine.sync_engine, pool_stats["async"])
+    return {
+        "backend": engine.url.get_backend_name(),
+        "pools": pools,
+        "booking_writer": booking_writer.stats()
+    }
+
+# Endpoint to report in-memory cache statistics
+@router.get(
+    "/cache",
+    summary="Cache statistics",
+    description="Reports hit, miss and invalidation counters of the catalog response cache, the seat map cache and the room analytics cache of this worker process, the seat holds it keeps and its live seat update subscriptions."
+)
+@budget(0)
+def cache_stats():
+    return {
+        "catalog": catalog_cache.stats(),
+        "seat_maps": seat_state.stats(),
+        "analytics": analytics_cache.stats(),
+        "seat_holds": seat_holds.stats(),
+        "live_updates": seat_events.stats()
+    }
@@ -0,0 +1,114 @@
+# app/routers/imports.py
+
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from .. import schemas
+from ..bulk_import import BulkImport, LineSplitter, LineTooLong, CONTENT_TYPES, DEFAULT_MAX_ERRORS, MAX_LINE_LENGTH
+from ..database import SessionLocal, get_engine
+from ..query_budget import budget, UNBOUNDED
+
+router = APIRouter(
+    prefix="/import",
+    tags=["import"],
+)
+
+# Document the raw request body, which the endpoints read as a stream
+IMPORT_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/x-ndjson": {"schema": {"type": "string"}, "example": '{"title": "The Matrix", "poster": "https://example.com/matrix.jpg"}\n'},
+            "text/csv": {"schema": {"type": "string"}, "example": "title,poster\nThe Matrix,https://example.com/matrix.jpg\n"}
+        }
+    }
+}
+
+IMPORT_FORMAT_DESCRIPTION = "Input format, `ndjson` or `csv`. Defaults to the request's Content-Type (`application/x-ndjson` or `text/csv`)."
+LINE_LENGTH_DESCRIPTION = f"A line longer than {MAX_LINE_LENGTH} characters stops the import with a 413 error."
+MAX_ERRORS_DESCRIPTION = "Maximum number of failed lines listed in the report; further failures are only counted."
+
+# Pick the import format from the query parameter or the Content-Type header.
+def resolve_import_format(requested: Optional[str], content_type: Optional[str]) -> str:
+    if requested:
+        return requested
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in CONTENT_TYPES:
+        return CONTENT_TYPES[media_type]
+    raise HTTPException(
+        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+        detail="Send the file as application/x-ndjson or text/csv, or pass format=ndjson or format=csv"
+    )
+
+# Read the request body as a stream and import it batch by batch. Parsing happens as
+# chunks arrive; database work for each full batch runs in the threadpool. A line over
+# MAX_LINE_LENGTH stops the import with a 413; batches before it stay imported.
+async def stream_import(request: Request, kind: str, fmt: str, max_errors: int) -> dict:
+    splitter = LineSplitter()
+    with SessionLocal(bind=get_engine()) as db:
+        bulk_import = BulkImport(db, kind, fmt, max_errors)
+        async for chunk in request.stream():
+            try:
+                lines = splitter.feed(chunk)
+            except LineTooLong as error:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"{error}; the import stopped there after creating {bulk_import.report.created} records"
+                )
+            for line in lines:
+                if bulk_import.add_line(line):
+                    await run_in_threadpool(bulk_import.flush)
+        for line in splitter.close():
+            bulk_import.add_line(line)
+        return await run_in_threadpool(bulk_import.finish)
+
+# Endpoint to import movies in bulk
+@router.post(
+    "/movies",
+    response_model=schemas.ImportReport,
+    summary="Import movies in bulk",
+    description=f"Creates movies from an NDJSON or CSV body with the fields `title`, `poster` and, optionally, `runtime_minutes`. Lines are checked and inserted in batches; lines that fail (invalid data or a title that already exists) are reported with their line number and skipped, while the rest of the file is imported. {LINE_LENGTH_DESCRIPTION}",
+    openapi_extra=IMPORT_REQUEST_BODY
+)
+@budget(UNBOUNDED)
+async def import_movies(
+    request: Request,
+    import_format: Optional[str] = Query(None, alias="format", pattern="^(ndjson|csv)$", description=IMPORT_FORMAT_DESCRIPTION),
+    max_errors: int = Query(DEFAULT_MAX_ERRORS, ge=0, description=MAX_ERRORS_DESCRIPTION)
+):
+    fmt = resolve_import_format(import_format, request.headers.get("content-type"))
+    return await stream_import(request, "movies", fmt, max_errors)
+
+# Endpoint to import rooms in bulk
+@router.post(
+    "/rooms",
+    response_model=schemas.ImportReport,
+    summary="Import rooms in bulk",
+    description=f"Creates rooms from an NDJSON or CSV body with the fields `name`, `rows` and `seats_per_row`. Lines are checked and inserted in batches; lines that fail (invalid data or a name that already exists) are reported with their line number and skipped, while the rest of the file is imported. {LINE_LENGTH_DESCRIPTION}",
+    openapi_extra=IMPORT_REQUEST_BODY
+)
+@budget(UNBOUNDED)
+async def import_rooms(
+    request: Request,
+    import_format: Optional[str] = Query(None, alias="format", pattern="^(ndjson|csv)$", description=IMPORT_FORMAT_DESCRIPTION),
+    max_errors: int = Query(DEFAULT_MAX_ERRORS, ge=0, description=MAX_ERRORS_DESCRIPTION)
+):
+    fmt = resolve_import_format(import_format, request.headers.get("content-type"))
+    return await stream_import(request, "rooms", fmt, max_errors)
+
+# Endpoint to import schedules in bulk
+@router.post(
+    "/schedules",
+    response_model=schemas.ImportReport,
+    summary="Import schedules in bulk",
+    description=f"Creates schedules from an NDJSON or CSV body with the fields `room_id`, `movie_id`, `show_date` and `start_time`. Lines are checked and inserted in batches; lines that fail (invalid data, an unknown room or movie, or a show overlapping another schedule in the room) are reported with their line number and skipped, while the rest of the file is imported. {LINE_LENGTH_DESCRIPTION}",
+    openapi_extra=IMPORT_REQUEST_BODY
+)
+@budget(UNBOUNDED)
+async def import_schedules(
+    request: Request,
+    import_format: Optional[str] = Query(None, alias="format", pattern="^(ndjson|csv)$", description=IMPORT_FORMAT_DESCRIPTION),
+    max_errors: int = Query(DEFAULT_MAX_ERRORS, ge=0, description=MAX_ERRORS_DESCRIPTION)
+):
+    fmt = resolve_import_format(import_format, request.headers.get("content-type"))
+    return await stream_import(request, "schedules", fmt, max_errors)
@@ -0,0 +1,110 @@
+# app/routers/live.py
+#
+# Live seat updates of a schedule over WebSocket or server-sent events. Both endpoints
+# send the same messages (see app/seat_events.py) and read seat maps with the sync
+# engine in the threadpool, so they are shared by the sync and async modes.
+
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Path, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from .. import models
+from ..database import SessionLocal, get_engine
+from ..query_budget import budget, UNBOUNDED
+from ..seat_events import seat_updates
+from ..seat_holds import seat_holds
+from ..seat_state import SeatBitmap, seat_state, rebuild
+
+router = APIRouter(
+    prefix="/bookings",
+    tags=["bookings"],
+)
+
+# WebSocket close code sent when the schedule does not exist
+SCHEDULE_NOT_FOUND_CLOSE_CODE = 4404
+
+LIVE_MESSAGES_DESCRIPTION = "The first message is a `snapshot` of the seat map in the run-length format, with held seats shown as booked. Each later `delta` lists the seats `taken` (booked or held) and `freed` (a hold released or expired) since the previous message as `[row, seat]` pairs; changes that arrive while the client is still reading are merged into one delta. A client that falls too far behind receives a new `snapshot`. Every message carries the sequence number `seq` of the last change it includes. A `ping` is sent after 15 seconds without changes."
+
+
+# The schedule's seat map with held seats marked, or None if the schedule does not exist.
+def _load_seat_map(schedule_id: int) -> Optional[SeatBitmap]:
+    bitmap = seat_state.get(schedule_id)
+    if bitmap is None:
+        with SessionLocal(bind=get_engine()) as db:
+            schedule = db.get(models.Schedule, schedule_id)
+            if schedule is None:
+                return None
+            bitmap = rebuild(db, schedule)
+            if bitmap is None:
+                return None
+    return seat_holds.overlay(bitmap)
+
+
+def _seat_map_loader(schedule_id: int):
+    async def load() -> Optional[SeatBitmap]:
+        return await run_in_threadpool(_load_seat_map, schedule_id)
+    return load
+
+
+# The first (type, message) pair of a subscription, or None when the schedule does not exist.
+async def _first_message(updates) -> Optional[tuple]:
+    try:
+        return await updates.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+# Endpoint to follow the seat map of a schedule over a WebSocket
+@router.websocket("/{schedule_id}/seats/live")
+@budget(UNBOUNDED)
+async def seat_updates_websocket(websocket: WebSocket, schedule_id: int = Path(..., description="The unique ID of the schedule to follow.")):
+    updates = seat_updates(schedule_id, _seat_map_loader(schedule_id), on_idle=seat_holds.expire)
+    try:
+        first = await _first_message(updates)
+        if first is None:
+            await websocket.close(code=SCHEDULE_NOT_FOUND_CLOSE_CODE, reason="Schedule not found")
+            return
+        await websocket.accept()
+        await websocket.send_text(first[1].decode())
+        async for _, message in updates:
+            await websocket.send_text(message.decode())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await updates.aclose()
+
+
+# Server-sent event framing of the messages, each event named after its message type.
+async def _sse_events(first: tuple, updates):
+    try:
+        message_type, message = first
+        while True:
+            yield b"event: " + message_type.encode() + b"\ndata: " + message + b"\n\n"
+            message_type, message = await updates.__anext__()
+    except StopAsyncIteration:
+        pass
+    finally:
+        await updates.aclose()
+
+
+# Endpoint to follow the seat map of a schedule as server-sent events
+@router.get(
+    "/{schedule_id}/seats/events",
+    summary="Follow seat availability (server-sent events)",
+    description=f"Streams the seat changes of a schedule as server-sent events, for clients that cannot open a WebSocket; `/bookings/{{schedule_id}}/seats/live` sends the same messages over a WebSocket. Each event is named after its message type. {LIVE_MESSAGES_DESCRIPTION} Returns a 404 error if the schedule does not exist.",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}}
+)
+@budget(UNBOUNDED)
+async def seat_updates_events(schedule_id: int = Path(..., description="The unique ID of the schedule to follow.")):
+    updates = seat_updates(schedule_id, _seat_map_loader(schedule_id), on_idle=seat_holds.expire)
+    # Read the snapshot before answering, so a missing schedule is a plain 404
+    first = await _first_message(updates)
+    if first is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Schedule not found")
+
+    return StreamingResponse(
+        _sse_events(first, updates),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,44 @@
+# app/routers/metrics.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..database import created_pool_stats
+from ..query_budget import budget
+from ..metrics import metrics
+
+router = APIRouter(
+    tags=["health"],
+)
+
+# Content type of the Prometheus text exposition format.
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Endpoint to expose request and database metrics to Prometheus
+@router.get(
+    "/metrics",
+    summary="Prometheus metrics",
+    description="Per-route request counts and latency histograms, with the number of database queries, database time and rows fetched per route, plus connection pool checkout counters. Counters cover this worker process since startup.",
+    response_class=PlainTextResponse
+)
+@budget(0)
+def get_metrics():
+    lines = [
+        "# HELP db_pool_checkouts_total Connections checked out of the pool.",
+        "# TYPE db_pool_checkouts_total counter",
+    ]
+    snapshots = {name: stats.snapshot() for name, stats in created_pool_stats().items()}
+    for name, snapshot in snapshots.items():
+        lines.append(f'db_pool_checkouts_total{{engine="{name}"}} {snapshot["checkouts"]}')
+    lines += [
+        "# HELP db_pool_wait_seconds_total Time spent waiting for a pooled connection.",
+        "# TYPE db_pool_wait_seconds_total counter",
+    ]
+    for name, snapshot in snapshots.items():
+        lines.append(f'db_pool_wait_seconds_total{{engine="{name}"}} {snapshot["wait_total_ms"] / 1000}')
+    lines += [
+        "# HELP db_pool_timeouts_total Checkouts that gave up waiting for a connection.",
+        "# TYPE db_pool_timeouts_total counter",
+    ]
+    for name, snapshot in snapshots.items():
+        lines.append(f'db_pool_timeouts_total{{engine="{name}"}} {snapshot["timeouts"]}')
+    return PlainTextResponse(metrics.render() + "\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE)
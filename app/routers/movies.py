@@ -1,9 +1,13 @@
 # app/routers/movies.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Path
+from fastapi import APIRouter, Depends, status, Path, Request
 from sqlalchemy.orm import Session
 from .. import schemas, models
 from ..database import get_db
+from ..query_budget import budget
+from ..response_cache import catalog_cache
+from ..pagination import PageParams
+from .common.movies import movie_page_query, movie_title_query, movie_schedule_query, movie_or_404, check_title_free, check_no_schedules
 
 router = APIRouter(
     prefix="/movies",
@@ -13,13 +17,18 @@ router = APIRouter(
 # Endpoint to get a list of all movies
 @router.get(
     "/movies/",
-    response_model=list[schemas.Movie],
+    response_model=schemas.Page[schemas.Movie],
     summary="Get all movies",
-    description="Retrieve a list of all movies in the database, including their details and poster URLs."
+    description="Retrieve a page of movies in the database, including their details and poster URLs. Pass the returned `next_cursor` as `cursor` to fetch the next page, and `fields` to return only some columns."
 )
-def get_all_movies(db: Session = Depends(get_db)):
-    movies = db.query(models.Movie).all()
-    return movies
+@budget(1)
+def get_all_movies(request: Request, params: PageParams = Depends(), db: Session = Depends(get_db)):
+    cached = catalog_cache.lookup(request)
+    if cached.response:
+        return cached.response
+
+    statement, build_page = movie_page_query(params)
+    return cached.store(build_page(db.execute(statement)))
 
 # Endpoint to get a single movie by ID
 @router.get(
@@ -28,17 +37,18 @@ def get_all_movies(db: Session = Depends(get_db)):
     summary="Get a single movie",
     description="Retrieve a single movie by its unique ID. Returns a 404 error if the movie is not found."
 )
+@budget(1)
 def get_movie(
+    request: Request,
     movie_id: int = Path(..., description="The unique ID of the movie to retrieve."),
     db: Session = Depends(get_db)
 ):
-    movie = db.query(models.Movie).filter(models.Movie.id == movie_id).first()
-    if not movie:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Movie not found"
-        )
-    return movie
+    cached = catalog_cache.lookup(request)
+    if cached.response:
+        return cached.response
+
+    movie = movie_or_404(db.get(models.Movie, movie_id))
+    return cached.store(schemas.Movie.model_validate(movie))
 
 # Endpoint to create a new movie
 @router.post(
@@ -48,18 +58,15 @@ def get_movie(
     summary="Create a new movie",
     description="Creates a new movie with a unique title and a poster URL. A conflict error is returned if a movie with the same title already exists."
 )
+@budget(3)
 def create_movie(movie: schemas.MovieCreate, db: Session = Depends(get_db)):
     # Check if a movie with the same title already exists
-    existing_movie = db.query(models.Movie).filter(models.Movie.title == movie.title).first()
-    if existing_movie:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="A movie with this title already exists"
-        )
+    check_title_free(db.scalar(movie_title_query(movie.title)))
 
     db_movie = models.Movie(**movie.model_dump())
     db.add(db_movie)
     db.commit()
+    catalog_cache.invalidate()
     db.refresh(db_movie)
     return db_movie
 
@@ -70,29 +77,21 @@ def create_movie(movie: schemas.MovieCreate, db: Session = Depends(get_db)):
     summary="Update a movie",
     description="Updates an existing movie's details. An update is only permitted if the movie has no existing schedules."
 )
+@budget(4)
 def update_movie(
     movie: schemas.MovieCreate,
     movie_id: int = Path(..., description="The unique ID of the movie to update."),
     db: Session = Depends(get_db)
 ):
-    db_movie = db.query(models.Movie).filter(models.Movie.id == movie_id).first()
-    if not db_movie:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Movie not found"
-        )
+    db_movie = movie_or_404(db.get(models.Movie, movie_id))
 
     # Check if the movie has any schedules before updating
-    schedules = db.query(models.Schedule).filter(models.Schedule.movie_id == movie_id).all()
-    if schedules:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Cannot update movie, it has existing schedules"
-        )
+    check_no_schedules(db.scalar(movie_schedule_query(movie_id)), "update")
 
     for key, value in movie.model_dump().items():
         setattr(db_movie, key, value)
     db.commit()
+    catalog_cache.invalidate()
     db.refresh(db_movie)
     return db_movie
 
@@ -103,25 +102,17 @@ def update_movie(
     summary="Delete a movie",
     description="Deletes a movie by its ID. This operation is only permitted if the movie has no existing schedules to prevent data integrity issues."
 )
+@budget(4)
 def delete_movie(
     movie_id: int = Path(..., description="The unique ID of the movie to delete."),
     db: Session = Depends(get_db)
 ):
-    db_movie = db.query(models.Movie).filter(models.Movie.id == movie_id).first()
-    if not db_movie:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Movie not found"
-        )
+    db_movie = movie_or_404(db.get(models.Movie, movie_id))
 
     # Check if the movie has any schedules before deleting
-    schedules = db.query(models.Schedule).filter(models.Schedule.movie_id == movie_id).all()
-    if schedules:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Cannot delete movie, it has existing schedules"
-        )
+    check_no_schedules(db.scalar(movie_schedule_query(movie_id)), "delete")
 
     db.delete(db_movie)
     db.commit()
+    catalog_cache.invalidate()
     return {"message": "Movie deleted successfully"}
\ No newline at end of file
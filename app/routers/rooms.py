@@ -1,7 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Path
-from sqlalchemy.orm import Session, joinedload
+from fastapi import APIRouter, Depends, status, Path, Query, Request
+from typing import Optional
+from datetime import date
+from sqlalchemy.orm import Session
 from .. import schemas, models
 from ..database import get_db
+from ..query_budget import budget
+from ..response_cache import catalog_cache
+from ..serialization import respond
+from ..pagination import PageParams
+from ..room_analytics import analytics_cache, booked_total_query, build_analytics, seat_count_query, occupancy_query
+from .common.rooms import (
+    ROOM_LIST_RESPONSES, MAX_ANALYTICS_DAYS, ANALYTICS_DESCRIPTION, check_analytics_range, check_room_expansion, room_page_query,
+    room_with_schedules_query, room_name_query, room_schedule_query, room_or_404, check_name_free, check_no_schedules, saved_room
+)
 
 router = APIRouter(
     prefix="/rooms",
@@ -11,13 +22,27 @@ router = APIRouter(
 # Endpoint to get a list of all rooms
 @router.get(
     "/",
-    response_model=list[schemas.Room],
+    response_model=None,
     summary="Get all rooms",
-    description="Retrieve a list of all cinema rooms and their details. This endpoint provides a complete overview of all available rooms."
+    description="Retrieve a page of cinema rooms and their details. Rooms are summarized by default; `expand=schedules` includes each room's schedules with movie details, optionally limited to a date window. Pass the returned `next_cursor` as `cursor` to fetch the next page, and `fields` to return only some columns.",
+    responses=ROOM_LIST_RESPONSES
 )
-def get_all_rooms(db: Session = Depends(get_db)):
-    rooms = db.query(models.Room).all()
-    return rooms
+@budget(2)
+def get_all_rooms(
+    request: Request,
+    params: PageParams = Depends(),
+    expand: Optional[schemas.RoomExpand] = Query(None, description="Include related data: `schedules` adds each room's schedules with movie details."),
+    schedules_from: Optional[date] = Query(None, description="With expand=schedules, only include schedules on or after this date."),
+    schedules_to: Optional[date] = Query(None, description="With expand=schedules, only include schedules on or before this date."),
+    db: Session = Depends(get_db)
+):
+    check_room_expansion(params, expand, schedules_from, schedules_to)
+    cached = catalog_cache.lookup(request, bookings=expand == schemas.RoomExpand.schedules)
+    if cached.response:
+        return cached.response
+
+    statement, build_page = room_page_query(params, expand, schedules_from, schedules_to)
+    return cached.store(build_page(db.execute(statement)))
 
 # Endpoint to get a single room by ID
 @router.get(
@@ -26,17 +51,53 @@ def get_all_rooms(db: Session = Depends(get_db)):
     summary="Get a single room",
     description="Retrieve a single cinema room by its unique ID. The response includes a list of all schedules for that room, with movie details."
 )
+@budget(3)
 def get_room(
+    request: Request,
     room_id: int = Path(..., description="The unique ID of the room to retrieve."),
     db: Session = Depends(get_db)
 ):
-    room = db.query(models.Room).options(joinedload(models.Room.schedules).joinedload(models.Schedule.movie)).filter(models.Room.id == room_id).first()
-    if not room:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Room not found"
-        )
-    return room
+    cached = catalog_cache.lookup(request, bookings=True)
+    if cached.response:
+        return cached.response
+
+    room = room_or_404(db.execute(room_with_schedules_query(room_id)).unique().scalar_one_or_none())
+    return cached.store(schemas.Room.model_validate(room))
+
+# Endpoint to get seat popularity and occupancy analytics for a room
+@router.get(
+    "/{room_id}/analytics",
+    response_model=schemas.RoomAnalytics,
+    summary="Get seat popularity and occupancy analytics for a room",
+    description=ANALYTICS_DESCRIPTION
+)
+@budget(4)
+def get_room_analytics(
+    room_id: int = Path(..., description="The unique ID of the room to analyse."),
+    date_from: date = Query(..., description="First show date to include."),
+    date_to: date = Query(..., description=f"Last show date to include; at most {MAX_ANALYTICS_DAYS} days after `date_from`."),
+    db: Session = Depends(get_db)
+):
+    check_analytics_range(date_from, date_to)
+    key = None
+    if analytics_cache.cacheable(date_to):
+        booked = db.execute(booked_total_query(room_id, date_from, date_to)).scalar_one()
+        key = analytics_cache.key(room_id, date_from, date_to, booked)
+    analytics = analytics_cache.get(key)
+    if analytics is not None:
+        return respond(analytics)
+
+    room = room_or_404(db.get(models.Room, room_id))
+
+    analytics = build_analytics(
+        room,
+        date_from,
+        date_to,
+        db.execute(seat_count_query(room_id, date_from, date_to)).all(),
+        db.execute(occupancy_query(room_id, date_from, date_to)).all()
+    )
+    analytics_cache.put(key, analytics)
+    return respond(analytics)
 
 # Endpoint to create a new room
 @router.post(
@@ -46,20 +107,16 @@ def get_room(
     summary="Create a new room",
     description="Creates a new cinema room with a unique name and seating dimensions. A conflict error is returned if a room with the same name already exists."
 )
+@budget(4)
 def create_room(room: schemas.RoomCreate, db: Session = Depends(get_db)):
     # Check if a room with the same name already exists
-    existing_room = db.query(models.Room).filter(models.Room.name == room.name).first()
-    if existing_room:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="A room with this name already exists"
-        )
+    check_name_free(db.scalar(room_name_query(room.name)))
 
     db_room = models.Room(**room.model_dump())
     db.add(db_room)
     db.commit()
-    db.refresh(db_room)
-    return db_room
+    catalog_cache.invalidate()
+    return saved_room(db_room)
 
 # Endpoint to update a room
 @router.put(
@@ -68,31 +125,22 @@ def create_room(room: schemas.RoomCreate, db: Session = Depends(get_db)):
     summary="Update a room",
     description="Updates an existing room's details, such as name and seating capacity. An update is only possible if the room does not have any existing schedules."
 )
+@budget(5)
 def update_room(
     room: schemas.RoomCreate,
     room_id: int = Path(..., description="The unique ID of the room to update."),
     db: Session = Depends(get_db)
 ):
-    db_room = db.query(models.Room).filter(models.Room.id == room_id).first()
-    if not db_room:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Room not found"
-        )
-    
+    db_room = room_or_404(db.get(models.Room, room_id))
+
     # Check if the room has any schedules before updating
-    schedules = db.query(models.Schedule).filter(models.Schedule.room_id == room_id).all()
-    if schedules:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Cannot update room, it has existing schedules"
-        )
+    check_no_schedules(db.scalar(room_schedule_query(room_id)), "update")
     
     for key, value in room.model_dump().items():
         setattr(db_room, key, value)
     db.commit()
-    db.refresh(db_room)
-    return db_room
+    catalog_cache.invalidate()
+    return saved_room(db_room)
 
 # Endpoint to delete a room
 @router.delete(
@@ -101,25 +149,17 @@ def update_room(
     summary="Delete a room",
     description="Deletes a room by its ID. This operation is only permitted if the room has no existing schedules to prevent data integrity issues."
 )
+@budget(4)
 def delete_room(
     room_id: int = Path(..., description="The unique ID of the room to delete."),
     db: Session = Depends(get_db)
 ):
-    db_room = db.query(models.Room).filter(models.Room.id == room_id).first()
-    if not db_room:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Room not found"
-        )
-    
+    db_room = room_or_404(db.get(models.Room, room_id))
+
     # Check if the room has any schedules before deleting
-    schedules = db.query(models.Schedule).filter(models.Schedule.room_id == room_id).all()
-    if schedules:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Cannot delete room, it has existing schedules"
-        )
+    check_no_schedules(db.scalar(room_schedule_query(room_id)), "delete")
 
     db.delete(db_room)
     db.commit()
+    catalog_cache.invalidate()
     return {"message": "Room deleted successfully"}
\ No newline at end of file
@@ -1,55 +1,62 @@
 # app/routers/schedules.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Path
-from sqlalchemy.orm import Session, joinedload
+from typing import List
+from fastapi import APIRouter, Depends, status, Path, Query
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
 from .. import schemas, models
 from ..database import get_db
+from ..query_budget import budget
+from ..serialization import movie_row, showtime_row, respond
+from ..pagination import PageParams
+from ..schedule_conflicts import ScheduleIntervals, occupied_minutes, overlap_query
+from .common.movies import movie_or_404
+from .common.rooms import room_id_query, room_or_404
+from .common.schedules import (
+    ShowtimeSearch, showtime_query, expand_recurrence, partition_slots, check_program, room_schedule_page_query, runtimes_query,
+    check_room_free, schedules_changed, recurring_values, recurring_ids_query, recurring_response
+)
 
 router = APIRouter(
     prefix="/schedules",
     tags=["schedules"],
 )
 
+# Endpoint to search showtimes across rooms
+@router.get(
+    "/",
+    response_model=List[schemas.Showtime],
+    summary="Search showtimes",
+    description="Lists showtimes across rooms between `date_from` and `date_to` (inclusive, today by default), optionally for one movie or room. Each showtime includes the room's capacity and its booked and available seats, read from the schedule's booked-seat counter. `hide_sold_out` drops full showtimes and `min_available` those with fewer free seats; `sort` orders by time, by most available seats, or by movie title."
+)
+@budget(1)
+def search_showtimes(search: ShowtimeSearch = Depends(), db: Session = Depends(get_db)):
+    rows = db.execute(showtime_query(search)).all()
+    return respond([showtime_row(row) for row in rows])
+
 # Endpoint to create a new schedule for a room
 @router.post(
     "/rooms/{room_id}",
     response_model=schemas.Schedule,
     status_code=status.HTTP_201_CREATED,
     summary="Create a new schedule for a room",
-    description="Creates a new movie schedule for a specific room. The room ID is taken from the URL, while the movie ID, date, and time are provided in the request body."
+    description="Creates a new movie schedule for a specific room. The room ID is taken from the URL, while the movie ID, date, and time are provided in the request body. A conflict error is returned if the show, including the movie's runtime and the cleaning buffer after it, overlaps another schedule in the room."
 )
+@budget(6)
 def create_schedule_for_room(
     schedule: schemas.ScheduleCreateInRoom,
     room_id: int = Path(..., description="The unique ID of the room for which the schedule will be created."),
     db: Session = Depends(get_db)
 ):
     # Check if the room exists
-    room = db.query(models.Room).filter(models.Room.id == room_id).first()
-    if not room:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Room not found"
-        )
+    room_or_404(db.get(models.Room, room_id))
 
     # Check if the movie exists
-    movie = db.query(models.Movie).filter(models.Movie.id == schedule.movie_id).first()
-    if not movie:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Movie not found"
-        )
-    
-    # Check for schedule conflicts
-    existing_schedule = db.query(models.Schedule).filter(
-        models.Schedule.room_id == room_id,
-        models.Schedule.show_date == schedule.show_date,
-        models.Schedule.start_time == schedule.start_time
-    ).first()
-    if existing_schedule:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="A schedule for this room, date, and time already exists."
-        )
+    movie = movie_or_404(db.get(models.Movie, schedule.movie_id))
+
+    # Check that the room is free for the movie's runtime plus the cleaning buffer
+    intervals = ScheduleIntervals.from_rows(db.execute(overlap_query([room_id], [schedule.show_date])))
+    check_room_free(intervals, room_id, schedule.show_date, schedule.start_time, movie)
 
     # Manually create the Schedule object to ensure the correct Python time object is used
     db_schedule = models.Schedule(
@@ -61,31 +68,80 @@ def create_schedule_for_room(
     
     db.add(db_schedule)
     db.commit()
+    schedules_changed()
     db.refresh(db_schedule)
     return db_schedule
 
+# Endpoint to create the schedules of a recurring showtime
+@router.post(
+    "/rooms/{room_id}/recurring",
+    response_model=schemas.RecurringSchedules,
+    status_code=status.HTTP_201_CREATED,
+    summary="Create recurring schedules for a room",
+    description="Creates a movie's schedules for every selected weekday between `start_date` and `end_date` (inclusive) at each of the given start times. All slots are checked for overlaps (the movie's runtime plus the cleaning buffer) against the room's existing schedules in one query and created in one transaction; slots that overlap a schedule, or an earlier slot of the same rule, are skipped and listed in the response."
+)
+@budget(5)
+def create_recurring_schedules(
+    rule: schemas.ScheduleRecurrence,
+    room_id: int = Path(..., description="The unique ID of the room to schedule the movie in."),
+    db: Session = Depends(get_db)
+):
+    slots = expand_recurrence(rule)
+
+    room_or_404(db.scalar(room_id_query(room_id)))
+    movie = movie_or_404(db.get(models.Movie, rule.movie_id))
+
+    # The room's schedules around every slot of the rule, in one query
+    intervals = ScheduleIntervals.from_rows(db.execute(overlap_query([room_id], {show_date for show_date, _ in slots})))
+    free, skipped = partition_slots(slots, room_id, occupied_minutes(movie.runtime_minutes), intervals)
+    movie_data = movie_row(movie)
+
+    id_rows = []
+    if free:
+        # One multi-row INSERT, then the new IDs in one query (with RETURNING, SQLite
+        # would insert the rows one at a time to keep them in order)
+        db.execute(insert(models.Schedule), recurring_values(room_id, movie.id, free))
+        db.commit()
+        schedules_changed()
+        id_rows = db.execute(recurring_ids_query(room_id, rule)).all()
+
+    return recurring_response(room_id, movie_data, free, skipped, id_rows)
+
+# Endpoint to check a day's program for a room
+@router.post(
+    "/rooms/{room_id}/validate",
+    response_model=schemas.ProgramCheck,
+    summary="Validate a day's program for a room",
+    description="Checks a full day's program for a room without creating any schedules. Every show is checked for overlaps (the movie's runtime plus the cleaning buffer) with the room's existing schedules and with the other shows of the program; `valid` is true when no show has an error."
+)
+@budget(3)
+def validate_program(
+    program: schemas.DayProgram,
+    room_id: int = Path(..., description="The unique ID of the room the program is for."),
+    db: Session = Depends(get_db)
+):
+    room_or_404(db.scalar(room_id_query(room_id)))
+
+    runtimes = dict(db.execute(runtimes_query({show.movie_id for show in program.shows})).all())
+    intervals = ScheduleIntervals.from_rows(db.execute(overlap_query([room_id], [program.show_date])))
+    return check_program(program, room_id, runtimes, intervals)
+
 # Endpoint to get a list of all schedules for a specific room
 @router.get(
     "/rooms/{room_id}",
-    response_model=list[schemas.Schedule],
+    response_model=schemas.Page[schemas.Schedule],
     summary="Get schedules for a room",
-    description="Retrieve a list of all schedules for a given room. Returns a 404 error if the room does not exist, or an empty list if the room has no schedules."
+    description="Retrieve a page of schedules for a given room. Returns a 404 error if the room does not exist, or an empty page if the room has no schedules. Pass the returned `next_cursor` as `cursor` to fetch the next page, and `fields` to return only some columns. Each schedule carries its `booked_seats` count; `hide_sold_out` leaves out the full ones."
 )
+@budget(2)
 def get_schedules_for_room(
     room_id: int = Path(..., description="The unique ID of the room to retrieve schedules for."),
+    params: PageParams = Depends(),
+    hide_sold_out: bool = Query(False, description="Leave out schedules whose seats are all booked."),
     db: Session = Depends(get_db)
 ):
     # First, check if the room exists
-    room = db.query(models.Room).filter(models.Room.id == room_id).first()
-    if not room:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Room not found"
-        )
-    
-    # Then, retrieve schedules with an optimized query to fetch movie data
-    schedules = db.query(models.Schedule).options(joinedload(models.Schedule.movie)).filter(
-        models.Schedule.room_id == room_id
-    ).all()
-    
-    return schedules
\ No newline at end of file
+    room = room_or_404(db.get(models.Room, room_id))
+
+    statement, build_page = room_schedule_page_query(room, hide_sold_out, params)
+    return build_page(db.execute(statement))
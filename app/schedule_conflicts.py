@@ -0,0 +1,131 @@
+# app/schedule_conflicts.py
+#
+# Overlap-based schedule conflicts. A schedule occupies its room from its start time for
+# the movie's runtime plus a cleaning buffer, and two schedules of one room conflict when
+# those intervals overlap (a show may run past midnight into the next day).
+#
+# Conflicts are checked against the room's schedules on the days around the new slots,
+# loaded with one query on the (room_id, show_date) index, so a check costs the same
+# whether the room holds a week or years of schedules. The loaded schedules are kept in
+# one sorted interval list per room and day.
+
+from bisect import bisect_left, bisect_right
+from datetime import date, time, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import select
+from . import models
+from .config import settings
+
+MINUTES_PER_DAY = 24 * 60
+
+ONE_DAY = timedelta(days=1)
+
+
+# Minutes a schedule of a movie occupies its room: the runtime plus the cleaning buffer.
+def occupied_minutes(runtime_minutes: Optional[int]) -> int:
+    return (runtime_minutes or settings.default_runtime_minutes) + settings.cleaning_buffer_minutes
+
+
+def minute_of_day(start_time: time) -> int:
+    return start_time.hour * 60 + start_time.minute
+
+
+def format_minute(minute: int) -> str:
+    minute %= MINUTES_PER_DAY
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+# The occupied intervals of one room on one day, in minutes from midnight and sorted by
+# start. Shows of the previous day that run past midnight are included with a negative
+# start. reach[i] is the latest end among the first i + 1 intervals, so a lookup can stop
+# as soon as no earlier interval reaches the slot.
+class DayIntervals:
+    __slots__ = ("starts", "intervals", "reach")
+
+    def __init__(self):
+        self.starts: list = []
+        self.intervals: list = []
+        self.reach: list = []
+
+    def add(self, start: int, end: int, label: str):
+        index = bisect_right(self.starts, start)
+        self.starts.insert(index, start)
+        self.intervals.insert(index, (start, end, label))
+        self.reach.insert(index, end)
+        previous = self.reach[index - 1] if index else end
+        for position in range(index, len(self.reach)):
+            previous = max(previous, self.intervals[position][1])
+            self.reach[position] = previous
+
+    # The first interval overlapping [start, end), or None.
+    def overlapping(self, start: int, end: int) -> Optional[tuple]:
+        position = bisect_left(self.starts, end) - 1
+        while position >= 0 and self.reach[position] > start:
+            interval = self.intervals[position]
+            if interval[1] > start:
+                return interval
+            position -= 1
+        return None
+
+
+# Occupied intervals per (room_id, show_date).
+class ScheduleIntervals:
+    def __init__(self):
+        self.days: dict = {}
+
+    # Build from rows of overlap_query().
+    @classmethod
+    def from_rows(cls, rows) -> "ScheduleIntervals":
+        intervals = cls()
+        for schedule_id, room_id, show_date, start_time, runtime_minutes in rows:
+            intervals.add(room_id, show_date, start_time, occupied_minutes(runtime_minutes), f"schedule {schedule_id}")
+        return intervals
+
+    def _day(self, room_id: int, show_date: date) -> DayIntervals:
+        day = self.days.get((room_id, show_date))
+        if day is None:
+            day = self.days[(room_id, show_date)] = DayIntervals()
+        return day
+
+    def add(self, room_id: int, show_date: date, start_time: time, minutes: int, label: str):
+        start = minute_of_day(start_time)
+        end = start + minutes
+        self._day(room_id, show_date).add(start, end, label)
+        if end > MINUTES_PER_DAY:
+            self._day(room_id, show_date + ONE_DAY).add(start - MINUTES_PER_DAY, end - MINUTES_PER_DAY, label)
+
+    # Describe what a new slot would overlap, or return None when the room is free.
+    def conflict(self, room_id: int, show_date: date, start_time: time, minutes: int) -> Optional[str]:
+        start = minute_of_day(start_time)
+        end = start + minutes
+        interval = None
+        day = self.days.get((room_id, show_date))
+        if day is not None:
+            interval = day.overlapping(start, end)
+        if interval is None and end > MINUTES_PER_DAY:
+            next_day = self.days.get((room_id, show_date + ONE_DAY))
+            if next_day is not None:
+                interval = next_day.overlapping(start - MINUTES_PER_DAY, end - MINUTES_PER_DAY)
+        if interval is None:
+            return None
+        other_start, other_end, label = interval
+        return f"Overlaps {label} ({format_minute(other_start)}-{format_minute(other_end)}, including cleaning)"
+
+
+# Select the schedules that can overlap new slots of the given rooms on the given dates:
+# those of the same days, the day before (running past midnight) and the day after.
+def overlap_query(room_ids: Iterable[int], show_dates: Iterable[date]):
+    dates = set()
+    for show_date in show_dates:
+        dates.update((show_date - ONE_DAY, show_date, show_date + ONE_DAY))
+    return (
+        select(
+            models.Schedule.id,
+            models.Schedule.room_id,
+            models.Schedule.show_date,
+            models.Schedule.start_time,
+            models.Movie.runtime_minutes
+        )
+        .outerjoin(models.Schedule.movie)
+        .where(models.Schedule.room_id.in_(set(room_ids)), models.Schedule.show_date.in_(dates))
+    )
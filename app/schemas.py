@@ -3,7 +3,14 @@
 from __future__ import annotations
 from pydantic import BaseModel, Field, ConfigDict, field_serializer
 from datetime import datetime, date, time
-from typing import List
+from typing import Generic, List, Literal, Optional, TypeVar
+from enum import Enum
+
+T = TypeVar("T")
+
+# Schedules show their start time as HH:MM everywhere
+def format_start_time(start_time: time) -> str:
+    return start_time.strftime('%H:%M')
 
 # Base Schemas
 class RoomBase(BaseModel):
@@ -14,6 +21,7 @@ class RoomBase(BaseModel):
 class MovieBase(BaseModel):
     title: str = Field(..., example="The Matrix")
     poster: str = Field(..., example="https://example.com/matrix.jpg")
+    runtime_minutes: Optional[int] = Field(None, gt=0, le=600, example=136, description="Running time in minutes. Schedules assume a default runtime when it is not set.")
 
 class ScheduleBase(BaseModel):
     show_date: date = Field(..., example="2025-08-15")
@@ -21,7 +29,7 @@ class ScheduleBase(BaseModel):
 
     @field_serializer('start_time')
     def serialize_start_time(self, start_time: time) -> str:
-        return start_time.strftime('%H:%M')
+        return format_start_time(start_time)
 
 class BookingBase(BaseModel):
     row: int = Field(..., example=5)
@@ -41,9 +49,54 @@ class ScheduleCreate(ScheduleBase):
 class ScheduleCreateInRoom(ScheduleBase):
     movie_id: int = Field(..., example=1)
 
+# Days of the week, Monday first (the order of date.weekday())
+class Weekday(str, Enum):
+    monday = "mon"
+    tuesday = "tue"
+    wednesday = "wed"
+    thursday = "thu"
+    friday = "fri"
+    saturday = "sat"
+    sunday = "sun"
+
+class ScheduleRecurrence(BaseModel):
+    movie_id: int = Field(..., example=1)
+    start_date: date = Field(..., example="2025-08-15")
+    end_date: date = Field(..., example="2025-09-25", description="Last day of the run, inclusive.")
+    weekdays: Optional[List[Weekday]] = Field(None, example=["fri", "sat", "sun"], description="Days of the week to schedule; every day when omitted.")
+    start_times: List[time] = Field(..., min_length=1, max_length=24, example=["14:00", "17:00", "20:00", "22:30"])
+
+class ProgramShow(BaseModel):
+    movie_id: int = Field(..., example=1)
+    start_time: time = Field(..., example="18:00")
+
+# A room's program for one day, checked as a whole
+class DayProgram(BaseModel):
+    show_date: date = Field(..., example="2025-08-15")
+    shows: List[ProgramShow] = Field(..., min_length=1, max_length=48)
+
 class BookingCreate(BookingBase):
     schedule_id: int = Field(..., example=1)
 
+# Largest party a group booking or the best-available search accepts
+MAX_PARTY_SIZE = 50
+
+class GroupBookingCreate(BaseModel):
+    schedule_id: int = Field(..., example=1)
+    seats: List[BookingBase] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_PARTY_SIZE,
+        example=[{"row": 5, "seat": 5}, {"row": 5, "seat": 6}]
+    )
+
+class SeatHoldCreate(GroupBookingCreate):
+    pass
+
+class BestAvailableBooking(BaseModel):
+    schedule_id: int = Field(..., example=1)
+    party_size: int = Field(..., ge=1, le=MAX_PARTY_SIZE, example=4)
+
 # Schemas for Reading objects (responses)
 class Movie(MovieBase):
     id: int = Field(..., example=1)
@@ -54,18 +107,160 @@ class Schedule(ScheduleBase):
     id: int = Field(..., example=1)
     room_id: int = Field(..., example=1)
     movie: Movie
+    booked_seats: int = Field(0, example=42)
     
     model_config = ConfigDict(from_attributes=True)
 
-class Room(RoomBase):
+# A showtime found by the schedule search, with its live seat counts
+class Showtime(ScheduleBase):
     id: int = Field(..., example=1)
-    schedules: List[Schedule] = []
-    
+    room_id: int = Field(..., example=1)
+    room_name: str = Field(..., example="Screen 1")
+    movie: Movie
+    capacity: int = Field(..., example=150)
+    booked: int = Field(..., example=127)
+    available: int = Field(..., example=23)
+
+class RoomSummary(RoomBase):
+    id: int = Field(..., example=1)
+
     model_config = ConfigDict(from_attributes=True)
 
+class Room(RoomSummary):
+    schedules: List[Schedule] = []
+
+# A page of a keyset-paginated list
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[int] = Field(None, example=100, description="Pass as `cursor` to fetch the next page; null on the last page.")
+
 class Booking(BookingBase):
     id: int = Field(..., example=1)
     schedule_id: int = Field(..., example=1)
     timestamp: datetime = Field(..., example="2025-08-15T10:30:00")
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+# The best block of adjacent free seats; can be posted as is to /bookings/group
+class BestAvailableSeats(BaseModel):
+    schedule_id: int = Field(..., example=1)
+    seats: List[BookingBase] = Field(..., example=[{"row": 5, "seat": 6}, {"row": 5, "seat": 7}])
+
+class SeatHold(BaseModel):
+    id: str = Field(..., example="4oE3vzfVq1Lx1yQ6v3Jp8A", description="Pass to the confirm or release endpoint.")
+    schedule_id: int = Field(..., example=1)
+    seats: List[BookingBase] = Field(..., example=[{"row": 5, "seat": 6}, {"row": 5, "seat": 7}])
+    expires_at: datetime = Field(..., example="2025-08-15T10:35:00")
+
+class SkippedSchedule(ScheduleBase):
+    reason: str = Field(..., example="Overlaps schedule 12 (17:00-19:15, including cleaning)")
+
+class RecurringSchedules(BaseModel):
+    created: List[Schedule]
+    skipped: List[SkippedSchedule]
+
+class ProgramShowCheck(BaseModel):
+    movie_id: int = Field(..., example=1)
+    start_time: time = Field(..., example="18:00")
+    end_time: Optional[time] = Field(..., example="20:31", description="When the room is free again: the runtime plus the cleaning buffer after the start, possibly on the next day. Null for an unknown movie.")
+    error: Optional[str] = Field(None, example="Overlaps schedule 12 (17:00-19:15, including cleaning)")
+
+    @field_serializer('start_time', 'end_time')
+    def serialize_times(self, value: Optional[time]) -> Optional[str]:
+        return format_start_time(value) if value is not None else None
+
+class ProgramCheck(BaseModel):
+    valid: bool = Field(..., example=False)
+    shows: List[ProgramShowCheck]
+
+class SeatConflictDetail(BaseModel):
+    message: str = Field(..., example="Some seats are already booked")
+    conflicts: List[BookingBase]
+
+class SeatConflict(BaseModel):
+    detail: SeatConflictDetail
+
+# Result of a bulk import
+class ImportLineError(BaseModel):
+    line: int = Field(..., example=12)
+    error: str = Field(..., example="A movie with this title already exists")
+
+class ImportReport(BaseModel):
+    processed: int = Field(..., example=1000, description="Records read, not counting blank lines and the CSV header.")
+    created: int = Field(..., example=998)
+    failed: int = Field(..., example=2)
+    errors: List[ImportLineError]
+    errors_truncated: bool = Field(..., example=False, description="True when more lines failed than are listed in `errors`.")
+
+# Orders of the showtime search
+class ShowtimeSort(str, Enum):
+    time = "time"
+    available = "available"
+    movie = "movie"
+
+# Seat popularity and occupancy analytics of a room
+class Occupancy(BaseModel):
+    schedules: int = Field(..., example=42)
+    booked: int = Field(..., example=4830)
+    seats: int = Field(..., example=6300, description="Seats offered: schedules times the room's capacity.")
+    occupancy: float = Field(..., example=0.7667, description="Booked seats as a fraction of the seats offered.")
+
+class MovieOccupancy(Occupancy):
+    movie_id: int = Field(..., example=1)
+    title: str = Field(..., example="The Matrix")
+
+class WeekdayOccupancy(Occupancy):
+    weekday: Weekday = Field(..., example="fri")
+
+class TimeSlotOccupancy(Occupancy):
+    start_time: str = Field(..., example="18:00")
+
+class RoomAnalytics(Occupancy):
+    room_id: int = Field(..., example=1)
+    date_from: date = Field(..., example="2025-01-01")
+    date_to: date = Field(..., example="2025-03-31")
+    rows: int = Field(..., example=10)
+    seats_per_row: int = Field(..., example=15)
+    seat_bookings: List[List[int]] = Field(..., description="How often each seat was booked, indexed [row - 1][seat - 1].")
+    by_movie: List[MovieOccupancy]
+    by_weekday: List[WeekdayOccupancy]
+    by_time_slot: List[TimeSlotOccupancy]
+
+# Related data that GET /rooms/ can include
+class RoomExpand(str, Enum):
+    schedules = "schedules"
+
+# Seat map representations returned by the seat-map endpoints
+class SeatMapFormat(str, Enum):
+    verbose = "verbose"
+    bitset = "bitset"
+    rle = "rle"
+
+class SeatStatus(BaseModel):
+    row: int = Field(..., example=1)
+    seat: int = Field(..., example=1)
+    is_booked: bool = Field(..., example=False)
+
+class SeatMapBase(BaseModel):
+    room_name: str = Field(..., example="Screen 1")
+    total_rows: int = Field(..., example=10)
+    seats_per_row: int = Field(..., example=15)
+
+class SeatMap(SeatMapBase):
+    seating_layout: List[List[SeatStatus]]
+
+class BitsetSeatMap(SeatMapBase):
+    format: Literal["bitset"] = "bitset"
+    booked: str = Field(
+        ...,
+        example="AAAAAAAAAAAAAAAAAAAAAAAAAAAAAAA=",
+        description="Base64-encoded bitset of booked seats. Seat (row, seat) is bit (row - 1) * seats_per_row + (seat - 1), least significant bit first within each byte."
+    )
+
+class RleSeatMap(SeatMapBase):
+    format: Literal["rle"] = "rle"
+    rows: List[str] = Field(
+        ...,
+        example=["15A", "3A2B10A"],
+        description="One run-length string per row: a count followed by A (available) or B (booked), e.g. \"3A2B10A\"."
+    )
\ No newline at end of file
@@ -0,0 +1,108 @@
+# app/seat_codec.py
+
+import base64
+import re
+from typing import Optional
+from .schemas import SeatMapFormat
+from .seat_state import SeatBitmap
+
+# Vendor media types that select a compact seat map through the Accept header.
+MEDIA_TYPES = {
+    "application/vnd.cinema.seatmap.bitset+json": SeatMapFormat.bitset,
+    "application/vnd.cinema.seatmap.rle+json": SeatMapFormat.rle,
+}
+
+_RUN = re.compile(r"(\d+)([AB])")
+
+
+# Pick the seat map format: the `format` query parameter wins, then a vendor media
+# type in the Accept header, otherwise the verbose layout.
+def resolve_format(requested: Optional[SeatMapFormat], accept: Optional[str]) -> SeatMapFormat:
+    if requested is not None:
+        return requested
+    if accept:
+        for media_range in accept.split(","):
+            media_type = media_range.split(";")[0].strip().lower()
+            if media_type in MEDIA_TYPES:
+                return MEDIA_TYPES[media_type]
+    return SeatMapFormat.verbose
+
+
+# Base64 of the booked-seat bitset. Seat (row, seat) is bit (row - 1) * seats_per_row +
+# (seat - 1), counted from the least significant bit of each byte.
+def encode_bitset(bitmap: SeatBitmap) -> dict:
+    return {
+        "format": SeatMapFormat.bitset.value,
+        "room_name": bitmap.room_name,
+        "total_rows": bitmap.rows,
+        "seats_per_row": bitmap.seats_per_row,
+        "booked": base64.b64encode(bytes(bitmap.bits)).decode("ascii")
+    }
+
+
+# One run-length string per row, e.g. "3A2B10A": 3 available, 2 booked, 10 available.
+def encode_rle(bitmap: SeatBitmap) -> dict:
+    rows = []
+    for row in range(1, bitmap.rows + 1):
+        runs = []
+        current = None
+        length = 0
+        for seat in range(1, bitmap.seats_per_row + 1):
+            state = "B" if bitmap.is_booked(row, seat) else "A"
+            if state == current:
+                length += 1
+                continue
+            if current is not None:
+                runs.append(f"{length}{current}")
+            current = state
+            length = 1
+        runs.append(f"{length}{current}")
+        rows.append("".join(runs))
+
+    return {
+        "format": SeatMapFormat.rle.value,
+        "room_name": bitmap.room_name,
+        "total_rows": bitmap.rows,
+        "seats_per_row": bitmap.seats_per_row,
+        "rows": rows
+    }
+
+
+def encode(bitmap: SeatBitmap, seat_map_format: SeatMapFormat) -> dict:
+    if seat_map_format == SeatMapFormat.bitset:
+        return encode_bitset(bitmap)
+    if seat_map_format == SeatMapFormat.rle:
+        return encode_rle(bitmap)
+    return bitmap.to_response()
+
+
+# Decode any seat map payload returned by the seat-map endpoints into a grid of
+# booleans, where grid[row - 1][seat - 1] is True when the seat is booked.
+def decode(payload: dict) -> list:
+    rows = payload["total_rows"]
+    seats_per_row = payload["seats_per_row"]
+    seat_map_format = payload.get("format", SeatMapFormat.verbose.value)
+
+    if seat_map_format == SeatMapFormat.bitset.value:
+        bits = base64.b64decode(payload["booked"])
+        grid = []
+        for row in range(rows):
+            row_seats = []
+            for seat in range(seats_per_row):
+                index = row * seats_per_row + seat
+                row_seats.append(bool(bits[index >> 3] & (1 << (index & 7))))
+            grid.append(row_seats)
+        return grid
+
+    if seat_map_format == SeatMapFormat.rle.value:
+        grid = []
+        for encoded_row in payload["rows"]:
+            row_seats = []
+            for length, state in _RUN.findall(encoded_row):
+                row_seats.extend([state == "B"] * int(length))
+            if len(row_seats) != seats_per_row:
+                raise ValueError(f"Run-length row {encoded_row!r} does not cover {seats_per_row} seats")
+            grid.append(row_seats)
+        return grid
+
+    return [[seat["is_booked"] for seat in row] for row in payload["seating_layout"]]
@@ -0,0 +1,194 @@
+# app/seat_events.py
+#
+# Live seat updates for the subscription endpoints (WebSocket and SSE). Subscribers of a
+# schedule receive one snapshot of its seat map and then only the seats that changed:
+# seats taken by a booking or a hold, and seats freed when a hold is released or expires.
+#
+# Each schedule with subscribers has one channel, and every change is appended to it
+# once under a sequence number. The channel keeps the last CHANNEL_LOG_SIZE changes and
+# wakes all of its subscribers with a single event. A subscriber then sends everything
+# after the last sequence number it sent, merged into one delta. Subscribers that are up
+# to date share one encoded message, so a change is merged and serialized once per
+# channel, not once per subscriber. A slow consumer blocks only its own send; the
+# changes it misses meanwhile are coalesced into its next delta, and one that falls
+# further behind than the log gets a fresh snapshot instead.
+#
+# Changes are published by the booking and seat hold code, often from threadpool
+# threads, and handed to the event loop that serves the subscribers. Without
+# subscribers publishing costs nothing. Like the seat state, channels belong to one
+# worker process.
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional, Tuple
+import orjson
+from . import seat_codec
+from .schemas import SeatMapFormat
+from .seat_state import SeatBitmap
+
+# Changes a channel remembers for subscribers that are catching up.
+CHANNEL_LOG_SIZE = 256
+
+# Seconds without changes after which subscribers get a ping, which also detects clients
+# that went away and expires due seat holds.
+HEARTBEAT_SECONDS = 15.0
+
+# Message types, sent as the "type" of every message.
+SNAPSHOT = "snapshot"
+DELTA = "delta"
+PING = "ping"
+
+PING_MESSAGE = orjson.dumps({"type": PING})
+
+
+class SeatChannel:
+    def __init__(self, schedule_id: int, seq: int):
+        self.schedule_id = schedule_id
+        self.subscribers = 0
+        # Sequence number of the last change; the log holds (seq, {(row, seat): taken}).
+        self.seq = seq
+        self.log: deque = deque(maxlen=CHANNEL_LOG_SIZE)
+        self._changed = asyncio.Event()
+        # Deltas encoded for the current seq, keyed by the seq they start after.
+        self._deltas: dict = {}
+
+    def append(self, seq: int, changes: dict):
+        self.seq = seq
+        self.log.append((seq, changes))
+        self._deltas = {}
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    # Wait until there are changes after `seq`. Returns False after `timeout` seconds without.
+    async def wait(self, seq: int, timeout: float) -> bool:
+        if self.seq > seq:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    # One message with every change after `seq`, or None when some of those changes
+    # have left the log and the subscriber needs a new snapshot.
+    def delta_after(self, seq: int) -> Optional[bytes]:
+        message = self._deltas.get(seq)
+        if message is not None:
+            return message
+        if not self.log or self.log[0][0] > seq + 1:
+            return None
+        merged = {}
+        for entry_seq, changes in self.log:
+            if entry_seq > seq:
+                merged.update(changes)
+        message = orjson.dumps({
+            "type": DELTA,
+            "schedule_id": self.schedule_id,
+            "seq": self.seq,
+            "taken": sorted([row, seat] for (row, seat), taken in merged.items() if taken),
+            "freed": sorted([row, seat] for (row, seat), taken in merged.items() if not taken)
+        })
+        self._deltas[seq] = message
+        return message
+
+    def snapshot(self, bitmap: SeatBitmap, seq: int) -> bytes:
+        return orjson.dumps({
+            "type": SNAPSHOT,
+            "schedule_id": self.schedule_id,
+            "seq": seq,
+            **seat_codec.encode(bitmap, SeatMapFormat.rle)
+        })
+
+
+class SeatEventHub:
+    def __init__(self):
+        self._channels: dict = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._seq = 0
+        self.published = 0
+
+    # Subscribe to a schedule's changes for the duration of the block. Must run on the
+    # event loop that serves the subscribers.
+    @asynccontextmanager
+    async def subscribe(self, schedule_id: int) -> AsyncIterator[SeatChannel]:
+        if not self._channels:
+            self._loop = asyncio.get_running_loop()
+        channel = self._channels.get(schedule_id)
+        if channel is None:
+            channel = self._channels[schedule_id] = SeatChannel(schedule_id, self._seq)
+        channel.subscribers += 1
+        try:
+            yield channel
+        finally:
+            channel.subscribers -= 1
+            if not channel.subscribers:
+                del self._channels[schedule_id]
+
+    # Record seats of a schedule that were taken or freed. Safe to call from any thread.
+    def publish(self, schedule_id: int, taken: Iterable = (), freed: Iterable = ()):
+        loop = self._loop
+        if loop is None or schedule_id not in self._channels:
+            return
+        changes = {seat: False for seat in freed}
+        changes.update((seat, True) for seat in taken)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._append(schedule_id, changes)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self._append, schedule_id, changes)
+
+    def _append(self, schedule_id: int, changes: dict):
+        channel = self._channels.get(schedule_id)
+        if channel is None or not changes:
+            return
+        self._seq += 1
+        self.published += 1
+        channel.append(self._seq, changes)
+
+    def stats(self) -> dict:
+        return {
+            "channels": len(self._channels),
+            "subscribers": sum(channel.subscribers for channel in list(self._channels.values())),
+            "published": self.published
+        }
+
+
+seat_events = SeatEventHub()
+
+
+# The messages for one subscriber: a snapshot, then deltas, snapshots after falling
+# behind, and pings while nothing changes. Each is yielded as a (type, encoded message)
+# pair, so transports that name their events (SSE) need not parse the JSON. `load_bitmap`
+# returns the schedule's current seat map (held seats included), or None once the
+# schedule is gone. `on_idle` runs before each ping.
+async def seat_updates(
+    schedule_id: int,
+    load_bitmap: Callable[[], Awaitable[Optional[SeatBitmap]]],
+    on_idle: Optional[Callable[[], None]] = None
+) -> AsyncIterator[Tuple[str, bytes]]:
+    async with seat_events.subscribe(schedule_id) as channel:
+        seq = channel.seq
+        bitmap = await load_bitmap()
+        if bitmap is None:
+            return
+        yield SNAPSHOT, channel.snapshot(bitmap, seq)
+        while True:
+            if not await channel.wait(seq, HEARTBEAT_SECONDS):
+                if on_idle is not None:
+                    on_idle()
+                yield PING, PING_MESSAGE
+                continue
+            message = channel.delta_after(seq)
+            if message is None:
+                seq = channel.seq
+                bitmap = await load_bitmap()
+                if bitmap is None:
+                    return
+                yield SNAPSHOT, channel.snapshot(bitmap, seq)
+            else:
+                seq = channel.seq
+                yield DELTA, message
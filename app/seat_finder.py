@@ -0,0 +1,64 @@
+# app/seat_finder.py
+#
+# Best-available seat search: the block of N adjacent free seats in one row whose
+# center is closest to the center of the room.
+#
+# Each row is searched as an integer mask of its free seats (SeatBitmap.free_rows).
+# ANDing the mask with shifted copies of itself, doubling the shift each time, leaves
+# bit i set exactly when seats i + 1 .. i + N are all free, in O(log N) integer
+# operations per row. Within a row only the valid starts nearest the centered position
+# can win, and they are found with two bit scans. Rows are visited from the center
+# outwards, and the search stops once a row's distance alone exceeds the best block
+# found, so large rooms cost a handful of integer operations per row visited.
+
+from typing import Optional
+from .seat_state import SeatBitmap
+
+
+# Mask of the 0-based seat positions where a run of `size` free seats starts.
+def block_starts(free: int, size: int) -> int:
+    starts = free
+    length = 1
+    while length < size and starts:
+        step = min(length, size - length)
+        starts &= starts >> step
+        length += step
+    return starts
+
+
+# The valid starts nearest to `target` from below and from above (-1 when there is none).
+def _nearest_starts(starts: int, target: int) -> tuple:
+    below = (starts & ((2 << target) - 1)).bit_length() - 1
+    above = starts >> target
+    above = target + (above & -above).bit_length() - 1 if above else -1
+    return below, above
+
+
+# The best block for a party of `size` as (row, first seat), or None when no row has
+# that many adjacent free seats. Blocks are ranked by the squared distance of their
+# center from the room's center (in half-seat units), then by row and seat.
+def best_block(bitmap: SeatBitmap, size: int) -> Optional[tuple]:
+    if not 1 <= size <= bitmap.seats_per_row:
+        return None
+    free_rows = bitmap.free_rows()
+    # Offsets of the block center from the room center, doubled to stay integral
+    row_offsets = sorted(range(bitmap.rows), key=lambda index: (abs(2 * index + 1 - bitmap.rows), index))
+    target = (bitmap.seats_per_row - size) // 2
+
+    best = None
+    for index in row_offsets:
+        row_distance = (2 * index + 1 - bitmap.rows) ** 2
+        if best is not None and row_distance > best[0]:
+            break
+        starts = block_starts(free_rows[index], size)
+        if not starts:
+            continue
+        for start in _nearest_starts(starts, target):
+            if start < 0:
+                continue
+            candidate = (row_distance + (2 * start + size - bitmap.seats_per_row) ** 2, index + 1, start + 1)
+            if best is None or candidate < best:
+                best = candidate
+    if best is None:
+        return None
+    return best[1], best[2]
@@ -0,0 +1,198 @@
+# app/seat_holds.py
+#
+# Time-limited seat holds. A hold reserves seats of a schedule for SEAT_HOLD_TTL seconds,
+# so a customer can pay without losing them, and confirming it turns the seats into
+# bookings. Holds live in memory next to the seat state cache: placing one, checking a
+# seat against the holds and drawing held seats on a seat map cost no queries.
+#
+# Expiry uses a heap ordered by expiry time. Every access first pops the holds whose
+# time is up, so an expired hold is removed in O(log n) and the holds are never
+# scanned. Released holds stay in the heap until their entry reaches the top, where it
+# is skipped.
+#
+# Placed, released and expired holds are published to the live seat updates; the seats
+# of a confirmed hold are published as booked by the booking code.
+#
+# Like the seat state, holds belong to one worker process. When a hold and a booking
+# made elsewhere race, the unique seat constraint on bookings decides.
+
+import heapq
+import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+from .config import settings
+from .seat_events import seat_events
+from .seat_state import SeatBitmap
+
+
+class SeatHold:
+    __slots__ = ("id", "schedule_id", "seats", "deadline", "expires_at")
+
+    def __init__(self, hold_id: str, schedule_id: int, seats: tuple, deadline: float, expires_at: datetime):
+        self.id = hold_id
+        self.schedule_id = schedule_id
+        self.seats = seats
+        # Monotonic clock time at which the hold lapses; expires_at is the same moment in local time.
+        self.deadline = deadline
+        self.expires_at = expires_at
+
+    def to_response(self) -> dict:
+        return {
+            "id": self.id,
+            "schedule_id": self.schedule_id,
+            "seats": [{"row": row, "seat": seat} for row, seat in self.seats],
+            "expires_at": self.expires_at
+        }
+
+
+# Raised by SeatHoldRegistry.hold() when some seats are held by another customer.
+class SeatsHeld(Exception):
+    def __init__(self, seats: list):
+        super().__init__("Some seats are held by another customer")
+        self.seats = seats
+
+
+class SeatHoldRegistry:
+    def __init__(self, ttl: float, clock=time.monotonic):
+        self.ttl = ttl
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._holds: dict = {}
+        # schedule_id -> {(row, seat): hold_id}
+        self._held: dict = {}
+        # (deadline, hold_id), oldest first
+        self._expiry: list = []
+        self.placed = 0
+        self.confirmed = 0
+        self.released = 0
+        self.expired = 0
+
+    # Remove the holds whose time is up and return them; publish their seats with
+    # _publish_expired() once the lock is released.
+    def _expire(self) -> list:
+        now = self.clock()
+        expiry = self._expiry
+        expired = []
+        while expiry and expiry[0][0] <= now:
+            _, hold_id = heapq.heappop(expiry)
+            hold = self._holds.get(hold_id)
+            if hold is not None:
+                self._drop(hold)
+                self.expired += 1
+                expired.append(hold)
+        return expired
+
+    def _publish_expired(self, expired: list):
+        for hold in expired:
+            seat_events.publish(hold.schedule_id, freed=hold.seats)
+
+    # Drop the holds whose time is up. Every other method does this first; calling it
+    # on its own publishes expired seats when nothing else touches the holds.
+    def expire(self):
+        with self._lock:
+            expired = self._expire()
+        self._publish_expired(expired)
+
+    def _drop(self, hold: SeatHold):
+        del self._holds[hold.id]
+        held = self._held[hold.schedule_id]
+        for seat in hold.seats:
+            del held[seat]
+        if not held:
+            del self._held[hold.schedule_id]
+
+    # Hold the seats of a schedule, or raise SeatsHeld listing those held by another hold.
+    # Checking the seats against bookings is up to the caller.
+    def hold(self, schedule_id: int, seats: list) -> SeatHold:
+        with self._lock:
+            expired = self._expire()
+            held = self._held.get(schedule_id, {})
+            conflicts = sorted(seat for seat in seats if seat in held)
+            if not conflicts:
+                hold = SeatHold(
+                    secrets.token_urlsafe(16),
+                    schedule_id,
+                    tuple(seats),
+                    self.clock() + self.ttl,
+                    datetime.now() + timedelta(seconds=self.ttl)
+                )
+                self._holds[hold.id] = hold
+                held = self._held.setdefault(schedule_id, {})
+                for seat in hold.seats:
+                    held[seat] = hold.id
+                heapq.heappush(self._expiry, (hold.deadline, hold.id))
+                self.placed += 1
+        self._publish_expired(expired)
+        if conflicts:
+            raise SeatsHeld(conflicts)
+        seat_events.publish(schedule_id, taken=hold.seats)
+        return hold
+
+    # The hold if it exists and has not expired.
+    def get(self, hold_id: str) -> Optional[SeatHold]:
+        with self._lock:
+            expired = self._expire()
+            hold = self._holds.get(hold_id)
+        self._publish_expired(expired)
+        return hold
+
+    # Drop a hold, after it was confirmed or when the customer gives up. Returns False
+    # if there was no such hold (or it had expired). The seats of a hold that was not
+    # confirmed are published as free again.
+    def release(self, hold_id: str, confirmed: bool = False) -> bool:
+        with self._lock:
+            expired = self._expire()
+            hold = self._holds.get(hold_id)
+            if hold is not None:
+                self._drop(hold)
+                if confirmed:
+                    self.confirmed += 1
+                else:
+                    self.released += 1
+        self._publish_expired(expired)
+        if hold is None:
+            return False
+        if not confirmed:
+            seat_events.publish(hold.schedule_id, freed=hold.seats)
+        return True
+
+    # The seats in `seats` that are currently held for the schedule.
+    def held_conflicts(self, schedule_id: int, seats: list) -> list:
+        with self._lock:
+            expired = self._expire()
+            held = self._held.get(schedule_id) or {}
+            conflicts = sorted(seat for seat in seats if seat in held)
+        self._publish_expired(expired)
+        return conflicts
+
+    # The bitmap with held seats marked as taken, for seat maps and seat searches. The
+    # cached bitmap itself is never modified; without holds it is returned as is.
+    def overlay(self, bitmap: SeatBitmap) -> SeatBitmap:
+        with self._lock:
+            expired = self._expire()
+            held = list(self._held.get(bitmap.schedule_id, ()))
+        self._publish_expired(expired)
+        if not held:
+            return bitmap
+        view = bitmap.copy()
+        for row, seat in held:
+            view.set_booked(row, seat)
+        return view
+
+    def stats(self) -> dict:
+        self.expire()
+        with self._lock:
+            return {
+                "holds": len(self._holds),
+                "held_seats": sum(len(held) for held in self._held.values()),
+                "ttl": self.ttl,
+                "placed": self.placed,
+                "confirmed": self.confirmed,
+                "released": self.released,
+                "expired": self.expired
+            }
+
+
+seat_holds = SeatHoldRegistry(ttl=settings.seat_hold_ttl)
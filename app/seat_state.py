@@ -0,0 +1,293 @@
+# app/seat_state.py
+
+import threading
+from collections import OrderedDict
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from . import models
+
+# Default memory budget for all cached seat maps together (16 MiB).
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# Approximate fixed cost of one cached schedule (objects, dict slots, room name),
+# charged against the budget on top of the bitmap itself.
+ENTRY_OVERHEAD_BYTES = 256
+
+# How many recently written schedules we remember to detect loads that raced a booking.
+RECENT_WRITES_LIMIT = 10_000
+
+
+# A compact bitmap of the booked seats of one schedule.
+# Bit (row - 1) * seats_per_row + (seat - 1) is set when that seat is booked.
+class SeatBitmap:
+    __slots__ = ("schedule_id", "room_name", "rows", "seats_per_row", "bits")
+
+    def __init__(self, schedule_id: int, room_name: str, rows: int, seats_per_row: int):
+        self.schedule_id = schedule_id
+        self.room_name = room_name
+        self.rows = rows
+        self.seats_per_row = seats_per_row
+        self.bits = bytearray((rows * seats_per_row + 7) // 8)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits) + ENTRY_OVERHEAD_BYTES
+
+    def _index(self, row: int, seat: int) -> int:
+        return (row - 1) * self.seats_per_row + (seat - 1)
+
+    def contains(self, row: int, seat: int) -> bool:
+        return 1 <= row <= self.rows and 1 <= seat <= self.seats_per_row
+
+    def is_booked(self, row: int, seat: int) -> bool:
+        index = self._index(row, seat)
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def set_booked(self, row: int, seat: int):
+        # Seats outside the room are ignored so a stray row can never corrupt the map.
+        if not self.contains(row, seat):
+            return
+        index = self._index(row, seat)
+        self.bits[index >> 3] |= 1 << (index & 7)
+
+    def booked_count(self) -> int:
+        return sum(bin(byte).count("1") for byte in self.bits)
+
+    def copy(self) -> "SeatBitmap":
+        bitmap = SeatBitmap(self.schedule_id, self.room_name, self.rows, self.seats_per_row)
+        bitmap.bits[:] = self.bits
+        return bitmap
+
+    # One integer per row with bit (seat - 1) set for every free seat of that row.
+    def free_rows(self) -> list:
+        booked = int.from_bytes(self.bits, "little")
+        full = (1 << self.seats_per_row) - 1
+        rows = []
+        for _ in range(self.rows):
+            rows.append(~booked & full)
+            booked >>= self.seats_per_row
+        return rows
+
+    # Build the same nested layout the seat-map endpoints have always returned.
+    def layout(self) -> list:
+        bits = self.bits
+        seats_per_row = self.seats_per_row
+        seating_layout = []
+        for row in range(1, self.rows + 1):
+            base = (row - 1) * seats_per_row
+            row_seats = []
+            for seat in range(1, seats_per_row + 1):
+                index = base + seat - 1
+                row_seats.append({
+                    "row": row,
+                    "seat": seat,
+                    "is_booked": bool(bits[index >> 3] & (1 << (index & 7)))
+                })
+            seating_layout.append(row_seats)
+        return seating_layout
+
+    def to_response(self) -> dict:
+        return {
+            "room_name": self.room_name,
+            "total_rows": self.rows,
+            "seats_per_row": self.seats_per_row,
+            "seating_layout": self.layout()
+        }
+
+
+# Per-process cache of seat bitmaps, keyed by schedule ID.
+# Entries are kept in LRU order and the least recently used schedules are evicted
+# once the total size exceeds max_bytes. Bookings committed through this process
+# update the cached bitmap in place; rebuild() reloads a schedule from the database.
+class SeatStateEngine:
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, SeatBitmap]" = OrderedDict()
+        # (movie_id, room_id) -> schedule_id, for the movie-and-room seat map. Cleared by
+        # forget_schedules() whenever schedules are created.
+        self._schedule_index: dict = {}
+        self._size = 0
+        # Write sequence numbers used to drop loads that raced a concurrent booking.
+        self._seq = 0
+        self._recent_writes: "OrderedDict[int, int]" = OrderedDict()
+        self._forgotten_seq = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, schedule_id: int):
+        with self._lock:
+            bitmap = self._entries.get(schedule_id)
+            if bitmap is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(schedule_id)
+            self.hits += 1
+            return bitmap
+
+    def schedule_for(self, movie_id: int, room_id: int):
+        with self._lock:
+            return self._schedule_index.get((movie_id, room_id))
+
+    def remember_schedule(self, movie_id: int, room_id: int, schedule_id: int):
+        with self._lock:
+            self._schedule_index[(movie_id, room_id)] = schedule_id
+
+    # Forget the movie-and-room lookups. A new schedule can change which schedule a
+    # movie and room resolve to, so this is called whenever schedules are written.
+    def forget_schedules(self):
+        with self._lock:
+            self._schedule_index.clear()
+
+    # Take a token before reading bookings from the database; pass it to put().
+    def begin_load(self) -> int:
+        with self._lock:
+            return self._seq
+
+    # Cache a freshly loaded bitmap. If a booking for the same schedule was recorded
+    # after `token` was taken, the loaded data may be stale, so it is returned to the
+    # caller but not cached.
+    def put(self, bitmap: SeatBitmap, token: int) -> SeatBitmap:
+        with self._lock:
+            last_write = self._recent_writes.get(bitmap.schedule_id)
+            if last_write is None and token < self._forgotten_seq:
+                return bitmap
+            if last_write is not None and last_write > token:
+                return bitmap
+            if bitmap.nbytes > self.max_bytes:
+                return bitmap
+            previous = self._entries.pop(bitmap.schedule_id, None)
+            if previous is not None:
+                self._size -= previous.nbytes
+            self._entries[bitmap.schedule_id] = bitmap
+            self._size += bitmap.nbytes
+            self._evict()
+            return bitmap
+
+    # Record committed bookings; a cached bitmap is updated in place.
+    def mark_booked(self, schedule_id: int, seats):
+        with self._lock:
+            self._seq += 1
+            self._recent_writes[schedule_id] = self._seq
+            self._recent_writes.move_to_end(schedule_id)
+            while len(self._recent_writes) > RECENT_WRITES_LIMIT:
+                _, seq = self._recent_writes.popitem(last=False)
+                self._forgotten_seq = max(self._forgotten_seq, seq)
+            bitmap = self._entries.get(schedule_id)
+            if bitmap is not None:
+                for row, seat in seats:
+                    bitmap.set_booked(row, seat)
+
+    def invalidate(self, schedule_id: int):
+        with self._lock:
+            bitmap = self._entries.pop(schedule_id, None)
+            if bitmap is not None:
+                self._size -= bitmap.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._schedule_index.clear()
+            self._size = 0
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            _, bitmap = self._entries.popitem(last=False)
+            self._size -= bitmap.nbytes
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "schedules": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions
+            }
+
+
+seat_state = SeatStateEngine()
+
+
+def _build_bitmap(schedule_id: int, room: models.Room, booked_seats) -> SeatBitmap:
+    bitmap = SeatBitmap(schedule_id, room.name, room.rows, room.seats_per_row)
+    for row, seat in booked_seats:
+        bitmap.set_booked(row, seat)
+    return bitmap
+
+
+# Read a schedule's room and booked seats from the database into a new bitmap.
+# Returns None if the schedule or its room does not exist.
+def load_bitmap(db: Session, schedule: models.Schedule):
+    room = db.query(models.Room).filter(models.Room.id == schedule.room_id).first()
+    if not room:
+        return None
+
+    booked_seats = db.query(models.Booking.row, models.Booking.seat).filter(
+        models.Booking.schedule_id == schedule.id
+    ).all()
+    return _build_bitmap(schedule.id, room, booked_seats)
+
+
+# Load (or reload) a schedule's bitmap from the database and cache it.
+def rebuild(db: Session, schedule: models.Schedule, engine: SeatStateEngine = seat_state):
+    token = engine.begin_load()
+    bitmap = load_bitmap(db, schedule)
+    engine.invalidate(schedule.id)
+    if bitmap is None:
+        return None
+    return engine.put(bitmap, token)
+
+
+# Async counterparts of load_bitmap() and rebuild() for the async routers.
+async def load_bitmap_async(db: AsyncSession, schedule: models.Schedule):
+    room = await db.get(models.Room, schedule.room_id)
+    if not room:
+        return None
+
+    booked_seats = (await db.execute(
+        select(models.Booking.row, models.Booking.seat).where(models.Booking.schedule_id == schedule.id)
+    )).all()
+    return _build_bitmap(schedule.id, room, booked_seats)
+
+
+async def rebuild_async(db: AsyncSession, schedule: models.Schedule, engine: SeatStateEngine = seat_state):
+    token = engine.begin_load()
+    bitmap = await load_bitmap_async(db, schedule)
+    engine.invalidate(schedule.id)
+    if bitmap is None:
+        return None
+    return engine.put(bitmap, token)
+
+
+# Load the seat maps of every schedule on one day (e.g. today's shows, at startup) with one
+# query for the schedules and their rooms and one for all of their bookings.
+# Returns the number of schedules loaded.
+def prewarm(db: Session, show_date: date, engine: SeatStateEngine = seat_state) -> int:
+    token = engine.begin_load()
+    schedules = db.query(
+        models.Schedule.id, models.Room.name, models.Room.rows, models.Room.seats_per_row
+    ).join(models.Room, models.Room.id == models.Schedule.room_id).filter(
+        models.Schedule.show_date == show_date
+    ).all()
+    bitmaps = {
+        schedule_id: SeatBitmap(schedule_id, room_name, rows, seats_per_row)
+        for schedule_id, room_name, rows, seats_per_row in schedules
+    }
+    if not bitmaps:
+        return 0
+
+    booked_seats = db.query(models.Booking.schedule_id, models.Booking.row, models.Booking.seat).join(
+        models.Schedule, models.Schedule.id == models.Booking.schedule_id
+    ).filter(models.Schedule.show_date == show_date)
+    for schedule_id, row, seat in booked_seats:
+        bitmaps[schedule_id].set_booked(row, seat)
+
+    for bitmap in bitmaps.values():
+        engine.put(bitmap, token)
+    return len(bitmaps)
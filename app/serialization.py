@@ -0,0 +1,86 @@
+# app/serialization.py
+#
+# Fast serialization mode (FAST_JSON=true). Hot endpoints build plain dicts straight
+# from column rows and return them as ORJSONResponse, skipping both the response-model
+# validation pass and jsonable_encoder. The dicts use the same keys, key order and value
+# formats as the pydantic schemas, so both modes produce the same JSON bytes.
+
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel
+from . import models
+from .config import settings
+from .schemas import format_start_time
+
+
+# In fast mode, wrap already-serializable content in an ORJSONResponse so FastAPI sends
+# it as is. Otherwise the content is returned unchanged for FastAPI's default handling.
+def respond(content, status_code: int = 200, headers: dict = None):
+    if settings.fast_json:
+        return ORJSONResponse(content, status_code=status_code, headers=headers)
+    return content
+
+
+# Render a payload (a response, a pydantic model or JSON-compatible data) to JSON bytes.
+def render_json(payload) -> bytes:
+    if isinstance(payload, Response):
+        return payload.body
+    if isinstance(payload, BaseModel):
+        payload = payload.model_dump(mode="json")
+    if settings.fast_json:
+        return orjson.dumps(payload)
+    return JSONResponse(content=jsonable_encoder(payload)).body
+
+
+# Columns and row builders mirroring schemas.Movie, schemas.RoomSummary and schemas.Schedule.
+MOVIE_COLUMNS = (models.Movie.title, models.Movie.poster, models.Movie.runtime_minutes, models.Movie.id)
+
+def movie_row(row) -> dict:
+    return {"title": row.title, "poster": row.poster, "runtime_minutes": row.runtime_minutes, "id": row.id}
+
+
+ROOM_SUMMARY_COLUMNS = (models.Room.name, models.Room.rows, models.Room.seats_per_row, models.Room.id)
+
+def room_summary_row(row) -> dict:
+    return {"name": row.name, "rows": row.rows, "seats_per_row": row.seats_per_row, "id": row.id}
+
+
+# Select from schedules joined with movies.
+SCHEDULE_COLUMNS = (
+    models.Schedule.show_date,
+    models.Schedule.start_time,
+    models.Schedule.id,
+    models.Schedule.room_id,
+    models.Movie.title.label("movie_title"),
+    models.Movie.poster.label("movie_poster"),
+    models.Movie.runtime_minutes.label("movie_runtime_minutes"),
+    models.Movie.id.label("movie_id"),
+    models.Schedule.booked_seats,
+)
+
+def schedule_row(row) -> dict:
+    return {
+        "show_date": row.show_date.isoformat(),
+        "start_time": format_start_time(row.start_time),
+        "id": row.id,
+        "room_id": row.room_id,
+        "movie": {"title": row.movie_title, "poster": row.movie_poster, "runtime_minutes": row.movie_runtime_minutes, "id": row.movie_id},
+        "booked_seats": row.booked_seats
+    }
+
+
+# Rows of the showtime search: schedules joined with rooms and movies, with seat counts.
+def showtime_row(row) -> dict:
+    return {
+        "show_date": row.show_date.isoformat(),
+        "start_time": format_start_time(row.start_time),
+        "id": row.id,
+        "room_id": row.room_id,
+        "room_name": row.room_name,
+        "movie": {"title": row.movie_title, "poster": row.movie_poster, "runtime_minutes": row.movie_runtime_minutes, "id": row.movie_id},
+        "capacity": row.capacity,
+        "booked": row.booked,
+        "available": row.available
+    }
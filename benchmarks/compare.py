@@ -0,0 +1,47 @@
+# benchmarks/compare.py
+#
+# Compare two result files written by benchmarks.run:
+#
+#     python -m benchmarks.compare before.json after.json
+
+import argparse
+import json
+
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def compare(before: dict, after: dict) -> list:
+    lines = [f"{'scenario':<16}{'metric':<16}{'before':>12}{'after':>12}{'change':>10}"]
+    for name, result in after["scenarios"].items():
+        if name not in before["scenarios"]:
+            continue
+        baseline = before["scenarios"][name]
+        metrics = [("req/s", baseline["throughput_rps"], result["throughput_rps"])]
+        # Results written before bookings/s was recorded do not have it.
+        if "bookings_per_s" in baseline and "bookings_per_s" in result:
+            metrics.append(("bookings/s", baseline["bookings_per_s"], result["bookings_per_s"]))
+        for key in ("p50", "p95", "p99"):
+            metrics.append((f"{key} ms", baseline["latency_ms"][key], result["latency_ms"][key]))
+        metrics.append(("errors", baseline["errors"], result["errors"]))
+        for metric, old, new in metrics:
+            lines.append(f"{name:<16}{metric:<16}{old:>12}{new:>12}{_change(old, new):>10}")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    args = parser.parse_args(argv)
+
+    with open(args.before) as before, open(args.after) as after:
+        for line in compare(json.load(before), json.load(after)):
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
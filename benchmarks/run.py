@@ -0,0 +1,255 @@
+# benchmarks/run.py
+#
+# Load and latency benchmarks for the booking API.
+#
+#     python -m benchmarks.run --seed-data --bookings 1000000 --output results.json
+#     python -m benchmarks.run --url http://127.0.0.1:8000 --scenarios seat_map
+#
+# By default requests go to the app from main.py in-process through httpx's ASGI
+# transport; --url targets a running server instead (start it on the same
+# DATABASE_URL). Results are printed as a table and optionally written as JSON,
+# which benchmarks.compare can diff between runs.
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+DEFAULT_DATABASE_URL = "sqlite:///./bench.db"
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+# Each scenario returns a request factory, called with a per-worker Random, and the
+# status codes that count as successful responses.
+def seat_map_scenario(info: dict, args):
+    schedule_ids = info["schedule_ids"]
+    query = f"?format={args.seat_map_format}" if args.seat_map_format else ""
+
+    def make_request(rng):
+        return "GET", f"/bookings/{rng.choice(schedule_ids)}/seats{query}", None
+    return make_request, {200}
+
+
+def booking_storm_scenario(info: dict, args):
+    schedule_id = info["hot_schedule_id"]
+    rows, seats_per_row = info["hot_rows"], info["hot_seats_per_row"]
+
+    def make_request(rng):
+        body = {"schedule_id": schedule_id, "row": rng.randint(1, rows), "seat": rng.randint(1, seats_per_row)}
+        return "POST", "/bookings/", body
+    # A 409 is the expected outcome of losing a race for a seat, not a failure.
+    return make_request, {201, 409}
+
+
+# Bookings for random seats across all schedules, as in an on-sale rush: most requests
+# book a free seat, so this measures write throughput rather than conflict handling.
+def booking_rush_scenario(info: dict, args):
+    schedule_sizes = info["schedule_sizes"]
+
+    def make_request(rng):
+        schedule_id, rows, seats_per_row = rng.choice(schedule_sizes)
+        body = {"schedule_id": schedule_id, "row": rng.randint(1, rows), "seat": rng.randint(1, seats_per_row)}
+        return "POST", "/bookings/", body
+    return make_request, {201, 409}
+
+
+def catalog_scenario(info: dict, args):
+    def make_request(rng):
+        if rng.random() < 0.5:
+            return "GET", "/movies/movies/?limit=100", None
+        return "GET", "/rooms/?limit=100", None
+    return make_request, {200}
+
+
+def room_detail_scenario(info: dict, args):
+    room_ids = info["room_ids"]
+
+    def make_request(rng):
+        return "GET", f"/rooms/{rng.choice(room_ids)}", None
+    return make_request, {200}
+
+
+SCENARIOS = {
+    "seat_map": seat_map_scenario,
+    "booking_storm": booking_storm_scenario,
+    "booking_rush": booking_rush_scenario,
+    "catalog": catalog_scenario,
+    "room_detail": room_detail_scenario,
+}
+
+
+async def _drive(client, make_request, concurrency: int, duration: float, rng_seed: int):
+    latencies = []
+    statuses = Counter()
+    transport_errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(rng):
+        nonlocal transport_errors
+        while time.perf_counter() < deadline:
+            method, url, body = make_request(rng)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, url, json=body)
+            except Exception:
+                transport_errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(random.Random(rng_seed + index)) for index in range(concurrency)))
+    return latencies, statuses, transport_errors, time.perf_counter() - started
+
+
+async def run_scenario(client, name: str, info: dict, args) -> dict:
+    make_request, ok_statuses = SCENARIOS[name](info, args)
+    if args.warmup > 0:
+        await _drive(client, make_request, args.concurrency, args.warmup, args.rng_seed)
+    latencies, statuses, transport_errors, elapsed = await _drive(
+        client, make_request, args.concurrency, args.duration, args.rng_seed
+    )
+
+    latencies.sort()
+    completed = len(latencies)
+    failed = transport_errors + sum(count for status, count in statuses.items() if status not in ok_statuses)
+    return {
+        "requests": completed,
+        "errors": failed,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(completed / elapsed, 2) if elapsed else 0.0,
+        "bookings_per_s": round(statuses[201] / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(latencies) / completed * 1000, 3) if completed else 0.0,
+            "p50": round(percentile(latencies, 0.50) * 1000, 3),
+            "p95": round(percentile(latencies, 0.95) * 1000, 3),
+            "p99": round(percentile(latencies, 0.99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if completed else 0.0
+        },
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())}
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the cinema booking API.")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL", DEFAULT_DATABASE_URL),
+                        help=f"Database to seed and serve (default: {DEFAULT_DATABASE_URL}).")
+    parser.add_argument("--url", help="Benchmark a running server at this base URL instead of the in-process app.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated scenarios to run (default: all of {', '.join(SCENARIOS)}).")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients per scenario.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per scenario.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured warm-up seconds per scenario.")
+    parser.add_argument("--seat-map-format", choices=["verbose", "bitset", "rle"], help="Seat map format to request.")
+    parser.add_argument("--rng-seed", type=int, default=1, help="Seed for generated data and request mixes.")
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file.")
+
+    seeding = parser.add_argument_group("seeding")
+    seeding.add_argument("--seed-data", action="store_true", help="Recreate the database with synthetic data first.")
+    seeding.add_argument("--rooms", type=int, default=20)
+    seeding.add_argument("--rows", type=int, default=50, help="Maximum rows per room (up to 50).")
+    seeding.add_argument("--seats-per-row", type=int, default=60, help="Maximum seats per row (up to 60).")
+    seeding.add_argument("--movies", type=int, default=2000)
+    seeding.add_argument("--schedules", type=int, default=5000)
+    seeding.add_argument("--bookings", type=int, default=1_000_000)
+    return parser.parse_args(argv)
+
+
+async def main_async(args) -> dict:
+    # Settings are read when the app is imported, so the database URL is set first.
+    os.environ["DATABASE_URL"] = args.database_url
+    import httpx
+    from app.database import get_engine
+    from benchmarks import seed
+
+    engine = get_engine()
+
+    if args.seed_data:
+        started = time.perf_counter()
+        info = seed.seed(engine, args.rooms, args.rows, args.seats_per_row, args.movies,
+                         args.schedules, args.bookings, args.rng_seed)
+        print(f"Seeded {info['rooms']} rooms, {info['movies']} movies, {info['schedules']} schedules "
+              f"and {info['bookings']} bookings in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+    else:
+        info = seed.describe(engine)
+    if not info["schedule_ids"]:
+        raise SystemExit("The database has no schedules; run with --seed-data first.")
+
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=30.0)
+        target = args.url
+    else:
+        from main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=30.0)
+        target = "in-process"
+
+    results = {}
+    async with client:
+        for name in [name.strip() for name in args.scenarios.split(",") if name.strip()]:
+            if name not in SCENARIOS:
+                raise SystemExit(f"Unknown scenario '{name}'. Available: {', '.join(SCENARIOS)}")
+            print(f"Running {name} ...", file=sys.stderr)
+            results[name] = await run_scenario(client, name, info, args)
+
+    from app.config import settings
+    return {
+        "meta": {
+            "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "target": target,
+            "database_url": args.database_url,
+            "async_mode": settings.async_mode,
+            "fast_json": settings.fast_json,
+            "booking_write_batching": settings.booking_write_batching,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "seat_map_format": args.seat_map_format,
+            "data": {key: info[key] for key in ("rooms", "movies", "schedules", "bookings")}
+        },
+        "scenarios": results
+    }
+
+
+def print_table(report: dict):
+    print(f"{'scenario':<16}{'requests':>10}{'errors':>8}{'req/s':>10}{'booked/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, result in report["scenarios"].items():
+        latency = result["latency_ms"]
+        print(f"{name:<16}{result['requests']:>10}{result['errors']:>8}{result['throughput_rps']:>10.1f}{result['bookings_per_s']:>10.1f}"
+              f"{latency['p50']:>10.2f}{latency['p95']:>10.2f}{latency['p99']:>10.2f}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(main_async(args))
+    print_table(report)
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# benchmarks/seed.py
+#
+# Synthetic data for the benchmark suite, written with chunked bulk inserts.
+# The first schedule is left without bookings so the booking-storm scenario has free seats.
+
+import random
+from datetime import date, time, timedelta, datetime
+from sqlalchemy import insert, select, func
+from sqlalchemy.engine import Engine
+from app import models
+from app.database import Base
+from app.occupancy import repair_counters
+
+# Largest auditorium the suite generates (rows x seats per row).
+MAX_ROWS = 50
+MAX_SEATS_PER_ROW = 60
+
+CHUNK_SIZE = 50_000
+
+SHOW_TIMES = [time(hour, minute) for hour in range(10, 24) for minute in (0, 30)]
+
+
+def _insert_chunked(connection, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= CHUNK_SIZE:
+            connection.execute(insert(table), batch)
+            batch = []
+    if batch:
+        connection.execute(insert(table), batch)
+
+
+# Create a fresh schema and fill it. Room sizes are drawn between a quarter of the
+# maximum and the maximum dimensions; bookings are spread evenly over all schedules
+# except the first, never exceeding a schedule's capacity.
+def seed(engine: Engine, rooms: int, rows: int, seats_per_row: int, movies: int, schedules: int, bookings: int, rng_seed: int = 1) -> dict:
+    rows = min(rows, MAX_ROWS)
+    seats_per_row = min(seats_per_row, MAX_SEATS_PER_ROW)
+    rng = random.Random(rng_seed)
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    room_sizes = [
+        (rng.randint(max(1, rows // 4), rows), rng.randint(max(1, seats_per_row // 4), seats_per_row))
+        for _ in range(rooms)
+    ]
+    # The hot schedule's room always gets the maximum size.
+    room_sizes[0] = (rows, seats_per_row)
+
+    with engine.begin() as connection:
+        _insert_chunked(connection, models.Room, (
+            {"id": room_id, "name": f"Room {room_id}", "rows": room_rows, "seats_per_row": room_seats}
+            for room_id, (room_rows, room_seats) in enumerate(room_sizes, start=1)
+        ))
+        _insert_chunked(connection, models.Movie, (
+            {"id": movie_id, "title": f"Movie {movie_id}", "poster": f"https://example.com/posters/{movie_id}.jpg"}
+            for movie_id in range(1, movies + 1)
+        ))
+
+        # Schedules fill each room's day with shows, one day after another.
+        first_day = date.today()
+        schedule_rooms = []
+        schedule_rows = []
+        for schedule_id in range(1, schedules + 1):
+            slot = schedule_id - 1
+            room_id = slot % rooms + 1
+            day_slot = slot // rooms
+            schedule_rows.append({
+                "id": schedule_id,
+                "room_id": room_id,
+                "movie_id": rng.randint(1, movies),
+                "show_date": first_day + timedelta(days=day_slot // len(SHOW_TIMES)),
+                "start_time": SHOW_TIMES[day_slot % len(SHOW_TIMES)]
+            })
+            schedule_rooms.append(room_id)
+        _insert_chunked(connection, models.Schedule, schedule_rows)
+
+        def booking_rows():
+            remaining = bookings
+            timestamp = datetime.now()
+            targets = list(range(2, schedules + 1))
+            for index, schedule_id in enumerate(targets):
+                if remaining <= 0:
+                    return
+                room_rows, room_seats = room_sizes[schedule_rooms[schedule_id - 1] - 1]
+                capacity = room_rows * room_seats
+                share = min(capacity, -(-remaining // (len(targets) - index)))
+                for seat_index in rng.sample(range(capacity), share):
+                    yield {
+                        "schedule_id": schedule_id,
+                        "row": seat_index // room_seats + 1,
+                        "seat": seat_index % room_seats + 1,
+                        "timestamp": timestamp
+                    }
+                remaining -= share
+
+        _insert_chunked(connection, models.Booking, booking_rows())
+        # The bookings bypass the API, so fill in the schedules' booked-seat counters.
+        repair_counters(connection)
+
+    return describe(engine)
+
+
+# Read what a seeded database contains, so scenarios can also run against an existing one.
+def describe(engine: Engine) -> dict:
+    with engine.connect() as connection:
+        schedule_ids = connection.execute(select(models.Schedule.id).order_by(models.Schedule.id)).scalars().all()
+        room_ids = connection.execute(select(models.Room.id).order_by(models.Room.id)).scalars().all()
+        hot_schedule_id = schedule_ids[0] if schedule_ids else None
+        hot_room = connection.execute(
+            select(models.Room.rows, models.Room.seats_per_row)
+            .join(models.Schedule, models.Schedule.room_id == models.Room.id)
+            .where(models.Schedule.id == hot_schedule_id)
+        ).first()
+        schedule_sizes = connection.execute(
+            select(models.Schedule.id, models.Room.rows, models.Room.seats_per_row)
+            .join(models.Room, models.Schedule.room_id == models.Room.id)
+            .order_by(models.Schedule.id)
+        ).all()
+        return {
+            "rooms": len(room_ids),
+            "movies": connection.execute(select(func.count(models.Movie.id))).scalar_one(),
+            "schedules": len(schedule_ids),
+            "bookings": connection.execute(select(func.count(models.Booking.id))).scalar_one(),
+            "room_ids": room_ids,
+            "schedule_ids": schedule_ids,
+            "hot_schedule_id": hot_schedule_id,
+            "hot_rows": hot_room.rows if hot_room else 0,
+            "hot_seats_per_row": hot_room.seats_per_row if hot_room else 0,
+            # (schedule_id, rows, seats_per_row) of every schedule
+            "schedule_sizes": [tuple(size) for size in schedule_sizes]
+        }
@@ -1,18 +1,68 @@
+import logging
+from contextlib import asynccontextmanager
+from datetime import date
 from fastapi import FastAPI
-from app.database import engine, Base
-from app.routers import rooms, movies, schedules, bookings
+from fastapi.responses import JSONResponse, ORJSONResponse
+from app.config import settings
+from app.database import Base, SessionLocal, get_engine, get_async_engine, dispose_engines
+from app.metrics import MetricsMiddleware, metrics
+from app.query_budget import QueryDebugMiddleware, budget, unbudgeted_routes
+from app.routers import health, imports, exports, live, metrics as metrics_router
+from app.seat_state import prewarm
+from app.booking_writer import booking_writer
 
-# Create all tables in the database.
-# This should only be done when you first start the application.
-Base.metadata.create_all(bind=engine)
+# The async routers serve the same endpoints on an AsyncSession when ASYNC_MODE is set.
+if settings.async_mode:
+    from app.routers.aio import rooms, movies, schedules, bookings
+else:
+    from app.routers import rooms, movies, schedules, bookings
 
-app = FastAPI()
+# Startup and shutdown of each worker. Nothing touches the database at import time:
+# tables are only created when CREATE_SCHEMA is set (or by `python -m app.migrations`),
+# and PREWARM_SEAT_MAPS loads today's seat maps before the first request is accepted.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.create_schema:
+        Base.metadata.create_all(bind=get_engine())
+    # Open the first pooled connection now rather than in the first request.
+    with get_engine().connect():
+        pass
+    async_engine = get_async_engine()
+    if async_engine is not None:
+        async with async_engine.connect():
+            pass
+    if settings.prewarm_seat_maps:
+        with SessionLocal(bind=get_engine()) as db:
+            prewarm(db, date.today())
+    yield
+    # Commit the bookings still queued for the group-commit writer.
+    booking_writer.stop()
+    await dispose_engines()
+
+# FAST_JSON switches the default response class to orjson.
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse if settings.fast_json else JSONResponse)
 
 app.include_router(rooms.router)
 app.include_router(movies.router)
 app.include_router(schedules.router)
 app.include_router(bookings.router)
+app.include_router(live.router)
+app.include_router(imports.router)
+app.include_router(exports.router)
+app.include_router(health.router)
+app.include_router(metrics_router.router)
+
+# QUERY_DEBUG logs query budget overruns and repeated statements (likely N+1s) per request.
+if settings.query_debug:
+    logging.basicConfig(level=logging.INFO)
+    app.add_middleware(QueryDebugMiddleware)
+    for path in unbudgeted_routes(app):
+        logging.getLogger("app.queries").warning("No query budget declared for %s", path)
+
+# Record per-route latency and database usage for /metrics (and Server-Timing if enabled).
+app.add_middleware(MetricsMiddleware, registry=metrics, server_timing_header=settings.server_timing)
 
 @app.get("/")
+@budget(0)
 def read_root():
     return {"Hello": "World"}
\ No newline at end of file
@@ -0,0 +1,104 @@
+# tests/conftest.py
+#
+# The tests run the app against a temporary SQLite file. Settings are read when the app
+# is imported, so DATABASE_URL is set first; the serving mode is picked per test by
+# reloading main with ASYNC_MODE / FAST_JSON patched on the settings.
+
+import importlib
+import os
+import tempfile
+from datetime import date, datetime, time, timedelta
+from pathlib import Path
+
+_DATABASE_DIR = tempfile.mkdtemp(prefix="cinema-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_DATABASE_DIR) / 'test.db'}"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from app import models
+from app.config import settings
+from app.database import SessionLocal, get_engine
+from app.migrations import run_migrations
+from app.response_cache import catalog_cache
+from app.seat_holds import seat_holds
+from app.seat_state import seat_state
+
+MODES = ["sync", "async"]
+
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    run_migrations(get_engine())
+    yield get_engine()
+
+
+# Every test starts from empty tables and empty in-memory caches.
+@pytest.fixture(autouse=True)
+def clean_state(database):
+    yield
+    for hold_id in list(seat_holds._holds):
+        seat_holds.release(hold_id)
+    with SessionLocal(bind=database) as db:
+        for model in (models.Booking, models.Schedule, models.Room, models.Movie):
+            db.execute(delete(model))
+        db.commit()
+    catalog_cache.invalidate()
+    seat_state.clear()
+
+
+# A TestClient on the app as served in the given mode ("sync" or "async").
+def make_client(monkeypatch, mode: str, fast_json: bool = False) -> TestClient:
+    monkeypatch.setattr(settings, "async_mode", mode == "async")
+    monkeypatch.setattr(settings, "fast_json", fast_json)
+    import main
+    return TestClient(importlib.reload(main).app)
+
+
+@pytest.fixture(params=MODES)
+def client(request, monkeypatch):
+    with make_client(monkeypatch, request.param) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db(database):
+    with SessionLocal(bind=database) as session:
+        yield session
+
+
+# Adds rooms named "Room 1".."Room n", each with `schedules` shows of one movie starting
+# tomorrow, and returns them.
+@pytest.fixture
+def seed_rooms(db):
+    def seed(count: int, schedules: int = 0, rows: int = 3, seats_per_row: int = 4) -> list:
+        movie = models.Movie(title=f"Movie for {count} rooms", poster="https://example.com/poster.jpg", runtime_minutes=90)
+        db.add(movie)
+        rooms = [models.Room(name=f"Room {index}", rows=rows, seats_per_row=seats_per_row) for index in range(1, count + 1)]
+        db.add_all(rooms)
+        db.flush()
+        tomorrow = date.today() + timedelta(days=1)
+        for room in rooms:
+            db.add_all(
+                models.Schedule(room_id=room.id, movie_id=movie.id, show_date=tomorrow + timedelta(days=day), start_time=time(18, 0))
+                for day in range(schedules)
+            )
+        db.commit()
+        return rooms
+    return seed
+
+
+# One movie, one 3x4 room and a show tomorrow at 18:00 with seat (1, 1) booked.
+@pytest.fixture
+def catalog(db) -> dict:
+    movie = models.Movie(title="The Matrix", poster="https://example.com/matrix.jpg", runtime_minutes=136)
+    room = models.Room(name="Screen 1", rows=3, seats_per_row=4)
+    db.add_all([movie, room])
+    db.flush()
+    show_date = date.today() + timedelta(days=1)
+    schedule = models.Schedule(room_id=room.id, movie_id=movie.id, show_date=show_date, start_time=time(18, 0), booked_seats=1)
+    db.add(schedule)
+    db.flush()
+    db.add(models.Booking(schedule_id=schedule.id, row=1, seat=1, timestamp=datetime.now()))
+    db.commit()
+    return {"movie_id": movie.id, "room_id": room.id, "schedule_id": schedule.id, "show_date": show_date}
@@ -0,0 +1,30 @@
+# tests/test_booking_export.py
+
+import csv
+import io
+from datetime import datetime, time, timedelta
+from app import models
+from app.query_budget import QueryBudget
+
+
+def test_export_reads_the_date_range_with_one_query_in_export_order(client, db, seed_rooms):
+    rooms = seed_rooms(2, schedules=3)
+    schedules = db.query(models.Schedule).order_by(models.Schedule.id).all()
+    # A later show on the first day, to check that rows are ordered by start time within a day
+    late_show = models.Schedule(room_id=rooms[1].id, movie_id=schedules[0].movie_id, show_date=schedules[0].show_date, start_time=time(21, 30))
+    db.add(late_show)
+    db.flush()
+    for schedule in [*reversed(schedules), late_show]:
+        db.add_all(models.Booking(schedule_id=schedule.id, row=row, seat=seat, timestamp=datetime.now()) for row, seat in [(2, 1), (1, 2)])
+    db.commit()
+    first_day = schedules[0].show_date
+
+    with QueryBudget(1):
+        response = client.get("/export/bookings", params={"date_from": str(first_day), "date_to": str(first_day + timedelta(days=2))})
+
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 2 * (len(schedules) + 1)
+    order = [(row["show_date"], row["start_time"], int(row["schedule_id"]), int(row["row"]), int(row["seat"])) for row in rows]
+    assert order == sorted(order)
+    assert [row["start_time"] for row in rows[:6]] == ["18:00"] * 4 + ["21:30"] * 2
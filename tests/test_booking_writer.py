@@ -0,0 +1,100 @@
+# tests/test_booking_writer.py
+
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError, OperationalError
+from app import booking_writer as booking_writer_module, models
+from app.booking_writer import BookingWriter, SeatTaken, booking_writer
+from app.database import SessionLocal, get_engine
+from app.seat_state import seat_state
+
+
+@pytest.fixture
+def writer():
+    # A long wait makes every submit of a test land in the same batch
+    batch_writer = BookingWriter(enabled=True, max_batch_size=64, max_wait=0.2)
+    yield batch_writer
+    batch_writer.stop()
+
+
+# Submit all seats before the writer wakes up, then wait for every outcome.
+def _outcomes(writer: BookingWriter, schedule_id: int, seats: list) -> list:
+    futures = [writer.submit(schedule_id, row, seat) for row, seat in seats]
+    outcomes = []
+    for future in futures:
+        try:
+            outcomes.append(future.result(timeout=10))
+        except SeatTaken:
+            outcomes.append(None)
+    return outcomes
+
+
+def _stored(schedule_id: int) -> tuple:
+    with SessionLocal(bind=get_engine()) as db:
+        seats = set(db.execute(
+            select(models.Booking.row, models.Booking.seat).where(models.Booking.schedule_id == schedule_id)
+        ).all())
+        counter = db.scalar(select(models.Schedule.booked_seats).where(models.Schedule.id == schedule_id))
+        count = db.scalar(select(func.count()).select_from(models.Booking).where(models.Booking.schedule_id == schedule_id))
+    return seats, counter, count
+
+
+def test_first_request_for_a_seat_wins_within_a_batch(writer, catalog):
+    schedule_id = catalog["schedule_id"]
+
+    outcomes = _outcomes(writer, schedule_id, [(2, 1), (2, 1), (2, 2), (2, 1), (1, 1)])
+
+    assert [outcome is not None for outcome in outcomes] == [True, False, True, False, False]
+    assert writer.stats()["batches"] == 1
+    assert writer.stats()["conflicts"] == 3
+    seats, counter, count = _stored(schedule_id)
+    assert seats == {(1, 1), (2, 1), (2, 2)}
+    assert counter == count == 3
+    assert len({outcome["id"] for outcome in outcomes if outcome}) == 2
+
+
+# The batch's insert has run when its counter update fails: the transaction is rolled back
+# and every request is written on its own.
+@pytest.mark.parametrize("error", [IntegrityError, OperationalError])
+def test_batch_falls_back_to_one_booking_at_a_time(writer, catalog, monkeypatch, error):
+    def failing_update():
+        raise error("UPDATE schedules", {}, Exception("failed"))
+    monkeypatch.setattr(booking_writer_module, "count_booked_many", failing_update)
+    schedule_id = catalog["schedule_id"]
+
+    outcomes = _outcomes(writer, schedule_id, [(3, 1), (3, 1), (3, 2), (1, 1)])
+
+    assert [outcome is not None for outcome in outcomes] == [True, False, True, False]
+    assert writer.stats()["fallbacks"] == 1
+    seats, counter, count = _stored(schedule_id)
+    assert seats == {(1, 1), (3, 1), (3, 2)}
+    assert counter == count == 3
+
+
+# Concurrent HTTP requests for one seat and for different seats, batched by the app's writer.
+def test_concurrent_bookings_through_the_api(client, catalog, monkeypatch):
+    monkeypatch.setattr(booking_writer, "enabled", True)
+    monkeypatch.setattr(booking_writer, "max_wait", 0.3)
+    schedule_id = catalog["schedule_id"]
+    seat_map_url = f"/bookings/{schedule_id}/seats"
+    # Load the seat map first, so the writer has to update the cached bitmap in place
+    assert client.get(seat_map_url).status_code == 200
+    batches = booking_writer.stats()["batches"]
+    seats = [(2, 3)] * 5 + [(3, 3), (3, 4)]
+
+    with ThreadPoolExecutor(len(seats)) as pool:
+        responses = list(pool.map(
+            lambda seat: client.post("/bookings/", json={"schedule_id": schedule_id, "row": seat[0], "seat": seat[1]}), seats
+        ))
+
+    statuses = [response.status_code for response in responses]
+    assert sorted(statuses[:5]) == [201, 409, 409, 409, 409]
+    assert statuses[5:] == [201, 201]
+    assert booking_writer.stats()["batches"] - batches < len(seats)
+    stored, counter, count = _stored(schedule_id)
+    assert stored == {(1, 1), (2, 3), (3, 3), (3, 4)}
+    assert counter == count == 4
+    assert seat_state.get(schedule_id) is not None
+    layout = client.get(seat_map_url).json()["seating_layout"]
+    assert {(seat["row"], seat["seat"]) for row in layout for seat in row if seat["is_booked"]} == stored
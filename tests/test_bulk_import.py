@@ -0,0 +1,44 @@
+# tests/test_bulk_import.py
+
+import pytest
+from app.bulk_import import Importer, LineSplitter, LineTooLong, MAX_LINE_LENGTH
+
+
+def test_importers_must_implement_check():
+    class Incomplete(Importer):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_line_splitter_joins_lines_across_chunks():
+    splitter = LineSplitter(max_length=10)
+
+    assert splitter.feed(b"name,ro") == []
+    assert splitter.feed(b"ws\nA,1\nB") == ["name,rows", "A,1"]
+    assert splitter.close() == ["B"]
+
+
+def test_line_splitter_rejects_a_line_that_never_ends():
+    splitter = LineSplitter(max_length=10)
+    splitter.feed(b"first\nsecond\n0123456")
+
+    with pytest.raises(LineTooLong) as error:
+        splitter.feed(b"789012")
+    assert error.value.line == 3
+
+
+def test_line_splitter_rejects_a_long_line_within_one_chunk():
+    with pytest.raises(LineTooLong) as error:
+        LineSplitter(max_length=10).feed(b"ok\n" + b"x" * 11 + b"\nok\n")
+    assert error.value.line == 2
+
+
+def test_import_with_an_over_long_line_is_rejected(client):
+    body = b'{"title": "Alien", "poster": "https://example.com/alien.jpg"}\n' + b"x" * (MAX_LINE_LENGTH + 1)
+
+    response = client.post("/import/movies", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+    assert response.status_code == 413
+    assert "Line 2" in response.json()["detail"]
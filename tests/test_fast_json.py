@@ -0,0 +1,49 @@
+# tests/test_fast_json.py
+#
+# FAST_JSON builds the hot responses directly from rows with orjson. The bodies must be
+# byte-for-byte the ones the response models produce.
+
+import pytest
+from app.response_cache import catalog_cache
+from .conftest import MODES, make_client
+
+PATHS = [
+    "/movies/movies/",
+    "/movies/movies/?fields=id,title",
+    "/movies/movies/{movie_id}",
+    "/rooms/",
+    "/rooms/?expand=schedules",
+    "/rooms/{room_id}",
+    "/schedules/?date_from={show_date}",
+    "/schedules/rooms/{room_id}",
+]
+
+
+def _bodies(monkeypatch, mode: str, fast_json: bool, urls: list) -> list:
+    # Responses are cached by URL only, so each run starts from an empty cache
+    catalog_cache.invalidate()
+    with make_client(monkeypatch, mode, fast_json=fast_json) as client:
+        responses = [client.get(url) for url in urls]
+    assert [response.status_code for response in responses] == [200] * len(urls)
+    return [response.content for response in responses]
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_fast_json_responses_match_the_default_ones(monkeypatch, catalog, mode):
+    urls = [path.format(**catalog) for path in PATHS]
+
+    default = _bodies(monkeypatch, mode, False, urls)
+    fast = _bodies(monkeypatch, mode, True, urls)
+
+    for url, default_body, fast_body in zip(urls, default, fast):
+        assert fast_body == default_body, url
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_start_times_are_sent_as_hours_and_minutes(monkeypatch, catalog, mode):
+    urls = ["/rooms/{room_id}".format(**catalog), "/schedules/?date_from={show_date}".format(**catalog)]
+
+    for fast_json in (False, True):
+        room, showtimes = _bodies(monkeypatch, mode, fast_json, urls)
+        assert b'"start_time":"18:00"' in room
+        assert b'"start_time":"18:00"' in showtimes
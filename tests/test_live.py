@@ -0,0 +1,94 @@
+# tests/test_live.py
+
+import asyncio
+import pytest
+from starlette.websockets import WebSocketDisconnect
+from app import seat_codec, seat_events as seat_events_module
+from app.routers.live import SCHEDULE_NOT_FOUND_CLOSE_CODE, _sse_events
+from app.seat_events import seat_events, seat_updates
+from app.seat_state import SeatBitmap
+
+
+def _booked(snapshot: dict) -> set:
+    grid = seat_codec.decode(snapshot)
+    return {(row, seat) for row, seats in enumerate(grid, 1) for seat, booked in enumerate(seats, 1) if booked}
+
+
+def test_websocket_sends_a_snapshot_then_deltas(client, catalog):
+    schedule_id = catalog["schedule_id"]
+    with client.websocket_connect(f"/bookings/{schedule_id}/seats/live") as websocket:
+        snapshot = websocket.receive_json()
+        assert snapshot["type"] == "snapshot"
+        assert _booked(snapshot) == {(1, 1)}
+
+        assert client.post("/bookings/", json={"schedule_id": schedule_id, "row": 2, "seat": 2}).status_code == 201
+        booked = websocket.receive_json()
+        assert (booked["type"], booked["taken"], booked["freed"]) == ("delta", [[2, 2]], [])
+        assert booked["seq"] > snapshot["seq"]
+
+        hold = client.post("/bookings/holds", json={"schedule_id": schedule_id, "seats": [{"row": 3, "seat": 1}]}).json()
+        assert websocket.receive_json()["taken"] == [[3, 1]]
+        assert client.delete(f"/bookings/holds/{hold['id']}").status_code == 204
+        released = websocket.receive_json()
+        assert (released["taken"], released["freed"]) == ([], [[3, 1]])
+
+
+def test_websocket_for_a_missing_schedule_is_closed(client, catalog):
+    with pytest.raises(WebSocketDisconnect) as closed:
+        with client.websocket_connect("/bookings/{}/seats/live".format(catalog["schedule_id"] + 1000)) as websocket:
+            websocket.receive_json()
+    assert closed.value.code == SCHEDULE_NOT_FOUND_CLOSE_CODE
+
+
+# Subscribes to a schedule and collects the messages seen after each step.
+async def _follow(steps: list) -> list:
+    bitmap = SeatBitmap(7, "Screen 7", 2, 3)
+
+    async def load():
+        return bitmap
+
+    updates = seat_updates(7, load)
+    messages = [await updates.__anext__()]
+    for step in steps:
+        step(bitmap)
+        messages.append(await updates.__anext__())
+    await updates.aclose()
+    return messages
+
+
+def test_changes_are_merged_into_one_delta():
+    def book_and_release(bitmap):
+        seat_events.publish(7, taken=[(1, 1), (1, 2)])
+        seat_events.publish(7, freed=[(1, 2)])
+
+    messages = asyncio.run(_follow([book_and_release]))
+
+    assert [message_type for message_type, _ in messages] == ["snapshot", "delta"]
+    assert b'"taken":[[1,1]],"freed":[[1,2]]' in messages[1][1]
+
+
+def test_a_subscriber_that_falls_behind_the_log_gets_a_new_snapshot(monkeypatch):
+    monkeypatch.setattr(seat_events_module, "CHANNEL_LOG_SIZE", 2)
+
+    def book_three_times(bitmap):
+        for seat in (1, 2, 3):
+            bitmap.set_booked(2, seat)
+            seat_events.publish(7, taken=[(2, seat)])
+
+    messages = asyncio.run(_follow([book_three_times]))
+
+    assert [message_type for message_type, _ in messages] == ["snapshot", "snapshot"]
+    assert b'"rows":["3A","3B"]' in messages[1][1]
+
+
+def test_sse_events_are_named_after_the_message_type():
+    async def updates():
+        yield "delta", b'{"schedule_id":1,"type":"delta"}'
+
+    async def collect():
+        return [event async for event in _sse_events(("snapshot", b'{"seq":0}'), updates())]
+
+    assert asyncio.run(collect()) == [
+        b'event: snapshot\ndata: {"seq":0}\n\n',
+        b'event: delta\ndata: {"schedule_id":1,"type":"delta"}\n\n',
+    ]
@@ -0,0 +1,30 @@
+# tests/test_metrics.py
+
+from app import database
+from .conftest import make_client
+
+
+def _pool_engines(client) -> set:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    return {
+        line.split('engine="')[1].split('"')[0]
+        for line in response.text.splitlines() if line.startswith("db_pool_checkouts_total{")
+    }
+
+
+def test_pool_counters_leave_out_the_async_engine_in_sync_mode(monkeypatch):
+    # An async engine created by an earlier test would otherwise still be reported
+    monkeypatch.setattr(database, "_async_engine", None)
+
+    with make_client(monkeypatch, "sync") as client:
+        client.get("/movies/")
+
+        assert _pool_engines(client) == {"sync"}
+
+
+def test_pool_counters_cover_both_engines_in_async_mode(monkeypatch):
+    with make_client(monkeypatch, "async") as client:
+        client.get("/movies/")
+
+        assert _pool_engines(client) == {"sync", "async"}
@@ -0,0 +1,97 @@
+# tests/test_migrations.py
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+from app import migrations
+from app.migrations import BOOKING_SEAT_CONSTRAINT, run_migrations
+
+# The schema of a database created before the seat constraint, the movie runtime and the
+# booked-seat counter.
+OLD_SCHEMA = [
+    "CREATE TABLE rooms (id INTEGER PRIMARY KEY, name VARCHAR UNIQUE, rows INTEGER, seats_per_row INTEGER)",
+    "CREATE TABLE movies (id INTEGER PRIMARY KEY, title VARCHAR UNIQUE, poster VARCHAR)",
+    "CREATE TABLE schedules (id INTEGER PRIMARY KEY, show_date DATE, start_time TIME, "
+    "room_id INTEGER REFERENCES rooms (id), movie_id INTEGER REFERENCES movies (id))",
+    "CREATE TABLE bookings (id INTEGER PRIMARY KEY, schedule_id INTEGER REFERENCES schedules (id), "
+    "row INTEGER, seat INTEGER, timestamp DATETIME)",
+    "INSERT INTO rooms VALUES (1, 'Screen 1', 3, 4)",
+    "INSERT INTO movies VALUES (1, 'The Matrix', 'https://example.com/matrix.jpg')",
+    "INSERT INTO schedules VALUES (1, '2025-08-15', '18:00:00.000000', 1, 1)",
+]
+
+# (id, row, seat): bookings 3 and 4 double-book the seats of bookings 1 and 2
+OLD_BOOKINGS = [(1, 1, 1), (2, 1, 2), (3, 1, 1), (4, 1, 2), (5, 2, 1)]
+
+
+@pytest.fixture
+def old_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'cinema.db'}")
+    with engine.begin() as connection:
+        for statement in OLD_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(
+            text("INSERT INTO bookings VALUES (:id, 1, :row, :seat, '2025-08-01 10:00:00.000000')"),
+            [{"id": booking_id, "row": row, "seat": seat} for booking_id, row, seat in OLD_BOOKINGS]
+        )
+    yield engine
+    engine.dispose()
+
+
+def _bookings(engine) -> list:
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT id, row, seat FROM bookings ORDER BY id")).all()
+
+
+def _seat_index(engine):
+    for index in inspect(engine).get_indexes("bookings"):
+        if index["name"] == BOOKING_SEAT_CONSTRAINT:
+            return index
+    return None
+
+
+def test_dry_run_reports_the_duplicates_without_changing_anything(old_engine):
+    notes = run_migrations(old_engine, dry_run=True)
+
+    assert notes[:3] == [
+        "remove duplicate booking 3 (schedule 1, row 1, seat 1)",
+        "remove duplicate booking 4 (schedule 1, row 1, seat 2)",
+        "add unique constraint uq_booking_schedule_seat on bookings (schedule_id, row, seat)",
+    ]
+    assert _bookings(old_engine) == OLD_BOOKINGS
+    assert _seat_index(old_engine) is None
+    assert "booked_seats" not in {column["name"] for column in inspect(old_engine).get_columns("schedules")}
+
+
+def test_migration_keeps_the_earliest_booking_of_each_seat(old_engine):
+    notes = run_migrations(old_engine)
+
+    assert "remove duplicate booking 3 (schedule 1, row 1, seat 1)" in notes
+    assert _bookings(old_engine) == [(1, 1, 1), (2, 1, 2), (5, 2, 1)]
+    index = _seat_index(old_engine)
+    assert index["unique"] and index["column_names"] == ["schedule_id", "row", "seat"]
+    with old_engine.connect() as connection:
+        assert connection.execute(text("SELECT booked_seats FROM schedules")).scalar() == 3
+    assert run_migrations(old_engine) == []
+
+
+def test_unique_index_refuses_a_new_duplicate(old_engine):
+    run_migrations(old_engine)
+
+    with pytest.raises(IntegrityError):
+        with old_engine.begin() as connection:
+            connection.execute(text("INSERT INTO bookings (schedule_id, row, seat) VALUES (1, 2, 1)"))
+
+
+def test_command_line_dry_run_then_migration(old_engine, monkeypatch, capsys):
+    monkeypatch.setattr(migrations, "get_engine", lambda: old_engine)
+
+    migrations.main(["--dry-run"])
+    assert capsys.readouterr().out.startswith("Pending changes:\n- remove duplicate booking 3")
+    assert len(_bookings(old_engine)) == 5
+
+    migrations.main([])
+    assert capsys.readouterr().out.startswith("Applied changes:\n- remove duplicate booking 3")
+    migrations.main([])
+    assert capsys.readouterr().out == "Database is up to date.\n"
+    assert len(_bookings(old_engine)) == 3
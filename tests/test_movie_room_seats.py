@@ -0,0 +1,30 @@
+# tests/test_movie_room_seats.py
+
+from datetime import date, timedelta
+
+
+def _booked(response) -> list:
+    return [(seat["row"], seat["seat"]) for row in response.json()["seating_layout"] for seat in row if seat["is_booked"]]
+
+
+def test_movie_and_room_resolve_to_the_earliest_schedule(client, catalog):
+    url = "/bookings/movies/{movie_id}/rooms/{room_id}/seats".format(**catalog)
+    later = {"movie_id": catalog["movie_id"], "show_date": str(catalog["show_date"] + timedelta(days=7)), "start_time": "10:00"}
+    assert client.post("/schedules/rooms/{room_id}".format(**catalog), json=later).status_code == 201
+
+    assert _booked(client.get(url)) == [(1, 1)]
+
+
+def test_new_schedules_are_picked_up_by_the_movie_and_room_seat_map(client, catalog):
+    url = "/bookings/movies/{movie_id}/rooms/{room_id}/seats".format(**catalog)
+    assert _booked(client.get(url)) == [(1, 1)]
+
+    # An earlier show of the same movie in the same room is the one resolved from now on
+    earlier = {"movie_id": catalog["movie_id"], "show_date": str(date.today()), "start_time": "10:00"}
+    assert client.post("/schedules/rooms/{room_id}".format(**catalog), json=earlier).status_code == 201
+    assert _booked(client.get(url)) == []
+
+    booking = client.post("/bookings/movie/{movie_id}/room/{room_id}/".format(**catalog), json={"row": 2, "seat": 2})
+    assert booking.status_code == 201
+    assert booking.json()["schedule_id"] != catalog["schedule_id"]
+    assert _booked(client.get(url)) == [(2, 2)]
@@ -0,0 +1,50 @@
+# tests/test_occupancy.py
+
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from sqlalchemy import update
+from app import models
+from app.occupancy import drifted_counters
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+# Runs `python -m app.occupancy` against the test database (DATABASE_URL is inherited).
+def _occupancy(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-m", "app.occupancy", *args], cwd=ROOT, capture_output=True, text=True, timeout=60)
+
+
+def test_bookings_through_the_api_keep_the_counters_in_step(client, catalog, db):
+    client.post("/bookings/", json={"schedule_id": catalog["schedule_id"], "row": 1, "seat": 2})
+    client.post("/bookings/group", json={"schedule_id": catalog["schedule_id"], "seats": [{"row": 2, "seat": 1}, {"row": 2, "seat": 2}]})
+
+    assert drifted_counters(db) == []
+    assert db.get(models.Schedule, catalog["schedule_id"]).booked_seats == 4
+
+
+def test_command_reports_drift_and_repairs_it(catalog, db):
+    schedule_id = catalog["schedule_id"]
+    # A booking written outside the API, and a counter that was never updated
+    db.add(models.Booking(schedule_id=schedule_id, row=2, seat=3, timestamp=datetime.now()))
+    db.execute(update(models.Schedule).where(models.Schedule.id == schedule_id).values(booked_seats=0))
+    db.commit()
+
+    report = _occupancy()
+
+    assert report.returncode == 1
+    assert report.stdout == (
+        f"- schedule {schedule_id}: counter 0, bookings 2\n"
+        "1 counters drifted; run with --repair to fix them.\n"
+    )
+    assert db.get(models.Schedule, schedule_id).booked_seats == 0
+
+    repair = _occupancy("--repair")
+
+    assert repair.returncode == 0
+    assert repair.stdout.endswith("Repaired 1 counters.\n")
+    db.expire_all()
+    assert db.get(models.Schedule, schedule_id).booked_seats == 2
+    assert drifted_counters(db) == []
+    assert _occupancy().stdout == "All booked-seat counters match the bookings.\n"
@@ -0,0 +1,126 @@
+# tests/test_query_budgets.py
+#
+# Every endpoint is called inside QueryBudget with the budget its @budget(n) declares, in
+# both serving modes. Endpoints with an UNBOUNDED budget get a fixed ceiling for the
+# small request made here.
+
+import pytest
+from app.booking_writer import booking_writer
+from app.query_budget import QueryBudget, UNBOUNDED, unbudgeted_routes
+from app.seat_holds import seat_holds
+from .conftest import MODES, make_client
+
+
+def _hold(catalog: dict) -> str:
+    return seat_holds.hold(catalog["schedule_id"], [(2, 1), (2, 2)]).id
+
+
+# (method, route path, request for the catalog fixture, expected status, ceiling for
+# UNBOUNDED endpoints)
+CASES = [
+    ("GET", "/", lambda c: {}, 200, None),
+    ("GET", "/rooms/", lambda c: {}, 200, None),
+    ("GET", "/rooms/", lambda c: {"params": {"expand": "schedules"}}, 200, None),
+    ("GET", "/rooms/{room_id}", lambda c: {}, 200, None),
+    ("GET", "/rooms/{room_id}/analytics", lambda c: {"params": {"date_from": str(c["show_date"]), "date_to": str(c["show_date"])}}, 200, None),
+    ("POST", "/rooms/", lambda c: {"json": {"name": "Screen 2", "rows": 5, "seats_per_row": 8}}, 201, None),
+    ("PUT", "/rooms/{room_id}", lambda c: {"json": {"name": "Screen 1", "rows": 4, "seats_per_row": 4}}, 409, None),
+    ("DELETE", "/rooms/{room_id}", lambda c: {}, 409, None),
+    ("GET", "/movies/movies/", lambda c: {}, 200, None),
+    ("GET", "/movies/movies/{movie_id}", lambda c: {}, 200, None),
+    ("POST", "/movies/movies/", lambda c: {"json": {"title": "Alien", "poster": "https://example.com/alien.jpg"}}, 201, None),
+    ("PUT", "/movies/movies/{movie_id}", lambda c: {"json": {"title": "The Matrix", "poster": "https://example.com/m.jpg", "runtime_minutes": 136}}, 409, None),
+    ("DELETE", "/movies/movies/{movie_id}", lambda c: {}, 409, None),
+    ("GET", "/schedules/", lambda c: {"params": {"date_from": str(c["show_date"])}}, 200, None),
+    ("POST", "/schedules/rooms/{room_id}", lambda c: {"json": {"movie_id": c["movie_id"], "show_date": str(c["show_date"]), "start_time": "10:00"}}, 201, None),
+    ("POST", "/schedules/rooms/{room_id}/recurring", lambda c: {"json": {
+        "movie_id": c["movie_id"], "start_date": str(c["show_date"]), "end_date": str(c["show_date"]), "start_times": ["10:00", "21:00"]
+    }}, 201, None),
+    ("POST", "/schedules/rooms/{room_id}/validate", lambda c: {"json": {
+        "show_date": str(c["show_date"]), "shows": [{"movie_id": c["movie_id"], "start_time": "10:00"}]
+    }}, 200, None),
+    ("GET", "/schedules/rooms/{room_id}", lambda c: {}, 200, None),
+    ("GET", "/bookings/movies/{movie_id}/rooms/{room_id}/seats", lambda c: {}, 200, None),
+    ("GET", "/bookings/{schedule_id}/seats", lambda c: {}, 200, None),
+    ("GET", "/bookings/{schedule_id}/best-available", lambda c: {"params": {"party_size": 2}}, 200, None),
+    ("POST", "/bookings/{schedule_id}/seats/rebuild", lambda c: {}, 200, None),
+    ("POST", "/bookings/", lambda c: {"json": {"schedule_id": c["schedule_id"], "row": 1, "seat": 2}}, 201, None),
+    ("POST", "/bookings/", lambda c: {"json": {"schedule_id": c["schedule_id"], "row": 1, "seat": 1}}, 409, None),
+    ("POST", "/bookings/movie/{movie_id}/room/{room_id}/", lambda c: {"json": {"row": 1, "seat": 2}}, 201, None),
+    ("POST", "/bookings/group", lambda c: {"json": {"schedule_id": c["schedule_id"], "seats": [{"row": 3, "seat": 1}, {"row": 3, "seat": 2}]}}, 201, None),
+    ("POST", "/bookings/best-available", lambda c: {"json": {"schedule_id": c["schedule_id"], "party_size": 3}}, 201, None),
+    ("POST", "/bookings/holds", lambda c: {"json": {"schedule_id": c["schedule_id"], "seats": [{"row": 2, "seat": 3}]}}, 201, None),
+    ("POST", "/bookings/holds/{hold_id}/confirm", lambda c: {"hold_id": _hold(c)}, 201, None),
+    ("DELETE", "/bookings/holds/{hold_id}", lambda c: {"hold_id": _hold(c)}, 204, None),
+    ("GET", "/bookings/{schedule_id}/seats/events", lambda c: {"schedule_id": c["schedule_id"] + 1000}, 404, 3),
+    ("POST", "/import/movies", lambda c: {"content": '{"title": "Alien", "poster": "https://example.com/alien.jpg"}\n', "headers": {"Content-Type": "application/x-ndjson"}}, 200, 3),
+    ("POST", "/import/rooms", lambda c: {"content": "name,rows,seats_per_row\nScreen 2,5,8\n", "headers": {"Content-Type": "text/csv"}}, 200, 3),
+    ("POST", "/import/schedules", lambda c: {
+        "content": f'{{"room_id": {c["room_id"]}, "movie_id": {c["movie_id"]}, "show_date": "{c["show_date"]}", "start_time": "10:00"}}\n',
+        "headers": {"Content-Type": "application/x-ndjson"}
+    }, 200, 6),
+    ("GET", "/export/bookings", lambda c: {"params": {"date_from": str(c["show_date"]), "date_to": str(c["show_date"])}}, 200, None),
+    ("GET", "/health/", lambda c: {}, 200, None),
+    ("GET", "/health/db", lambda c: {}, 200, None),
+    ("GET", "/health/cache", lambda c: {}, 200, None),
+    ("GET", "/metrics", lambda c: {}, 200, None),
+]
+
+# Request parts that are passed to the TestClient rather than filled into the path
+REQUEST_KEYS = ("params", "json", "content", "headers")
+
+
+def _route(app, method: str, path: str):
+    for route in app.routes:
+        if getattr(route, "path", None) == path and method in getattr(route, "methods", ()):
+            return route
+    raise LookupError(f"No route {method} {path}")
+
+
+@pytest.mark.parametrize("method, path, make_request, expected_status, ceiling", CASES, ids=[f"{case[0]} {case[1]} {case[3]}" for case in CASES])
+def test_endpoint_stays_within_budget(client, catalog, method, path, make_request, expected_status, ceiling):
+    max_queries = _route(client.app, method, path).endpoint.query_budget
+    if max_queries == UNBOUNDED:
+        max_queries = ceiling
+    request = make_request(catalog)
+    url = path.format(**{**catalog, **{key: value for key, value in request.items() if key not in REQUEST_KEYS}})
+
+    with QueryBudget(max_queries):
+        response = client.request(method, url, **{key: value for key, value in request.items() if key in REQUEST_KEYS})
+
+    assert response.status_code == expected_status, response.text
+
+
+# With BOOKING_WRITE_BATCHING the writer thread checks the batch's seats before inserting
+# them; its statements are counted against the request that waits for them.
+@pytest.mark.parametrize("method, path, make_request, expected_status, ceiling", [
+    case for case in CASES if case[1] in ("/bookings/", "/bookings/movie/{movie_id}/room/{room_id}/")
+])
+def test_batched_bookings_stay_within_budget(monkeypatch, client, catalog, method, path, make_request, expected_status, ceiling):
+    monkeypatch.setattr(booking_writer, "enabled", True)
+    test_endpoint_stays_within_budget(client, catalog, method, path, make_request, expected_status, ceiling)
+    assert booking_writer.stats()["requests"] > 0
+
+
+# Catalog reads that hit the response cache run no queries at all.
+@pytest.mark.parametrize("path", ["/rooms/", "/rooms/{room_id}", "/movies/movies/", "/movies/movies/{movie_id}"])
+def test_cached_catalog_reads_run_no_queries(client, catalog, path):
+    url = path.format(**catalog)
+    etag = client.get(url).headers["ETag"]
+
+    with QueryBudget(0):
+        assert client.get(url).status_code == 200
+        assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_every_route_has_a_budget_case(monkeypatch, mode):
+    app = make_client(monkeypatch, mode).app
+    covered = {(method, path) for method, path, *_ in CASES}
+    routes = {
+        (method, route.path) for route in app.routes
+        if getattr(route, "include_in_schema", False) for method in route.methods - {"HEAD"}
+    }
+
+    assert unbudgeted_routes(app) == []
+    assert routes - covered == set()
@@ -0,0 +1,80 @@
+# tests/test_recurring_schedules.py
+
+from datetime import timedelta
+from sqlalchemy import select
+from app import models
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def _recurring(client, catalog: dict, **rule):
+    return client.post("/schedules/rooms/{room_id}/recurring".format(**catalog), json={"movie_id": catalog["movie_id"], **rule})
+
+
+def _stored(db, catalog: dict) -> dict:
+    return {
+        (str(show_date), start_time.strftime("%H:%M")): schedule_id
+        for schedule_id, show_date, start_time in db.execute(
+            select(models.Schedule.id, models.Schedule.show_date, models.Schedule.start_time)
+            .where(models.Schedule.room_id == catalog["room_id"])
+        )
+    }
+
+
+def test_overlapping_slots_are_skipped_and_the_rest_created(client, catalog, db):
+    first_day = catalog["show_date"]
+    days = [str(first_day + timedelta(days=day)) for day in range(3)]
+
+    response = _recurring(client, catalog, start_date=days[0], end_date=days[2], start_times=["17:00", "10:00", "12:00"])
+
+    assert response.status_code == 201
+    result = response.json()
+    created = [(schedule["show_date"], schedule["start_time"]) for schedule in result["created"]]
+    assert created == [(days[0], "10:00"), (days[1], "10:00"), (days[1], "17:00"), (days[2], "10:00"), (days[2], "17:00")]
+    # The 10:00 show occupies the room until 12:31; on the first day 17:00 runs into the 18:00 show
+    rule_overlap = "Overlaps another slot of this rule (10:00-12:31, including cleaning)"
+    assert [(skipped["show_date"], skipped["start_time"], skipped["reason"]) for skipped in result["skipped"]] == [
+        (days[0], "12:00", rule_overlap),
+        (days[0], "17:00", f"Overlaps schedule {catalog['schedule_id']} (18:00-20:31, including cleaning)"),
+        (days[1], "12:00", rule_overlap),
+        (days[2], "12:00", rule_overlap),
+    ]
+    stored = _stored(db, catalog)
+    assert {(schedule["show_date"], schedule["start_time"]): schedule["id"] for schedule in result["created"]} == {
+        slot: schedule_id for slot, schedule_id in stored.items() if schedule_id != catalog["schedule_id"]
+    }
+    assert all(schedule["movie"]["title"] == "The Matrix" and schedule["booked_seats"] == 0 for schedule in result["created"])
+
+
+def test_only_the_selected_weekdays_are_scheduled(client, catalog, db):
+    first_day = catalog["show_date"]
+    weekday = WEEKDAYS[(first_day + timedelta(days=1)).weekday()]
+
+    response = _recurring(
+        client, catalog, start_date=str(first_day), end_date=str(first_day + timedelta(days=13)), weekdays=[weekday], start_times=["21:00"]
+    )
+
+    assert response.status_code == 201
+    assert [schedule["show_date"] for schedule in response.json()["created"]] == [
+        str(first_day + timedelta(days=1)), str(first_day + timedelta(days=8))
+    ]
+    assert len(_stored(db, catalog)) == 3
+
+
+def test_a_rule_whose_slots_are_all_taken_creates_nothing(client, catalog, db):
+    day = str(catalog["show_date"])
+
+    response = _recurring(client, catalog, start_date=day, end_date=day, start_times=["18:30"])
+
+    assert response.status_code == 201
+    assert response.json()["created"] == []
+    assert len(response.json()["skipped"]) == 1
+    assert len(_stored(db, catalog)) == 1
+
+
+def test_a_rule_ending_before_it_starts_is_refused(client, catalog):
+    day = catalog["show_date"]
+
+    response = _recurring(client, catalog, start_date=str(day), end_date=str(day - timedelta(days=1)), start_times=["10:00"])
+
+    assert response.status_code == 400
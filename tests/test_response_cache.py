@@ -0,0 +1,17 @@
+# tests/test_response_cache.py
+
+from starlette.requests import Request
+from app.response_cache import ResponseCache
+
+
+def _key(query_string: bytes) -> str:
+    request = Request({"type": "http", "method": "GET", "path": "/movies/movies/", "query_string": query_string, "headers": []})
+    return ResponseCache(max_entries=8, ttl=30.0, max_age=0).lookup(request).key
+
+
+def test_parameter_order_does_not_change_the_key():
+    assert _key(b"limit=5&fields=id,title") == _key(b"fields=id%2Ctitle&limit=5")
+
+
+def test_encoded_separators_in_values_do_not_collide():
+    assert _key(b"fields=id%26limit%3D1") != _key(b"fields=id&limit=1")
@@ -0,0 +1,36 @@
+# tests/test_rooms.py
+
+from datetime import date, timedelta
+import pytest
+from app.query_budget import QueryBudget
+
+# Queries GET /rooms/?expand=schedules may run, however many rooms and schedules there are
+EXPANDED_ROOMS_BUDGET = 2
+
+
+@pytest.mark.parametrize("room_count", [10, 20, 30])
+def test_expanded_room_list_runs_a_fixed_number_of_queries(client, seed_rooms, room_count):
+    seed_rooms(room_count, schedules=3)
+
+    with QueryBudget(EXPANDED_ROOMS_BUDGET) as budget:
+        response = client.get("/rooms/", params={"expand": "schedules"})
+
+    assert response.status_code == 200
+    rooms = response.json()["items"]
+    assert len(rooms) == room_count
+    assert all(len(room["schedules"]) == 3 and room["schedules"][0]["movie"]["title"] for room in rooms)
+    assert len(budget.statements) == EXPANDED_ROOMS_BUDGET
+
+
+@pytest.mark.parametrize("room_count", [10, 20, 30])
+def test_expanded_room_list_with_a_date_window_runs_a_fixed_number_of_queries(client, seed_rooms, room_count):
+    seed_rooms(room_count, schedules=3)
+    tomorrow = date.today() + timedelta(days=1)
+
+    with QueryBudget(EXPANDED_ROOMS_BUDGET):
+        response = client.get("/rooms/", params={
+            "expand": "schedules", "schedules_from": str(tomorrow), "schedules_to": str(tomorrow + timedelta(days=1))
+        })
+
+    assert response.status_code == 200
+    assert [len(room["schedules"]) for room in response.json()["items"]] == [2] * room_count
@@ -0,0 +1,114 @@
+# tests/test_schedule_conflicts.py
+
+from datetime import date, time, timedelta
+from app.schedule_conflicts import DayIntervals, ScheduleIntervals, occupied_minutes
+
+
+# The catalog's movie runs 136 minutes plus 15 of cleaning: a show occupies the room until
+# 2:31 after its start.
+def _schedule(client, catalog: dict, show_date: date, start_time: str):
+    return client.post("/schedules/rooms/{room_id}".format(**catalog), json={
+        "movie_id": catalog["movie_id"], "show_date": str(show_date), "start_time": start_time
+    })
+
+
+def test_day_intervals_find_any_overlapping_interval():
+    day = DayIntervals()
+    day.add(600, 900, "long")
+    day.add(620, 640, "short")
+    day.add(-30, 20, "from yesterday")
+
+    assert day.overlapping(850, 860)[2] == "long"
+    assert day.overlapping(0, 10)[2] == "from yesterday"
+    assert day.overlapping(20, 600) is None
+    assert day.overlapping(900, 1000) is None
+    assert day.reach == [20, 900, 900]
+
+
+def test_a_show_past_midnight_blocks_the_next_morning():
+    intervals = ScheduleIntervals()
+    show_date = date(2025, 8, 15)
+    intervals.add(1, show_date, time(23, 0), occupied_minutes(120), "schedule 1")
+
+    conflict = intervals.conflict(1, show_date + timedelta(days=1), time(0, 30), 60)
+
+    assert conflict == "Overlaps schedule 1 (23:00-01:15, including cleaning)"
+    assert intervals.conflict(1, show_date + timedelta(days=1), time(1, 15), 60) is None
+    assert intervals.conflict(2, show_date + timedelta(days=1), time(0, 30), 60) is None
+
+
+def test_a_late_show_is_refused_when_the_next_morning_is_taken(client, catalog):
+    next_day = catalog["show_date"] + timedelta(days=1)
+    assert _schedule(client, catalog, next_day, "00:30").status_code == 201
+
+    response = _schedule(client, catalog, catalog["show_date"], "22:30")
+
+    assert response.status_code == 409
+    assert response.json()["detail"].startswith("Overlaps schedule")
+
+
+def test_a_show_ending_after_midnight_blocks_an_early_show_the_next_day(client, catalog):
+    assert _schedule(client, catalog, catalog["show_date"], "22:00").status_code == 201
+    next_day = catalog["show_date"] + timedelta(days=1)
+
+    response = _schedule(client, catalog, next_day, "00:10")
+
+    assert response.status_code == 409
+    assert "22:00-00:31" in response.json()["detail"]
+    # The room is free again the minute the cleaning buffer ends
+    assert _schedule(client, catalog, next_day, "00:31").status_code == 201
+
+
+def test_a_show_may_start_exactly_when_cleaning_ends(client, catalog):
+    assert _schedule(client, catalog, catalog["show_date"], "20:30").status_code == 409
+    assert _schedule(client, catalog, catalog["show_date"], "20:31").status_code == 201
+    # A show that would run into the 18:00 show's start is refused as well
+    assert _schedule(client, catalog, catalog["show_date"], "15:30").status_code == 409
+    assert _schedule(client, catalog, catalog["show_date"], "15:29").status_code == 201
+
+
+def test_validate_checks_a_program_without_creating_schedules(client, catalog):
+    program = {"show_date": str(catalog["show_date"]), "shows": [
+        {"movie_id": catalog["movie_id"], "start_time": "21:00"},
+        {"movie_id": catalog["movie_id"], "start_time": "20:31"},
+        {"movie_id": catalog["movie_id"], "start_time": "10:00"},
+        {"movie_id": catalog["movie_id"] + 1000, "start_time": "12:00"},
+    ]}
+
+    response = client.post("/schedules/rooms/{room_id}/validate".format(**catalog), json=program)
+
+    assert response.status_code == 200
+    check = response.json()
+    assert check["valid"] is False
+    assert [show["error"] for show in check["shows"]] == [
+        "Overlaps the 20:31 show of this program (20:31-23:02, including cleaning)",
+        None,
+        None,
+        "Movie not found",
+    ]
+    assert [show["end_time"] for show in check["shows"]][1:3] == ["23:02", "12:31"]
+    schedules = client.get("/schedules/rooms/{room_id}".format(**catalog)).json()["items"]
+    assert len(schedules) == 1
+
+
+def test_validate_accepts_a_free_program(client, catalog):
+    program = {"show_date": str(catalog["show_date"]), "shows": [
+        {"movie_id": catalog["movie_id"], "start_time": "12:00"},
+        {"movie_id": catalog["movie_id"], "start_time": "20:31"},
+    ]}
+
+    response = client.post("/schedules/rooms/{room_id}/validate".format(**catalog), json=program)
+
+    assert response.json()["valid"] is True
+    assert client.post("/schedules/rooms/1000000/validate", json=program).status_code == 404
+
+
+# The runtime decides what a schedule occupies, so it cannot change under existing schedules.
+def test_runtime_update_is_refused_while_the_movie_has_schedules(client, catalog):
+    url = "/movies/movies/{movie_id}".format(**catalog)
+    movie = {"title": "The Matrix", "poster": "https://example.com/matrix.jpg", "runtime_minutes": 240}
+
+    response = client.put(url, json=movie)
+
+    assert response.status_code == 409
+    assert client.get(url).json()["runtime_minutes"] == 136
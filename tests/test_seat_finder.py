@@ -0,0 +1,89 @@
+# tests/test_seat_finder.py
+
+import random
+import pytest
+from sqlalchemy import select
+from app import models
+from app.seat_finder import best_block
+from app.seat_state import SeatBitmap, seat_state
+
+
+# Every block of `size` free seats, ranked the way best_block documents it.
+def _brute_force(bitmap: SeatBitmap, size: int):
+    candidates = []
+    for row in range(1, bitmap.rows + 1):
+        for first in range(1, bitmap.seats_per_row - size + 2):
+            if any(bitmap.is_booked(row, seat) for seat in range(first, first + size)):
+                continue
+            distance = (2 * row - 1 - bitmap.rows) ** 2 + (2 * first + size - 2 - bitmap.seats_per_row) ** 2
+            candidates.append((distance, row, first))
+    if not candidates:
+        return None
+    return min(candidates)[1:]
+
+
+def _random_bitmap(generator: random.Random, rows: int, seats_per_row: int, density: float) -> SeatBitmap:
+    bitmap = SeatBitmap(1, "Screen 1", rows, seats_per_row)
+    for row in range(1, rows + 1):
+        for seat in range(1, seats_per_row + 1):
+            if generator.random() < density:
+                bitmap.set_booked(row, seat)
+    return bitmap
+
+
+def _full_rows(bitmap: SeatBitmap, *rows: int) -> SeatBitmap:
+    for row in rows:
+        for seat in range(1, bitmap.seats_per_row + 1):
+            bitmap.set_booked(row, seat)
+    return bitmap
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_best_block_matches_a_brute_force_search(seed):
+    generator = random.Random(seed)
+    for _ in range(20):
+        bitmap = _random_bitmap(generator, generator.randint(1, 9), generator.randint(1, 40), generator.choice([0, 0.2, 0.5, 0.8, 1]))
+        for size in range(1, bitmap.seats_per_row + 2):
+            assert best_block(bitmap, size) == _brute_force(bitmap, size), (bitmap.rows, bitmap.seats_per_row, bytes(bitmap.bits), size)
+
+
+def test_a_party_as_wide_as_the_row_needs_an_empty_row():
+    bitmap = SeatBitmap(1, "Screen 1", 4, 6)
+    bitmap.set_booked(2, 6)
+    bitmap.set_booked(3, 1)
+
+    assert best_block(bitmap, 6) == (1, 1)
+    bitmap.set_booked(1, 3)
+    assert best_block(bitmap, 6) == (4, 1)
+    bitmap.set_booked(4, 4)
+    assert best_block(bitmap, 6) is None
+
+
+def test_full_rows_are_skipped():
+    bitmap = _full_rows(SeatBitmap(1, "Screen 1", 5, 8), 2, 3, 4)
+
+    assert best_block(bitmap, 3) == (1, 3)
+    assert best_block(_full_rows(bitmap, 1, 5), 1) is None
+
+
+@pytest.mark.parametrize("size", [0, 9, 20])
+def test_a_party_that_cannot_fit_a_row_has_no_block(size):
+    assert best_block(SeatBitmap(1, "Screen 1", 3, 8), size) is None
+
+
+# A booking written behind the cached seat state's back makes the first insert fail; the
+# seat state is reloaded and the next best seats are booked.
+def test_best_available_booking_retries_after_a_conflict(client, catalog, db):
+    schedule_id = catalog["schedule_id"]
+    assert client.get(f"/bookings/{schedule_id}/seats").status_code == 200
+    db.add(models.Booking(schedule_id=schedule_id, row=2, seat=2))
+    db.commit()
+    assert not seat_state.get(schedule_id).is_booked(2, 2)
+
+    response = client.post("/bookings/best-available", json={"schedule_id": schedule_id, "party_size": 2})
+
+    assert response.status_code == 201, response.text
+    assert [(booking["row"], booking["seat"]) for booking in response.json()] == [(1, 2), (1, 3)]
+    assert seat_state.get(schedule_id).is_booked(2, 2)
+    stored = set(db.execute(select(models.Booking.row, models.Booking.seat).where(models.Booking.schedule_id == schedule_id)).all())
+    assert stored == {(1, 1), (2, 2), (1, 2), (1, 3)}
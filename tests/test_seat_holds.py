@@ -0,0 +1,107 @@
+# tests/test_seat_holds.py
+
+import pytest
+from sqlalchemy import select
+from app import models
+from app.seat_holds import seat_holds
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(seat_holds, "clock", fake)
+    return fake
+
+
+def _hold(client, catalog: dict, seats: list):
+    return client.post("/bookings/holds", json={
+        "schedule_id": catalog["schedule_id"], "seats": [{"row": row, "seat": seat} for row, seat in seats]
+    })
+
+
+def _booked(client, catalog: dict) -> set:
+    layout = client.get("/bookings/{schedule_id}/seats".format(**catalog)).json()["seating_layout"]
+    return {(seat["row"], seat["seat"]) for row in layout for seat in row if seat["is_booked"]}
+
+
+def _stored(db, catalog: dict) -> set:
+    return set(db.execute(
+        select(models.Booking.row, models.Booking.seat).where(models.Booking.schedule_id == catalog["schedule_id"])
+    ).all())
+
+
+def test_held_seats_are_refused_to_bookings_and_other_holds(client, catalog, clock):
+    assert _hold(client, catalog, [(2, 1), (2, 2)]).status_code == 201
+
+    booking = client.post("/bookings/", json={"schedule_id": catalog["schedule_id"], "row": 2, "seat": 2})
+    assert booking.status_code == 409
+    group = client.post("/bookings/group", json={"schedule_id": catalog["schedule_id"], "seats": [{"row": 2, "seat": 1}]})
+    assert group.status_code == 409
+    other = _hold(client, catalog, [(2, 2), (2, 3)])
+    assert other.status_code == 409
+    assert other.json()["detail"]["conflicts"] == [{"row": 2, "seat": 2}]
+    # Seats next to the hold are still free
+    assert _hold(client, catalog, [(2, 3)]).status_code == 201
+
+
+def test_held_seats_show_as_booked(client, catalog, clock):
+    assert _booked(client, catalog) == {(1, 1)}
+
+    _hold(client, catalog, [(3, 4)])
+
+    assert _booked(client, catalog) == {(1, 1), (3, 4)}
+    best = client.get("/bookings/{schedule_id}/best-available".format(**catalog), params={"party_size": 4}).json()
+    assert all(seat["row"] == 2 for seat in best["seats"])
+
+
+def test_holds_are_released_after_the_ttl(client, catalog, clock):
+    hold_id = _hold(client, catalog, [(2, 1)]).json()["id"]
+
+    clock.now += seat_holds.ttl - 1
+    assert _booked(client, catalog) == {(1, 1), (2, 1)}
+    clock.now += 1
+
+    assert _booked(client, catalog) == {(1, 1)}
+    assert client.post(f"/bookings/holds/{hold_id}/confirm").status_code == 404
+    assert client.post("/bookings/", json={"schedule_id": catalog["schedule_id"], "row": 2, "seat": 1}).status_code == 201
+
+
+def test_confirm_books_the_held_seats_once(client, catalog, db, clock):
+    hold_id = _hold(client, catalog, [(3, 1), (3, 2)]).json()["id"]
+
+    confirmed = client.post(f"/bookings/holds/{hold_id}/confirm")
+
+    assert confirmed.status_code == 201
+    assert sorted((booking["row"], booking["seat"]) for booking in confirmed.json()) == [(3, 1), (3, 2)]
+    assert _stored(db, catalog) == {(1, 1), (3, 1), (3, 2)}
+    assert db.get(models.Schedule, catalog["schedule_id"]).booked_seats == 3
+    assert client.post(f"/bookings/holds/{hold_id}/confirm").status_code == 404
+    assert client.delete(f"/bookings/holds/{hold_id}").status_code == 404
+    assert _booked(client, catalog) == {(1, 1), (3, 1), (3, 2)}
+
+
+def test_release_frees_the_seats(client, catalog, db, clock):
+    hold_id = _hold(client, catalog, [(2, 4)]).json()["id"]
+
+    assert client.delete(f"/bookings/holds/{hold_id}").status_code == 204
+
+    assert _booked(client, catalog) == {(1, 1)}
+    assert client.delete(f"/bookings/holds/{hold_id}").status_code == 404
+    assert client.post(f"/bookings/holds/{hold_id}/confirm").status_code == 404
+    assert _hold(client, catalog, [(2, 4)]).status_code == 201
+    assert _stored(db, catalog) == {(1, 1)}
+
+
+def test_booked_seats_cannot_be_held(client, catalog, clock):
+    response = _hold(client, catalog, [(1, 1), (1, 2)])
+
+    assert response.status_code == 409
+    assert response.json()["detail"]["conflicts"] == [{"row": 1, "seat": 1}]
@@ -0,0 +1,93 @@
+# tests/test_showtime_search.py
+
+from datetime import time, timedelta
+import pytest
+from app import models
+
+
+# Adds a 1x2 room showing "Alien" twice on the catalog's day (sold out at 14:00, one seat
+# left at 20:00) and the catalog's movie the day after.
+@pytest.fixture
+def showtimes(db, catalog) -> dict:
+    movie = models.Movie(title="Alien", poster="https://example.com/alien.jpg", runtime_minutes=117)
+    room = models.Room(name="Screen 2", rows=1, seats_per_row=2)
+    db.add_all([movie, room])
+    db.flush()
+    show_date = catalog["show_date"]
+    db.add_all([
+        models.Schedule(room_id=room.id, movie_id=movie.id, show_date=show_date, start_time=time(14, 0), booked_seats=2),
+        models.Schedule(room_id=room.id, movie_id=movie.id, show_date=show_date, start_time=time(20, 0), booked_seats=1),
+        models.Schedule(room_id=catalog["room_id"], movie_id=catalog["movie_id"], show_date=show_date + timedelta(days=1), start_time=time(10, 0)),
+    ])
+    db.commit()
+    return {**catalog, "alien_id": movie.id, "alien_room_id": room.id, "next_day": show_date + timedelta(days=1)}
+
+
+def _search(client, showtimes: dict, **params) -> list:
+    params = {"date_from": str(showtimes["show_date"]), "date_to": str(showtimes["next_day"]), **params}
+    response = client.get("/schedules/", params=params)
+    assert response.status_code == 200, response.text
+    return [(showtime["movie"]["title"], showtime["show_date"], showtime["start_time"]) for showtime in response.json()]
+
+
+def test_showtimes_are_listed_by_time_with_their_seat_counts(client, showtimes):
+    response = client.get("/schedules/", params={"date_from": str(showtimes["show_date"])})
+
+    assert [(showtime["room_name"], showtime["start_time"], showtime["capacity"], showtime["booked"], showtime["available"]) for showtime in response.json()] == [
+        ("Screen 2", "14:00", 2, 2, 0),
+        ("Screen 1", "18:00", 12, 1, 11),
+        ("Screen 2", "20:00", 2, 1, 1),
+    ]
+
+
+def test_sold_out_and_nearly_full_showtimes_can_be_left_out(client, showtimes):
+    day, next_day = str(showtimes["show_date"]), str(showtimes["next_day"])
+
+    assert _search(client, showtimes, hide_sold_out=True) == [
+        ("The Matrix", day, "18:00"), ("Alien", day, "20:00"), ("The Matrix", next_day, "10:00")
+    ]
+    assert _search(client, showtimes, min_available=2) == [("The Matrix", day, "18:00"), ("The Matrix", next_day, "10:00")]
+    assert _search(client, showtimes, min_available=0, hide_sold_out=True) == _search(client, showtimes, hide_sold_out=True)
+
+
+def test_showtimes_can_be_filtered_by_movie_and_room(client, showtimes):
+    day = str(showtimes["show_date"])
+
+    assert _search(client, showtimes, movie_id=showtimes["alien_id"]) == [("Alien", day, "14:00"), ("Alien", day, "20:00")]
+    assert _search(client, showtimes, room_id=showtimes["room_id"]) == [
+        ("The Matrix", day, "18:00"), ("The Matrix", str(showtimes["next_day"]), "10:00")
+    ]
+    assert _search(client, showtimes, movie_id=showtimes["alien_id"], room_id=showtimes["room_id"]) == []
+
+
+@pytest.mark.parametrize("sort, expected", [
+    ("time", [("Alien", 0, "14:00"), ("The Matrix", 0, "18:00"), ("Alien", 0, "20:00"), ("The Matrix", 1, "10:00")]),
+    ("available", [("The Matrix", 1, "10:00"), ("The Matrix", 0, "18:00"), ("Alien", 0, "20:00"), ("Alien", 0, "14:00")]),
+    ("movie", [("Alien", 0, "14:00"), ("Alien", 0, "20:00"), ("The Matrix", 0, "18:00"), ("The Matrix", 1, "10:00")]),
+])
+def test_showtimes_are_sorted(client, showtimes, sort, expected):
+    days = [str(showtimes["show_date"]), str(showtimes["next_day"])]
+
+    assert _search(client, showtimes, sort=sort) == [(title, days[day], start_time) for title, day, start_time in expected]
+
+
+def test_limit_and_offset_page_through_the_sorted_showtimes(client, showtimes):
+    assert _search(client, showtimes, sort="available", limit=2, offset=1) == [
+        ("The Matrix", str(showtimes["show_date"]), "18:00"), ("Alien", str(showtimes["show_date"]), "20:00")
+    ]
+
+
+def test_the_search_counts_new_bookings(client, showtimes):
+    client.post("/bookings/", json={"schedule_id": showtimes["schedule_id"], "row": 3, "seat": 4})
+
+    showtime = client.get("/schedules/", params={"date_from": str(showtimes["show_date"]), "room_id": showtimes["room_id"]}).json()[0]
+
+    assert (showtime["booked"], showtime["available"]) == (2, 10)
+
+
+@pytest.mark.parametrize("params", [
+    {"date_from": "2025-08-15", "date_to": "2025-08-14"},
+    {"date_from": "2025-08-01", "date_to": "2025-10-15"},
+])
+def test_invalid_date_ranges_are_refused(client, params):
+    assert client.get("/schedules/", params=params).status_code == 400